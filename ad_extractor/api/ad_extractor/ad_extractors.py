@@ -1,46 +1,86 @@
+import asyncio
+import json
 from openai import AsyncOpenAI
 from typing import Optional, Protocol
 
 from pydantic import BaseModel
+from api.ad_extractor.cache import ContentCache, sha256_hex
+from api.ad_extractor.chunking import merge_ad_documents, split_into_chunks
+from api.ad_extractor.scheduler import estimate_tokens, scheduled_llm_request
+from api.metrics import metrics
 from api.schema import ADDocument
 
 
+# Precedes the AD text at the end of the extraction prompt
+AD_TEXT_MARKER = "AD Text:"
+
+
 class ADExtractor(Protocol):
-    async def extract_ad(self, text: str | dict, response_format: dict | ADDocument, system_context: Optional[str] = None) -> Optional[ADDocument]:
+    # `ad_text` is the AD text the prompt was built from, for strategies that parse it directly
+    async def extract_ad(self, text: str | dict, response_format: dict | ADDocument, system_context: Optional[str] = None, ad_text: Optional[str | dict] = None) -> Optional[ADDocument]:
         ...
 
 class OpenAIADExtractor:
-    def __init__(self, api_key: str, base_url: Optional[str] = None) -> None:
+    def __init__(
+            self,
+            api_key: str,
+            base_url: Optional[str] = None,
+            max_retries: int = 2,
+            client: Optional[AsyncOpenAI] = None,
+            model: str = "gpt-4o"
+        ) -> None:
         self.api_key = api_key
         self.base_url = base_url
+        self.max_retries = max_retries
+        self._client = client
+        self.model = model
 
 
-    async def extract_ad(self, prompt: str | dict, response_format: Optional[dict | BaseModel] =  ADDocument, system_context: Optional[str] = None) -> Optional[ADDocument]:
-        client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url)
+    async def extract_ad(self, prompt: str | dict, response_format: Optional[dict | BaseModel] =  ADDocument, system_context: Optional[str] = None, ad_text: Optional[str | dict] = None) -> Optional[ADDocument]:
+        if self._client is not None:
+            client = self._client.with_options(max_retries=self.max_retries)
+        else:
+            client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, max_retries=self.max_retries)
         
+        request = self.build_request(prompt, response_format, system_context)
+
+        async def send():
+            with metrics.llm_request("extraction"):
+                return await client.chat.completions.create(**request)
+
+        # Rate limits are charged here, only for requests that actually reach the LLM
+        estimated_tokens = estimate_tokens(system_context or "") + estimate_tokens(prompt if isinstance(prompt, str) else json.dumps(prompt))
+        response = await scheduled_llm_request(send, estimated_tokens)
+        metrics.record_usage("extraction", response.usage)
+
+        ad_data = response.choices[0].message.content
+        try:
+            with metrics.stage("response_parse"):
+                ad_document = ADDocument.model_validate_json(ad_data)
+            return ad_document
+        except Exception as e:
+            print(f"Error parsing AD document: {e}")
+            return None
+
+    def build_request(self, prompt: str | dict, response_format: Optional[dict | BaseModel] = ADDocument, system_context: Optional[str] = None) -> dict:
+        """
+            Method to build the chat completion request body for an extraction.
+        """
         try:
             response_format_json = response_format.model_json_schema()
         except:
             response_format_json = response_format
 
-        response = await client.chat.completions.create(
-            model="gpt-4o",
-            response_format={"type": "json_schema", "json_schema": {"name": "ADDocument", "schema": response_format_json}},
-            messages=[
+        return {
+            "model": self.model,
+            "response_format": {"type": "json_schema", "json_schema": {"name": "ADDocument", "schema": response_format_json}},
+            "messages": [
                 {"role": "system", "content": system_context},
                 {"role": "user", "content": prompt}
             ],
-            temperature=0.1,
-        )
+            "temperature": 0.1,
+        }
 
-        ad_data = response.choices[0].message.content
-        try:
-            ad_document = ADDocument.model_validate_json(ad_data)
-            return ad_document
-        except Exception as e:
-            print(f"Error parsing AD document: {e}")
-            return None
-        
 
 class GeminiADExtractor:
     def __init__(self, api_key: str, base_url: Optional[str] = None) -> None:
@@ -52,13 +92,81 @@ class GeminiADExtractor:
         
 
 class ADExtractorFactory:
-    def __init__(self, extractor_strategy: Optional[ADExtractor] = None) -> None:
+    def __init__(
+            self,
+            extractor_strategy: Optional[ADExtractor] = None,
+            cache: Optional[ContentCache] = None,
+            chunk_tokens: int = 0
+        ) -> None:
         if extractor_strategy is None:
             raise ValueError("An ADExtractor strategy must be provided.")
         self._extractor = extractor_strategy
+        self._cache = cache
+        self._chunk_tokens = chunk_tokens
 
     async def extract_ad(self, ad_text: str | dict) -> Optional[ADDocument]:
-        system_context = """
+        """
+            Method to extract an ADDocument from AD text.
+            Text longer than `chunk_tokens` is split into chunks that are extracted in parallel and merged.
+        """
+        if self._chunk_tokens > 0 and isinstance(ad_text, str) and estimate_tokens(ad_text) > self._chunk_tokens:
+            return await self.extract_ad_chunked(ad_text)
+        with metrics.stage("prompt_build"):
+            prompt = self.build_prompt(ad_text)
+        return await self._extract(prompt, ad_text)
+
+    async def extract_ad_chunked(self, ad_text: str) -> Optional[ADDocument]:
+        """
+            Method to extract partial ADDocuments from chunks of the text concurrently and merge them.
+            Chunks from which nothing could be parsed are skipped.
+        """
+        chunks = split_into_chunks(ad_text, self._chunk_tokens)
+        if len(chunks) == 1:
+            return await self._extract(self.build_prompt(ad_text), ad_text)
+
+        parts = await asyncio.gather(*(
+            self._extract(self.build_chunk_prompt(chunk, index, len(chunks)), chunk)
+            for index, chunk in enumerate(chunks)
+        ))
+        parts = [part for part in parts if part is not None]
+        if not parts:
+            return None
+        return merge_ad_documents(parts)
+
+    async def _extract(self, prompt: str, ad_text: str | dict) -> Optional[ADDocument]:
+        """
+            Results are cached by hash of prompt, system context, model and schema.
+        """
+        system_context = self.build_system_context()
+
+        cache_key = None
+        if self._cache is not None:
+            cache_key = sha256_hex(
+                system_context,
+                prompt,
+                getattr(self._extractor, "model", type(self._extractor).__name__),
+                json.dumps(ADDocument.model_json_schema(), sort_keys=True)
+            )
+            cached = await self._cache.get("ad", cache_key)
+            if cached is not None:
+                return ADDocument.model_validate_json(cached)
+
+        ad_document = await self._extractor.extract_ad(
+            prompt=prompt,
+            response_format=ADDocument,
+            system_context=system_context,
+            ad_text=ad_text
+        )
+
+        if ad_document is not None and cache_key is not None:
+            try:
+                await self._cache.put("ad", cache_key, ad_document.model_dump_json().encode("utf-8"))
+            except OSError as e:
+                print(f"Error caching AD document {ad_document.ad_id}: {e}")
+        return ad_document
+
+    def build_system_context(self) -> str:
+        return """
             You are an expert Airworthiness Directive (AD) extraction system. 
             Your task is to accurately parse AD documents and extract structured information following strict rules.            
             Extract the applicability rules from AD text and structure them into JSON format with precision.
@@ -67,8 +175,24 @@ class ADExtractorFactory:
             Different modifications may exempt different aircraft models.
             You must capture which models each exclusion applies to.
         """
-        
-        prompt = f"""
+
+    def build_chunk_prompt(self, chunk: str, index: int, count: int) -> str:
+        """
+            Method to build the extraction prompt for one chunk of a long AD.
+        """
+        return self.build_prompt(f"""
+            NOTE: This is part {index + 1} of {count} of a long AD. Extract only what this part states;
+            the parts are merged afterwards. Use the document header for the AD ID, title and effective date.
+            Leave out models, MSNs and modifications that are not mentioned in this part.
+
+            {chunk}
+        """)
+
+    def build_prompt(self, ad_text: str | dict) -> str:
+        """
+            Method to build the extraction prompt for the given AD text.
+        """
+        return f"""
             IMPORTANT INSTRUCTIONS:
             1. Extract AD ID with issuing authority prefix (e.g., "FAA-2025-23-53", "EASA-2025-0254R1")
                - Format: [AUTHORITY]-[AD_NUMBER]
@@ -104,9 +228,6 @@ class ADExtractorFactory:
                
             6. Extract any additional conditions (time limits, inspection intervals, etc.)
             
-            AD Text:
+            {AD_TEXT_MARKER}
             {ad_text}
-        """
-        return await self._extractor.extract_ad(
-            prompt=prompt, response_format=ADDocument, system_context=system_context
-        )
\ No newline at end of file
+        """
\ No newline at end of file
@@ -0,0 +1,119 @@
+import asyncio
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+from api.metrics import metrics
+from config.config import settings
+
+
+def sha256_hex(*parts: str | bytes) -> str:
+    """
+        SHA-256 over the given parts, length-prefixed so part boundaries are unambiguous.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        data = part.encode("utf-8") if isinstance(part, str) else part
+        digest.update(len(data).to_bytes(8, "big"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+class ContentCache:
+    """
+        Content-addressed on-disk cache with size-bounded LRU eviction.
+        Entries are files named by key; a hit refreshes the file's mtime,
+        and the least recently used entries are removed once `max_bytes` is exceeded.
+    """
+    def __init__(self, cache_dir: Path, max_bytes: int) -> None:
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+
+    def _path(self, namespace: str, key: str) -> Path:
+        return self.cache_dir / namespace / key[:2] / key
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for path in self.cache_dir.glob("*/*/*"):
+            # Temporary files of writes still in progress
+            if path.name.startswith("."):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def get_sync(self, namespace: str, key: str) -> Optional[bytes]:
+        path = self._path(namespace, key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            metrics.cache_lookup(f"content_{namespace}", False)
+            return None
+        self.hits += 1
+        metrics.cache_lookup(f"content_{namespace}", True)
+        return data
+
+    def put_sync(self, namespace: str, key: str, data: bytes) -> None:
+        path = self._path(namespace, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size, _ in self._entries())
+            try:
+                self._total_bytes -= path.stat().st_size
+            except FileNotFoundError:
+                pass
+            os.replace(tmp_path, path)
+            self._total_bytes += len(data)
+
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._total_bytes = total
+
+    async def get(self, namespace: str, key: str) -> Optional[bytes]:
+        return await asyncio.to_thread(self.get_sync, namespace, key)
+
+    async def put(self, namespace: str, key: str, data: bytes) -> None:
+        await asyncio.to_thread(self.put_sync, namespace, key, data)
+
+
+_content_cache: Optional[ContentCache] = None
+
+
+def get_content_cache() -> Optional[ContentCache]:
+    """
+        Get the shared extraction cache, or None if caching is disabled.
+    """
+    global _content_cache
+    if not settings.CACHE_ENABLED:
+        return None
+    if _content_cache is None:
+        cache_dir = Path(settings.CACHE_DIR) if settings.CACHE_DIR else Path(__file__).parent.parent.parent.parent / ".cache"
+        _content_cache = ContentCache(cache_dir, settings.CACHE_MAX_BYTES)
+    return _content_cache
@@ -0,0 +1,223 @@
+import math
+from collections import Counter
+from typing import Any, Iterable, Optional
+
+from api.ad_extractor.scheduler import estimate_tokens
+from api.ad_extractor.section_locator import iter_pages
+from api.evaluator.exemption_index import normalize_mod_name
+from api.evaluator.model_index import normalize_model_name
+from api.schema import ADDocument, ApplicabilityRules, ExcludeIfModification, MSNConstraint
+
+
+def _split_page(page_num: int, page_text: str, max_tokens: int) -> list[str]:
+    """
+        Render one page, cut at line boundaries into pieces of at most `max_tokens` estimated tokens.
+    """
+    page = f"--- Page {page_num} ---\n{page_text}"
+    if estimate_tokens(page) <= max_tokens:
+        return [page]
+
+    pieces = []
+    lines: list[str] = []
+    tokens = 0
+    for line in page_text.splitlines():
+        line_tokens = estimate_tokens(line)
+        if lines and tokens + line_tokens > max_tokens:
+            pieces.append(lines)
+            lines, tokens = [], 0
+        lines.append(line)
+        tokens += line_tokens
+    if lines:
+        pieces.append(lines)
+
+    return [
+        f"--- Page {page_num}{' (continued)' if index else ''} ---\n" + "\n".join(piece_lines)
+        for index, piece_lines in enumerate(pieces)
+    ]
+
+
+def split_into_chunks(text: str, max_tokens: int, header_lines: int = 15) -> list[str]:
+    """
+        Split `--- Page N ---` formatted text into chunks of whole pages (pages longer than
+        `max_tokens` are cut at line boundaries). Chunks are sized evenly so the slowest
+        extraction request is as short as possible. Every chunk after the first starts with
+        the document header so the AD ID and title can be read from any chunk.
+    """
+    pages = list(iter_pages(text))
+    pieces = [piece for page_num, page_text in pages for piece in _split_page(page_num, page_text, max_tokens)]
+    total_tokens = sum(estimate_tokens(piece) for piece in pieces)
+    target_tokens = math.ceil(total_tokens / math.ceil(total_tokens / max_tokens)) if total_tokens else max_tokens
+
+    chunks: list[list[str]] = []
+    current: list[str] = []
+    current_tokens = 0
+    for piece in pieces:
+        piece_tokens = estimate_tokens(piece)
+        if current and current_tokens + piece_tokens > target_tokens:
+            chunks.append(current)
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += piece_tokens
+    if current:
+        chunks.append(current)
+
+    first_page = pages[0][1] if pages else ""
+    header = "\n".join([line for line in first_page.splitlines() if line.strip()][:header_lines])
+    return [
+        "\n\n".join(chunk) if index == 0 else f"--- Document header ---\n{header}\n\n" + "\n\n".join(chunk)
+        for index, chunk in enumerate(chunks)
+    ]
+
+
+def _unique(values: Iterable[str], key=lambda value: value) -> list[str]:
+    seen = set()
+    unique = []
+    for value in values:
+        normalized = key(value)
+        if normalized in seen:
+            continue
+        seen.add(normalized)
+        unique.append(value)
+    return unique
+
+
+def _msn_sort_key(msn: Any) -> tuple[int, Any]:
+    try:
+        return 0, int(msn)
+    except (TypeError, ValueError):
+        return 1, str(msn)
+
+
+def _merge_msn_lists(lists: Iterable[Optional[list[Any]]]) -> Optional[list[Any]]:
+    merged: dict[tuple[int, Any], Any] = {}
+    for msns in lists:
+        for msn in msns or []:
+            merged.setdefault(_msn_sort_key(msn), msn)
+    return [merged[key] for key in sorted(merged)] or None
+
+
+def _msn_affected(constraint: MSNConstraint, msn: Any) -> bool:
+    key = _msn_sort_key(msn)
+    if constraint.include_msns:
+        return any(_msn_sort_key(item) == key for item in constraint.include_msns)
+    if any(_msn_sort_key(item) == key for item in constraint.exclude_msns or []):
+        return False
+    if key[0]:
+        return constraint.min_msn is None and constraint.max_msn is None
+    return (
+        (constraint.min_msn is None or key[1] >= constraint.min_msn)
+        and (constraint.max_msn is None or key[1] <= constraint.max_msn)
+    )
+
+
+def merge_msn_constraints(constraints: list[Optional[MSNConstraint]]) -> Optional[MSNConstraint]:
+    """
+        Merge MSN constraints from chunks so that every MSN affected according to any chunk stays affected.
+        A chunk without an include list (a range or "all MSN") drops the include lists: the merged range
+        is unbounded on a side if any such chunk is, and is widened to cover the listed MSNs.
+        An MSN stays excluded only if no chunk affects it.
+        Chunks that state no constraint do not widen the range to "all MSN".
+    """
+    present = [constraint for constraint in constraints if constraint is not None]
+    if not present:
+        return None
+
+    ranged = [constraint for constraint in present if not constraint.include_msns]
+    exclude_msns = _merge_msn_lists(
+        [msn for msn in constraint.exclude_msns or [] if not any(_msn_affected(other, msn) for other in present)]
+        for constraint in present
+    )
+    if not ranged:
+        return MSNConstraint(
+            exclude_msns=exclude_msns,
+            include_msns=_merge_msn_lists(constraint.include_msns for constraint in present)
+        )
+
+    listed = [
+        key[1] for constraint in present for key in map(_msn_sort_key, constraint.include_msns or []) if not key[0]
+    ]
+    min_msn = max_msn = None
+    if all(constraint.min_msn is not None for constraint in ranged):
+        min_msn = min([constraint.min_msn for constraint in ranged] + listed)
+    if all(constraint.max_msn is not None for constraint in ranged):
+        max_msn = max([constraint.max_msn for constraint in ranged] + listed)
+    return MSNConstraint(min_msn=min_msn, max_msn=max_msn, exclude_msns=exclude_msns)
+
+
+def merge_exclusions(exclusions: Iterable[ExcludeIfModification]) -> list[ExcludeIfModification]:
+    """
+        Deduplicate exclusions by normalized modification name, in first-seen order.
+        The models of duplicates are unioned; an exclusion for all models (None) wins.
+    """
+    merged: dict[str, ExcludeIfModification] = {}
+    for exclusion in exclusions:
+        key = normalize_mod_name(exclusion.modification)
+        existing = merged.get(key)
+        if existing is None:
+            merged[key] = exclusion.model_copy(deep=True)
+        elif existing.applicable_models is not None:
+            if exclusion.applicable_models is None:
+                existing.applicable_models = None
+            else:
+                existing.applicable_models = _unique(
+                    existing.applicable_models + exclusion.applicable_models, normalize_model_name
+                )
+    return list(merged.values())
+
+
+def _chunk_exclusions(part: ApplicabilityRules, scope_chunk_models: bool) -> list[ExcludeIfModification]:
+    """
+        Exclusions of one chunk. With `scope_chunk_models`, an exclusion for all models (None)
+        is limited to the models listed in that chunk, as the merged AD lists more.
+        Chunks that list no models keep None.
+    """
+    if not scope_chunk_models or not part.aircraft_models:
+        return part.excluded_if_modifications
+    return [
+        exclusion if exclusion.applicable_models is not None
+        else exclusion.model_copy(update={"applicable_models": list(part.aircraft_models)})
+        for exclusion in part.excluded_if_modifications
+    ]
+
+
+def merge_applicability_rules(parts: list[ApplicabilityRules]) -> ApplicabilityRules:
+    """
+        Deterministically merge partial applicability rules extracted from chunks, in chunk order.
+    """
+    conditions = _unique(part.additional_conditions.strip() for part in parts if part.additional_conditions)
+    model_sets = {
+        frozenset(normalize_model_name(model) for model in part.aircraft_models)
+        for part in parts if part.aircraft_models
+    }
+    return ApplicabilityRules(
+        aircraft_models=_unique((model for part in parts for model in part.aircraft_models), normalize_model_name),
+        msn_constraints=merge_msn_constraints([part.msn_constraints for part in parts]),
+        excluded_if_modifications=merge_exclusions(
+            exclusion for part in parts for exclusion in _chunk_exclusions(part, len(model_sets) > 1)
+        ),
+        required_modifications=_unique(
+            (modification for part in parts for modification in part.required_modifications), normalize_mod_name
+        ),
+        additional_conditions="\n".join(conditions) or None
+    )
+
+
+def merge_ad_documents(parts: list[ADDocument]) -> ADDocument:
+    """
+        Merge partial ADDocuments extracted from chunks of one AD.
+        The AD ID is the one most chunks agree on (earliest chunk on ties); title and
+        effective date come from the first chunk that has them.
+    """
+    id_counts = Counter(part.ad_id for part in parts)
+    ad_id = max(id_counts, key=lambda candidate: (id_counts[candidate], -next(
+        index for index, part in enumerate(parts) if part.ad_id == candidate
+    )))
+    raw_texts = _unique(part.raw_applicability_text.strip() for part in parts if part.raw_applicability_text)
+
+    return ADDocument(
+        ad_id=ad_id,
+        title=next((part.title for part in parts if part.title), None),
+        effective_date=next((part.effective_date for part in parts if part.effective_date), None),
+        applicability_rules=merge_applicability_rules([part.applicability_rules for part in parts]),
+        raw_applicability_text="\n\n".join(raw_texts) or None
+    )
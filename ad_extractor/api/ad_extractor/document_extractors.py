@@ -1,23 +1,109 @@
+import asyncio
+import time
 import pdfplumber
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import chain
 from pathlib import Path
-from typing import Optional, Protocol
+from typing import Iterable, Optional, Protocol
+
+from api.ad_extractor.cache import ContentCache, get_content_cache, sha256_hex
+from api.metrics import metrics
+from config.config import settings
+
 
 class TextExtractor(Protocol):
     async def extract(self, pdf_path: Path) -> str:
         ...
 
+
+def _count_pages(pdf_path: str) -> int:
+    with pdfplumber.open(pdf_path) as pdf:
+        return len(pdf.pages)
+
+
+def _extract_page_texts(pdf_path: str, first_page: int, last_page: int) -> list[tuple[int, str]]:
+    """
+        Extract the text of pages first_page..last_page (1-based, inclusive).
+        Runs in worker processes, so it must stay a picklable module-level function.
+    """
+    page_texts: list[tuple[int, str]] = []
+
+    with pdfplumber.open(pdf_path) as pdf:
+        for page_num in range(first_page, last_page + 1):
+            page_text = pdf.pages[page_num - 1].extract_text()
+            if page_text:
+                page_texts.append((page_num, page_text))
+
+    return page_texts
+
+
+def _join_page_texts(page_texts: Iterable[tuple[int, str]]) -> str:
+    return "\n\n".join(
+        f"--- Page {page_num} ---\n{page_text}"
+        for page_num, page_text in sorted(page_texts)
+    )
+
+
 class PdfPlumberExtractor:
-    async def extract(self, pdf_path: Path) -> str:        
-        text_parts: list[str] = []
-        
-        with pdfplumber.open(pdf_path) as pdf:
-            for page_num, page in enumerate(pdf.pages, start=1):
-                page_text = page.extract_text()
-                if page_text:
-                    text_parts.append(f"--- Page {page_num} ---\n{page_text}")
-
-        return "\n\n".join(text_parts)
-    
+    async def extract(self, pdf_path: Path) -> str:
+        page_texts = await asyncio.to_thread(
+            self._extract_all_pages, str(pdf_path)
+        )
+        return _join_page_texts(page_texts)
+
+    def _extract_all_pages(self, pdf_path: str) -> list[tuple[int, str]]:
+        return _extract_page_texts(pdf_path, 1, _count_pages(pdf_path))
+
+
+class ParallelPdfPlumberExtractor:
+    """
+        pdfplumber extraction fanned out over a process pool in page ranges,
+        keeping the event loop free while the CPU-heavy parsing runs.
+    """
+    def __init__(self, executor: Executor, pages_per_task: int = 4) -> None:
+        self._executor = executor
+        self._pages_per_task = max(1, pages_per_task)
+
+    async def extract(self, pdf_path: Path) -> str:
+        loop = asyncio.get_running_loop()
+        path = str(pdf_path)
+
+        page_count = await loop.run_in_executor(self._executor, _count_pages, path)
+        page_ranges = [
+            (first_page, min(first_page + self._pages_per_task - 1, page_count))
+            for first_page in range(1, page_count + 1, self._pages_per_task)
+        ]
+        chunks = await asyncio.gather(*(
+            loop.run_in_executor(self._executor, _extract_page_texts, path, first_page, last_page)
+            for first_page, last_page in page_ranges
+        ))
+        return _join_page_texts(chain.from_iterable(chunks))
+
+
+class CachedTextExtractor:
+    """
+        Wraps another extractor and caches its text by SHA-256 of the PDF bytes.
+    """
+    def __init__(self, extractor: TextExtractor, cache: ContentCache) -> None:
+        self._extractor = extractor
+        self._cache = cache
+
+    async def extract(self, pdf_path: Path) -> str:
+        pdf_bytes = await asyncio.to_thread(Path(pdf_path).read_bytes)
+        cache_key = await asyncio.to_thread(sha256_hex, pdf_bytes)
+
+        cached = await self._cache.get("text", cache_key)
+        if cached is not None:
+            return cached.decode("utf-8")
+
+        text = await self._extractor.extract(pdf_path)
+        try:
+            await self._cache.put("text", cache_key, text.encode("utf-8"))
+        except OSError as e:
+            print(f"Error caching text of {Path(pdf_path).name}: {e}")
+        return text
+
+
 class OCRExtractor:
     async def extract(self, pdf_path: Path) -> str:
         #if you have case that need ocr put it here. Make new strategy for OCRTextExtraction
@@ -25,12 +111,53 @@ class OCRExtractor:
         pass
 
 
+_pdf_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_pdf_process_pool() -> Optional[ProcessPoolExecutor]:
+    """
+        Get the shared process pool for PDF extraction, or None if parallel extraction is disabled.
+    """
+    global _pdf_process_pool
+    if settings.PDF_EXTRACT_WORKERS <= 0:
+        return None
+    if _pdf_process_pool is None:
+        _pdf_process_pool = ProcessPoolExecutor(max_workers=settings.PDF_EXTRACT_WORKERS)
+    return _pdf_process_pool
+
+
+def shutdown_pdf_process_pool() -> None:
+    global _pdf_process_pool
+    if _pdf_process_pool is not None:
+        _pdf_process_pool.shutdown(cancel_futures=True)
+        _pdf_process_pool = None
+
+
+def default_text_extractor(use_cache: bool = True) -> TextExtractor:
+    """
+        Pick the parallel extractor when a process pool is configured,
+        wrapped in the text cache unless caching is bypassed or disabled.
+    """
+    executor = get_pdf_process_pool()
+    if executor is None:
+        extractor: TextExtractor = PdfPlumberExtractor()
+    else:
+        extractor = ParallelPdfPlumberExtractor(executor, pages_per_task=settings.PDF_PAGES_PER_TASK)
+
+    cache = get_content_cache() if use_cache else None
+    if cache is not None:
+        extractor = CachedTextExtractor(extractor, cache)
+    return extractor
+
+
 class PDFExtractorFactory:
     def __init__(
-            self, 
-            extractor_strategy: Optional[TextExtractor] = PdfPlumberExtractor()
+            self,
+            extractor_strategy: Optional[TextExtractor] = None,
+            use_cache: bool = True
         ):
-        self._extractor = extractor_strategy
+        self._extractor = extractor_strategy or default_text_extractor(use_cache)
+        self.timings: dict[str, float] = {}
 
 
     async def extract_text(self, pdf_path: Path | str) -> str:
@@ -38,20 +165,27 @@ class PDFExtractorFactory:
             Method to extract text from a single PDF file.
         """
         path = Path(pdf_path) if isinstance(pdf_path, str) else pdf_path
-        return await self._extractor.extract(path)
-    
+        started = time.perf_counter()
+        text = await self._extractor.extract(path)
+        self.timings[path.name] = time.perf_counter() - started
+        metrics.observe_stage("pdf_extract", self.timings[path.name])
+        return text
+
     async def bulk_extract(self, pdf_directory: Path | str) -> dict[str, str]:
         """
             Method to extract text from all PDF files in a given directory.
+            Files are extracted concurrently; per-file timings are kept in `timings`.
         """
         dir_path = Path(pdf_directory) if isinstance(pdf_directory, str) else pdf_directory
-        
+
         if not dir_path.is_dir():
             raise NotADirectoryError(f"Not a directory: {dir_path}")
-        
+
+        pdf_files = sorted(dir_path.glob("*.pdf"))
+        texts = await asyncio.gather(*(self.extract_text(pdf_file) for pdf_file in pdf_files))
+
         extracted_texts: dict[str, str] = {}
-        
-        for pdf_file in dir_path.glob("*.pdf"):
-            extracted_texts[pdf_file.name] = await self.extract_text(pdf_file)
-        
-        return extracted_texts
\ No newline at end of file
+        for pdf_file, text in zip(pdf_files, texts):
+            extracted_texts[pdf_file.name] = text
+
+        return extracted_texts
@@ -0,0 +1,219 @@
+import asyncio
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Callable, Optional
+
+from api.ad_extractor.ad_extractors import ADExtractorFactory, OpenAIADExtractor
+from api.ad_extractor.cache import get_content_cache
+from api.ad_extractor.document_extractors import PDFExtractorFactory
+from api.ad_extractor.rule_based import with_rule_based_extraction
+from api.ad_extractor.schema import ExtractionJob, ExtractionJobDocument
+from api.ad_extractor.utils import bulk_process_ads, locate_applicability_sections
+from api.evaluator.fleet_registry import fleet_registry
+from api.llm_client import llm_client_pool
+from api.registry import OUTPUT_DIR, ad_registry
+from api.utils import dump_output_json
+from config.config import settings
+
+
+def default_job_extractor_factory(bypass_cache: bool) -> ADExtractorFactory:
+    """
+        Extractor for job documents; retries are handled by the extraction scheduler instead of the client.
+    """
+    api_key = settings.LLM_API_KEY.get_secret_value()
+    return ADExtractorFactory(
+        extractor_strategy=with_rule_based_extraction(OpenAIADExtractor(
+            api_key=api_key,
+            base_url=settings.BASE_URL,
+            max_retries=0,
+            client=llm_client_pool.get_client(api_key, settings.BASE_URL)
+        )),
+        cache=None if bypass_cache else get_content_cache(),
+        chunk_tokens=settings.EXTRACTION_CHUNK_TOKENS
+    )
+
+
+def _write_job_file(job_path: Path, data: bytes) -> None:
+    job_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = job_path.with_name(f".{job_path.name}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, job_path)
+
+
+_FINISHED_JOB_STATUSES = ("completed", "failed")
+_FINISHED_DOCUMENT_STATUSES = ("success", "failure")
+
+
+def _read_job_files(jobs_dir: Path) -> list[ExtractionJob]:
+    jobs = []
+    for job_file in sorted(jobs_dir.glob("*.json")) if jobs_dir.is_dir() else []:
+        try:
+            jobs.append(ExtractionJob.model_validate_json(job_file.read_bytes()))
+        except Exception as e:
+            print(f"Error loading extraction job {job_file.name}: {e}")
+    return jobs
+
+
+class ExtractionJobQueue:
+    """
+        In-process queue for long-running AD extraction. Each submitted job is split into
+        one work item per PDF, processed by a fixed pool of worker tasks sharing the
+        extraction scheduler's rate limits. Job state is only changed under the queue lock and
+        persisted with every change, so on restart finished documents are kept and unfinished ones are resumed.
+        A job whose documents all failed ends as 'failed', otherwise as 'completed'.
+    """
+    def __init__(
+        self,
+        jobs_dir: Path,
+        output_dir: Path,
+        workers: int = 2,
+        extractor_factory: Callable[[bool], ADExtractorFactory] = default_job_extractor_factory
+    ) -> None:
+        self.jobs_dir = jobs_dir
+        self.output_dir = output_dir
+        self.workers = max(1, workers)
+        self._extractor_factory = extractor_factory
+        self._jobs: dict[str, ExtractionJob] = {}
+        self._queue: asyncio.Queue[tuple[str, int]] = asyncio.Queue()
+        self._tasks: list[asyncio.Task] = []
+        self._lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        """
+            Method to load persisted jobs, re-queue their unfinished documents and start the workers.
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        for job in await asyncio.to_thread(_read_job_files, self.jobs_dir):
+            self._jobs[job.job_id] = job
+            if job.status in _FINISHED_JOB_STATUSES:
+                if job.status != self._finished_status(job):
+                    async with self._changing(job):
+                        pass
+                continue
+
+            # A document still marked running was interrupted by the restart
+            async with self._changing(job):
+                for document in job.documents:
+                    if document.status == "running":
+                        document.status = "pending"
+            await self._sync_if_finished(job)
+
+            for index, document in enumerate(job.documents):
+                if document.status == "pending":
+                    self._queue.put_nowait((job.job_id, index))
+
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """
+            Method to stop the workers. Interrupted documents stay persisted as running and are resumed on the next start.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def get(self, job_id: str) -> Optional[ExtractionJob]:
+        return self._jobs.get(job_id)
+
+    def list_jobs(self) -> list[ExtractionJob]:
+        return sorted(self._jobs.values(), key=lambda job: job.created_at, reverse=True)
+
+    async def submit(self, pdf_files: list[Path], bypass_cache: bool = False) -> ExtractionJob:
+        """
+            Method to create a job for the given PDF files and queue its documents.
+        """
+        now = time.time()
+        job = ExtractionJob(
+            job_id=uuid.uuid4().hex,
+            created_at=now,
+            updated_at=now,
+            bypass_cache=bypass_cache,
+            total=len(pdf_files),
+            documents=[
+                ExtractionJobDocument(source=pdf_file.name, path=str(pdf_file.resolve()))
+                for pdf_file in pdf_files
+            ]
+        )
+        self._jobs[job.job_id] = job
+        async with self._changing(job):
+            pass
+
+        for index in range(len(job.documents)):
+            self._queue.put_nowait((job.job_id, index))
+        return job
+
+    @staticmethod
+    def _finished_status(job: ExtractionJob) -> str:
+        return "failed" if job.total and not job.succeeded else "completed"
+
+    @asynccontextmanager
+    async def _changing(self, job: ExtractionJob) -> AsyncIterator[None]:
+        """
+            Change job state while holding the lock; counters and the job status are
+            derived from the documents and the job is persisted on exit.
+        """
+        async with self._lock:
+            yield
+            job.updated_at = time.time()
+            job.succeeded = sum(document.status == "success" for document in job.documents)
+            job.failed = sum(document.status == "failure" for document in job.documents)
+            if all(document.status in _FINISHED_DOCUMENT_STATUSES for document in job.documents):
+                job.status = self._finished_status(job)
+            await asyncio.to_thread(_write_job_file, self.jobs_dir / f"{job.job_id}.json", dump_output_json(job))
+
+    async def _sync_if_finished(self, job: ExtractionJob) -> None:
+        if job.status == "completed":
+            await fleet_registry.sync(await ad_registry.refresh(force=True))
+
+    async def _worker(self) -> None:
+        while True:
+            job_id, index = await self._queue.get()
+            try:
+                await self._process(self._jobs[job_id], index)
+            except Exception as e:
+                print(f"Error processing extraction job {job_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, job: ExtractionJob, index: int) -> None:
+        document = job.documents[index]
+        async with self._changing(job):
+            job.status = "running"
+            document.status = "running"
+
+        started = time.perf_counter()
+        try:
+            pdf_extractor = PDFExtractorFactory(use_cache=not job.bypass_cache)
+            text = await pdf_extractor.extract_text(document.path)
+            texts, reductions = await locate_applicability_sections({document.source: text})
+            _, statuses = await bulk_process_ads(texts, self._extractor_factory(job.bypass_cache), self.output_dir)
+        except Exception as e:
+            status, error = None, f"{type(e).__name__}: {e}"
+        else:
+            status, error = statuses[0], None
+
+        async with self._changing(job):
+            if status is None:
+                document.status = "failure"
+                document.error = error
+            else:
+                document.status = status.status
+                document.ad_id = status.ad_id
+                document.error = status.error
+                document.attempts = status.attempts
+                document.input_reduction = reductions[0] if reductions else None
+            document.elapsed_seconds = time.perf_counter() - started
+        await self._sync_if_finished(job)
+
+
+JOBS_DIR = OUTPUT_DIR / "jobs"
+
+extraction_job_queue = ExtractionJobQueue(
+    JOBS_DIR,
+    OUTPUT_DIR,
+    workers=settings.EXTRACTION_JOB_WORKERS
+)
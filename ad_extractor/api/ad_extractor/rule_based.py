@@ -0,0 +1,438 @@
+import argparse
+import asyncio
+import json
+import re
+from pathlib import Path
+from typing import Optional
+
+from pydantic import BaseModel
+
+from api.ad_extractor.ad_extractors import ADExtractor
+from api.ad_extractor.chunking import merge_applicability_rules
+from api.schema import ADDocument, ApplicabilityRules, ExcludeIfModification, MSNConstraint
+from config.config import settings
+
+
+_MONTH = r"(?:January|February|March|April|May|June|July|August|September|October|November|December)"
+_DATE = re.compile(rf"\b(?:\d{{1,2}}\s+{_MONTH}\s+\d{{4}}|{_MONTH}\s+\d{{1,2}},\s+\d{{4}})\b")
+_EFFECTIVE_DATE_LINE = re.compile(r"^Effective Date\s*:", re.IGNORECASE)
+_EFFECTIVE_ON = re.compile(rf"\beffective on\s+({_DATE.pattern})", re.IGNORECASE)
+
+_AD_NUMBER = re.compile(r"\bAD(?:\s+No\.?:?)?\s+(\d{4}-\d{2,4}(?:-\d{2})?(?:R\d+)?)\b")
+_EASA = re.compile(r"\bEASA\b")
+_FAA = re.compile(r"\b(?:FAA|Federal Aviation Administration)\b")
+_TITLE = re.compile(r"^(?:ATA \d+\b.*|Airworthiness Directives;.*)$")
+
+_APPLICABILITY_START = re.compile(r"^(?:\(c\)\s*Applicability\b|Applicability\s*:)\s*", re.IGNORECASE)
+_SECTION_END = re.compile(r"^(?:\([a-z]\)\s+[A-Z]|[A-Z][\w ,/&’'()\-]{1,60}:$|--- (?!Page \d+ ---))")
+_PAGE_MARKER = re.compile(r"^--- Page \d+ ---$")
+_PARAGRAPH = re.compile(r"^\(\d+\)\s*")
+_MAX_APPLICABILITY_LINES = 80
+
+_BLOCK_SEPARATOR = re.compile(r";\s*(?:(?:and|or)\b\s*)?")
+_MODEL_PART_END = re.compile(r",?\s*\b(?:all\s+(?:manufacturer\s+serial\s+numbers|MSN|serial\s+numbers)|MSN|serial\s+numbers?|except)\b", re.IGNORECASE)
+_MODEL = re.compile(
+    r"\b(?:[A-Z]{1,3}-?\d{2,3}[A-Z]{0,2}(?:-\d{1,3}[A-Z]{0,3})*|(?:[A-Z]{1,3} )?\d{2,3}(?:-\d{1,3}[A-Z]{0,3})+)(?![\w-])"
+    r"(?:\s*\((?=[^)]*\d)[^)]*\))?"
+)
+
+_ALL_MSN = re.compile(r"\ball\s+(?:manufacturer\s+serial\s+numbers|MSN|serial\s+numbers)\b", re.IGNORECASE)
+_MSN_RANGE = re.compile(r"\bMSN\s*(\d+)\s*(?:to|through|thru|up to(?: and including)?|-)\s*(?:MSN\s*)?(\d+)\b", re.IGNORECASE)
+_MSN_LIST = re.compile(r"\bMSN\s+((?:\d+\s*(?:,|and)\s*)*\d+)\b", re.IGNORECASE)
+_MSN_EXCEPT = re.compile(r"\bexcept\s+(?:those\s+with\s+|aeroplanes\s+with\s+|airplanes\s+with\s+)?MSN\s+((?:\d+\s*(?:,|and)\s*)*\d+)\b", re.IGNORECASE)
+_MSN_MENTION = re.compile(r"\b(?:MSN|serial numbers?)\b", re.IGNORECASE)
+
+_EXCEPT = re.compile(r"\bexcept\b", re.IGNORECASE)
+_EXEMPTION = re.compile(
+    r"\bexcept(?:\s+(?:those|aeroplanes|airplanes|aircraft))?(?:\s+(?:on\s+which|with|that\s+have|having))?\s+(?:have\s+)?"
+    r"(?P<modification>.+?)\s+(?:has|have)\s+been\s+(?:embodied|accomplished|installed|incorporated)",
+    re.IGNORECASE
+)
+_MANUFACTURER = r"(?:(?P<maker>Airbus|Boeing|ATR|Bombardier|Embraer|De Havilland)\s+)?"
+# Matched against the whole modification text, so lists of modifications are not recognized
+_MOD = re.compile(
+    rf"{_MANUFACTURER}(?:modification|mod)\.?(?:\s*\(mod\))?\s*(?:No\.?\s*)?(?P<number>\d{{3,6}})",
+    re.IGNORECASE
+)
+_SB = re.compile(
+    rf"{_MANUFACTURER}(?:Service\s+Bulletin|SB)(?:\s*\(SB\))?\s+(?P<number>[A-Z0-9]+(?:-[A-Z0-9]+)+)"
+    r"(?:\s+(?:at\s+)?Rev(?:ision)?\.?\s*(?P<revision>\d+))?",
+    re.IGNORECASE
+)
+_MODIFICATION_LIST = re.compile(r",|\b(?:and|or)\b", re.IGNORECASE)
+
+# Phrasings that restrict applicability in ways the rules below do not model
+_UNHANDLED = re.compile(
+    r"\b(?:identified in (?!paragraphs?\b)|as listed in|line numbers?|variable numbers?|group \d|prior to|"
+    r"pre-mod|post-mod|fitted with|equipped with|part numbers?|P/N|"
+    r"and (?:higher|above|up|on|onwards|subsequent)|onwards|up to (?:and including )?MSN|or (?:higher|later)|"
+    r"unless|not having|not (?:been )?(?:embodied|accomplished|installed|incorporated))\b",
+    re.IGNORECASE
+)
+# Words around the recognized phrases that carry no applicability information
+_FILLER = re.compile(
+    r"\b(?:The Boeing Company|Airbus|Boeing|ATR|Bombardier|Embraer|De Havilland|Models?|aeroplanes|airplanes|"
+    r"aircraft|all|and|certificated in any category|in (?:production|service))\b|[,.;:()]",
+    re.IGNORECASE
+)
+
+
+class RuleExtractionResult:
+    def __init__(self, ad_document: Optional[ADDocument], confidence: float, issues: list[str]) -> None:
+        self.ad_document = ad_document
+        self.confidence = confidence
+        self.issues = issues
+
+
+def _lines(text: str) -> list[str]:
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+def _msn_numbers(listing: str) -> list[int]:
+    return [int(number) for number in re.findall(r"\d+", listing)]
+
+
+def _normalize_modification(text: str) -> Optional[str]:
+    """
+        Canonical name for an exempting modification, e.g. "Airbus modification 24591" or
+        "Airbus Service Bulletin A320-57-1089 Revision 04". None if the phrasing is not recognized.
+    """
+    text = " ".join(text.split())
+    match = _MOD.fullmatch(text)
+    if match:
+        maker = f"{match.group('maker')} " if match.group("maker") else ""
+        return f"{maker}modification {match.group('number')}"
+
+    match = _SB.fullmatch(text)
+    if match:
+        maker = f"{match.group('maker')} " if match.group("maker") else ""
+        revision = f" Revision {match.group('revision')}" if match.group("revision") else ""
+        return f"{maker}Service Bulletin {match.group('number')}{revision}"
+    return None
+
+
+class ApplicabilityGrammar:
+    """
+        Parser for the standard applicability phrasing of FAA and EASA ADs:
+        model lists, "all MSN", "MSN X to Y", MSN lists and exceptions, and
+        "except those on which <mod/SB> has been embodied" exclusions per model block.
+        Every phrase it cannot account for, and any text of a model block left over
+        after the recognized phrases, lowers the confidence of the result.
+    """
+    def parse(self, text: str) -> RuleExtractionResult:
+        """
+            Method to extract an ADDocument from AD text with a confidence between 0 and 1.
+        """
+        issues: list[str] = []
+        penalty = 0.0
+        lines = _lines(text)
+
+        ad_id = self._ad_id(lines)
+        raw_applicability_text = self._applicability_text(lines)
+        if ad_id is None:
+            return RuleExtractionResult(None, 0.0, ["AD ID not found"])
+        if raw_applicability_text is None:
+            return RuleExtractionResult(None, 0.0, ["Applicability section not found"])
+
+        title = next((line for line in lines if _TITLE.match(line)), None)
+        if title is None:
+            issues.append("Title not found")
+            penalty += 0.05
+        effective_date = self._effective_date(lines)
+        if effective_date is None:
+            issues.append("Effective date not found")
+            penalty += 0.1
+
+        block_rules = []
+        msn_constraints = set()
+        for block in self._blocks(raw_applicability_text):
+            rules, block_issues, block_penalty = self._parse_block(block)
+            issues += block_issues
+            penalty += block_penalty
+            if rules is not None:
+                block_rules.append(rules)
+                # No MSN wording and "all MSN" both mean every MSN
+                constraint = rules.msn_constraints
+                msn_constraints.add(constraint.model_dump_json() if constraint and constraint != MSNConstraint() else None)
+
+        if not block_rules:
+            return RuleExtractionResult(None, 0.0, issues + ["No aircraft models found"])
+        if len(msn_constraints) > 1:
+            issues.append("MSN constraints differ between model groups")
+            penalty += 0.5
+
+        ad_document = ADDocument(
+            ad_id=ad_id,
+            title=title,
+            effective_date=effective_date,
+            applicability_rules=merge_applicability_rules(block_rules),
+            raw_applicability_text=raw_applicability_text
+        )
+        return RuleExtractionResult(ad_document, round(max(0.0, 1.0 - penalty), 2), issues)
+
+    def _ad_id(self, lines: list[str]) -> Optional[str]:
+        header = "\n".join(lines[:40])
+        if _EASA.search(header):
+            authority = "EASA"
+        elif _FAA.search(header):
+            authority = "FAA"
+        else:
+            return None
+
+        for line in lines:
+            match = _AD_NUMBER.search(line)
+            if match:
+                return f"{authority}-{match.group(1)}"
+        return None
+
+    def _effective_date(self, lines: list[str]) -> Optional[str]:
+        for line in lines:
+            if _EFFECTIVE_DATE_LINE.match(line):
+                dates = _DATE.findall(line)
+                if dates:
+                    return dates[-1]
+        for line in lines:
+            match = _EFFECTIVE_ON.search(line)
+            if match:
+                return match.group(1)
+        return None
+
+    def _applicability_text(self, lines: list[str]) -> Optional[str]:
+        """
+            Applicability paragraph text; numbered sub-paragraphs start new lines, wrapped lines are joined.
+        """
+        for index, line in enumerate(lines):
+            match = _APPLICABILITY_START.match(line)
+            if not match:
+                continue
+
+            paragraphs: list[str] = []
+            body = [line[match.end():]] + lines[index + 1:index + 1 + _MAX_APPLICABILITY_LINES]
+            for body_line in body:
+                if _PAGE_MARKER.match(body_line) or not body_line:
+                    continue
+                if _SECTION_END.match(body_line):
+                    break
+                if _PARAGRAPH.match(body_line) or not paragraphs:
+                    paragraphs.append(body_line)
+                else:
+                    paragraphs[-1] += f" {body_line}"
+            return "\n".join(paragraphs) or None
+        return None
+
+    def _blocks(self, applicability_text: str) -> list[str]:
+        blocks = []
+        for paragraph in applicability_text.splitlines():
+            paragraph = _PARAGRAPH.sub("", paragraph)
+            blocks += [block.strip() for block in _BLOCK_SEPARATOR.split(paragraph) if block.strip()]
+        return blocks
+
+    def _parse_block(self, block: str) -> tuple[Optional[ApplicabilityRules], list[str], float]:
+        issues: list[str] = []
+        penalty = 0.0
+
+        model_part_end = _MODEL_PART_END.search(block)
+        model_part = block[:model_part_end.start()] if model_part_end else block
+        restrictions = block[model_part_end.start():] if model_part_end else ""
+        models = [" ".join(match.group(0).split()) for match in _MODEL.finditer(model_part)]
+
+        unhandled = _UNHANDLED.search(block)
+        if unhandled:
+            issues.append(f"Unhandled phrase '{unhandled.group(0)}' in: {block}")
+            penalty += 0.4
+
+        if not models:
+            if restrictions:
+                issues.append(f"Restriction without aircraft models: {block}")
+                penalty += 0.3
+            return None, issues, penalty
+
+        msn_constraints, msn_issues, msn_penalty, unparsed = self._msn_constraints(restrictions)
+        issues += msn_issues
+        penalty += msn_penalty
+
+        unparsed = " ".join(_FILLER.sub(" ", f"{_MODEL.sub(' ', model_part)} {unparsed}").split())
+        if unparsed:
+            issues.append(f"Unparsed text '{unparsed}' in: {block}")
+            penalty += 0.4
+
+        exclusions = []
+        exemptions = list(_EXEMPTION.finditer(restrictions))
+        for exemption in exemptions:
+            if _MODIFICATION_LIST.search(exemption.group("modification")):
+                issues.append(f"List of exempting modifications: {exemption.group('modification')}")
+                penalty += 0.4
+                continue
+            modification = _normalize_modification(exemption.group("modification"))
+            if modification is None:
+                issues.append(f"Unrecognized exempting modification: {exemption.group('modification')}")
+                penalty += 0.3
+                continue
+            exclusions.append(ExcludeIfModification(modification=modification, applicable_models=models))
+
+        msn_exceptions = len(_MSN_EXCEPT.findall(restrictions))
+        if len(_EXCEPT.findall(restrictions)) > len(exemptions) + msn_exceptions:
+            issues.append(f"Unrecognized exception in: {block}")
+            penalty += 0.4
+
+        return ApplicabilityRules(
+            aircraft_models=models,
+            msn_constraints=msn_constraints,
+            excluded_if_modifications=exclusions
+        ), issues, penalty
+
+    def _msn_constraints(self, restrictions: str) -> tuple[Optional[MSNConstraint], list[str], float, str]:
+        """
+            "all MSN" gives an empty constraint, no MSN wording gives None.
+            Also returns the restriction text not consumed by the exemption and MSN phrases.
+        """
+        # Exemption clauses name SBs and mods whose numbers must not be read as MSNs
+        msn_text = _EXEMPTION.sub(" ", restrictions)
+        excluded = [msn for match in _MSN_EXCEPT.finditer(msn_text) for msn in _msn_numbers(match.group(1))]
+        msn_text = _MSN_EXCEPT.sub(" ", msn_text)
+
+        constraint = MSNConstraint(exclude_msns=excluded or None)
+        found = bool(excluded)
+        if _ALL_MSN.search(msn_text):
+            msn_text = _ALL_MSN.sub(" ", msn_text, count=1)
+            found = True
+
+        range_match = _MSN_RANGE.search(msn_text)
+        if range_match:
+            constraint.min_msn, constraint.max_msn = int(range_match.group(1)), int(range_match.group(2))
+            msn_text = _MSN_RANGE.sub(" ", msn_text, count=1)
+            found = True
+
+        list_match = _MSN_LIST.search(msn_text)
+        if list_match:
+            constraint.include_msns = _msn_numbers(list_match.group(1))
+            msn_text = _MSN_LIST.sub(" ", msn_text, count=1)
+            found = True
+
+        msn_text = re.sub(r"\(MSN\)", " ", msn_text)
+        if _MSN_MENTION.search(msn_text):
+            return constraint if found else None, [f"Unrecognized MSN wording in: {restrictions}"], 0.5, msn_text
+        return (constraint if found else None), [], 0.0, msn_text
+
+
+class RuleBasedADExtractor:
+    """
+        Offline ADExtractor strategy parsing standard FAA/EASA applicability phrasing.
+        Results below `min_confidence` are handed to the fallback strategy (e.g. the LLM) when one is given.
+    """
+    def __init__(
+        self,
+        fallback: Optional[ADExtractor] = None,
+        min_confidence: float = 0.8,
+        grammar: Optional[ApplicabilityGrammar] = None
+    ) -> None:
+        self._fallback = fallback
+        self.min_confidence = min_confidence
+        self._grammar = grammar or ApplicabilityGrammar()
+        fallback_model = getattr(fallback, "model", type(fallback).__name__) if fallback is not None else None
+        self.model = f"rule-based+{fallback_model}" if fallback_model else "rule-based"
+        self.rule_extracted = 0
+        self.fallbacks = 0
+
+    def parse(self, ad_text: str) -> RuleExtractionResult:
+        return self._grammar.parse(ad_text)
+
+    async def extract_ad(
+        self,
+        prompt: str | dict,
+        response_format: Optional[dict | BaseModel] = ADDocument,
+        system_context: Optional[str] = None,
+        ad_text: Optional[str | dict] = None
+    ) -> Optional[ADDocument]:
+        result = None
+        if ad_text is not None:
+            result = await asyncio.to_thread(self.parse, ad_text if isinstance(ad_text, str) else json.dumps(ad_text))
+
+        if result is not None and result.ad_document is not None and result.confidence >= self.min_confidence:
+            self.rule_extracted += 1
+            return result.ad_document
+
+        if self._fallback is None:
+            return result.ad_document if result is not None else None
+        self.fallbacks += 1
+        return await self._fallback.extract_ad(prompt, response_format, system_context, ad_text=ad_text)
+
+
+def with_rule_based_extraction(extractor: ADExtractor) -> ADExtractor:
+    """
+        Put the rule-based extractor in front of the given strategy when rule-based extraction is enabled.
+    """
+    if not settings.RULE_BASED_EXTRACTION:
+        return extractor
+    return RuleBasedADExtractor(fallback=extractor, min_confidence=settings.RULE_BASED_MIN_CONFIDENCE)
+
+
+def _stored_applicability(data: dict) -> dict:
+    rules = data.get("applicability_rules") or {}
+    exclusions = rules.get("excluded_if_modifications", rules.get("exclude_if_modification")) or []
+    return {
+        "ad_id": data.get("ad_id"),
+        "title": data.get("title"),
+        "effective_date": data.get("effective_date"),
+        "aircraft_models": rules.get("aircraft_models"),
+        "msn_constraints": rules.get("msn_constraints"),
+        "excluded_if_modifications": exclusions,
+        "raw_applicability_text": data.get("raw_applicability_text"),
+    }
+
+
+async def validate(pdf_directory: Path, output_directory: Path) -> bool:
+    """
+        Compare rule-based extraction of the PDFs with the stored (LLM) outputs, field by field.
+        Required modifications and additional conditions come from outside the applicability
+        section and are not compared.
+    """
+    from api.ad_extractor.document_extractors import PDFExtractorFactory
+    from api.ad_extractor.utils import locate_applicability_sections
+
+    texts = await PDFExtractorFactory(use_cache=False).bulk_extract(pdf_directory)
+    texts, _ = await locate_applicability_sections(texts)
+    grammar = ApplicabilityGrammar()
+    all_matched = True
+
+    for source, text in texts.items():
+        result = grammar.parse(text)
+        print(f"{source}: confidence {result.confidence:.2f}")
+        for issue in result.issues:
+            print(f"  issue: {issue}")
+        if result.ad_document is None:
+            all_matched = False
+            continue
+
+        stored_path = output_directory / f"{result.ad_document.ad_id}_parsed.json"
+        if not stored_path.exists():
+            print(f"  no stored output {stored_path.name}")
+            all_matched = False
+            continue
+
+        expected = _stored_applicability(json.loads(stored_path.read_text(encoding="utf-8")))
+        actual = _stored_applicability(json.loads(result.ad_document.model_dump_json()))
+        for field, expected_value in expected.items():
+            matched = actual[field] == expected_value
+            all_matched = all_matched and matched
+            print(f"  {'ok  ' if matched else 'DIFF'} {field}")
+            if not matched:
+                print(f"       expected: {json.dumps(expected_value)}")
+                print(f"       actual:   {json.dumps(actual[field])}")
+
+    return all_matched
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    base_dir = Path(__file__).parent.parent.parent.parent
+    parser = argparse.ArgumentParser(description="Validate the rule-based AD extractor against stored extraction outputs.")
+    parser.add_argument("--pdf-dir", type=Path, default=base_dir / "ad_docs")
+    parser.add_argument("--output-dir", type=Path, default=base_dir / "output")
+    args = parser.parse_args(argv)
+
+    if not asyncio.run(validate(args.pdf_dir, args.output_dir)):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+import asyncio
+import random
+import time
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import openai
+
+from api.ad_extractor.schema import DocumentExtractionStatus
+from api.schema import ADDocument
+from config.config import settings
+
+
+T = TypeVar("T")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+        Rough token estimate (~4 characters per token for English text).
+    """
+    return max(1, len(text) // 4)
+
+
+class TokenBucket:
+    """
+        Token bucket refilled continuously at `rate_per_minute`.
+    """
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None) -> None:
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive.")
+        self._rate = rate_per_minute / 60.0
+        self._capacity = capacity or rate_per_minute
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1) -> None:
+        amount = min(amount, self._capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+
+                await asyncio.sleep((amount - self._tokens) / self._rate)
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, openai.RateLimitError):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code >= 500
+    return isinstance(error, openai.APIConnectionError)
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class _DocumentRun:
+    """
+        Scheduler and LLM request count of the document being extracted in the current task.
+    """
+    __slots__ = ("scheduler", "requests")
+
+    def __init__(self, scheduler: "ExtractionScheduler") -> None:
+        self.scheduler = scheduler
+        self.requests = 0
+
+
+# Set by ExtractionScheduler.run for each document; copied into the tasks extracting its chunks
+_document_run: ContextVar[Optional[_DocumentRun]] = ContextVar("extraction_document_run", default=None)
+
+
+async def scheduled_llm_request(request: Callable[[], Awaitable[T]], estimated_tokens: int) -> T:
+    """
+        Send one LLM request through the scheduler of the document being extracted.
+        Requests made outside ExtractionScheduler.run (e.g. single extractions) are sent directly.
+    """
+    document_run = _document_run.get()
+    if document_run is None:
+        return await request()
+    return await document_run.scheduler.request(request, estimated_tokens, document_run)
+
+
+class ExtractionScheduler:
+    """
+        Runs extractions with bounded LLM concurrency, request/token-per-minute limits and
+        jittered exponential backoff on 429 and 5xx responses. The limits are charged per LLM
+        request (see `scheduled_llm_request`), so documents answered from the cache or by the
+        rule-based extractor cost nothing and chunked documents cost one request per chunk.
+    """
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+    ) -> None:
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._request_bucket = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self._token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self._max_retries = max_retries
+        self._backoff_base = backoff_base
+        self._backoff_max = backoff_max
+
+    async def _wait_for_capacity(self, estimated_tokens: int) -> None:
+        if self._request_bucket is not None:
+            await self._request_bucket.acquire(1)
+        if self._token_bucket is not None:
+            await self._token_bucket.acquire(estimated_tokens)
+
+    async def request(
+        self,
+        request: Callable[[], Awaitable[T]],
+        estimated_tokens: int,
+        document_run: Optional[_DocumentRun] = None
+    ) -> T:
+        """
+            Method to send one LLM request within the limits, retrying 429 and 5xx responses.
+            The last error is raised once `max_retries` is exhausted.
+        """
+        attempts = 0
+        while True:
+            attempts += 1
+            if document_run is not None:
+                document_run.requests += 1
+
+            async with self._semaphore:
+                await self._wait_for_capacity(estimated_tokens)
+                try:
+                    return await request()
+                except Exception as e:
+                    if not _is_retryable(e) or attempts > self._max_retries:
+                        raise
+                    backoff = random.uniform(0, min(self._backoff_max, self._backoff_base * 2 ** (attempts - 1)))
+                    retry_after = _retry_after(e)
+                    if retry_after is not None:
+                        backoff = max(backoff, retry_after)
+            await asyncio.sleep(backoff)
+
+    async def _run_one(
+        self,
+        source: str,
+        text: str,
+        process: Callable[[str], Awaitable[Optional[ADDocument]]],
+    ) -> tuple[DocumentExtractionStatus, Optional[ADDocument]]:
+        started = time.perf_counter()
+        document_run = _DocumentRun(self)
+        token = _document_run.set(document_run)
+        try:
+            ad_document = await process(text)
+        except Exception as e:
+            return DocumentExtractionStatus(
+                source=source,
+                status="failure",
+                error=f"{type(e).__name__}: {e}",
+                attempts=document_run.requests,
+                elapsed_seconds=time.perf_counter() - started
+            ), None
+        finally:
+            _document_run.reset(token)
+
+        if ad_document is None:
+            return DocumentExtractionStatus(
+                source=source,
+                status="failure",
+                error="LLM response could not be parsed as an ADDocument",
+                attempts=document_run.requests,
+                elapsed_seconds=time.perf_counter() - started
+            ), None
+
+        return DocumentExtractionStatus(
+            source=source,
+            status="success",
+            ad_id=ad_document.ad_id,
+            attempts=document_run.requests,
+            elapsed_seconds=time.perf_counter() - started
+        ), ad_document
+
+    async def run(
+        self,
+        texts: dict[str, str],
+        process: Callable[[str], Awaitable[Optional[ADDocument]]],
+    ) -> list[tuple[DocumentExtractionStatus, Optional[ADDocument]]]:
+        """
+            Method to process all texts concurrently. Results are returned in input order.
+        """
+        return await asyncio.gather(*(
+            self._run_one(source, text, process)
+            for source, text in texts.items()
+        ))
+
+
+_extraction_scheduler: Optional[ExtractionScheduler] = None
+
+
+def get_extraction_scheduler() -> ExtractionScheduler:
+    """
+        Get the process-wide scheduler so that rate limits are shared across requests.
+    """
+    global _extraction_scheduler
+    if _extraction_scheduler is None:
+        _extraction_scheduler = ExtractionScheduler(
+            max_concurrency=settings.LLM_MAX_CONCURRENCY,
+            requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+            tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+            max_retries=settings.LLM_MAX_RETRIES,
+        )
+    return _extraction_scheduler
@@ -4,6 +4,70 @@ from pydantic import BaseModel, Field
 from api.schema import ADDocument
 
 
+class DocumentExtractionStatus(BaseModel):
+    source: str = Field(..., description="Source of the extracted text (e.g. PDF file name)")
+    status: str = Field(..., description="Extraction status: 'success' or 'failure'")
+    ad_id: Optional[str] = Field(None, description="Extracted AD identifier on success")
+    error: Optional[str] = Field(None, description="Error message on failure")
+    attempts: int = Field(1, description="Number of LLM requests made for this document")
+    elapsed_seconds: Optional[float] = Field(None, description="Wall time spent on this document")
+
+
+class InputReductionReport(BaseModel):
+    source: str = Field(..., description="Source of the extracted text (e.g. PDF file name)")
+    original_tokens: int = Field(..., description="Estimated tokens of the full extracted text")
+    reduced_tokens: int = Field(..., description="Estimated tokens sent to the LLM")
+    reduction_ratio: float = Field(..., description="Fraction of input tokens removed")
+    sections_found: list[str] = Field(default_factory=list, description="Sections located in the document")
+    pages_read: int = Field(..., description="Pages scanned before all required sections were found")
+    fallback_to_full_text: bool = Field(False, description="True if no applicability section was found and the full text was kept")
+
+
 class ADExtractionResponse(BaseModel):
     status: str = Field(..., description="Extraction status: 'success' or 'failure'")
-    extracted_ads: Optional[list[ADDocument]] = Field(None, description="Parsed AD document as a list")
\ No newline at end of file
+    extracted_ads: Optional[list[ADDocument]] = Field(None, description="Parsed AD document as a list")
+    extraction_timings: Optional[dict[str, float]] = Field(None, description="PDF text extraction time in seconds per file")
+    documents: Optional[list[DocumentExtractionStatus]] = Field(None, description="Per-document extraction status")
+    input_reduction: Optional[list[InputReductionReport]] = Field(None, description="LLM input size reduction per document")
+
+class ADListResponse(BaseModel):
+    status: str = Field(..., description="Listing status: 'success' or a description of why no ADs were returned")
+    total: int = Field(0, description="Number of ADs matching the filters")
+    offset: int = Field(0, description="Index of the first AD in this page")
+    limit: int = Field(..., description="Maximum number of ADs in this page")
+    extracted_ads: list[ADDocument] = Field(default_factory=list, description="Page of parsed AD documents ordered by AD ID")
+
+
+class ExtractionJobRequest(BaseModel):
+    pdf_directory: Optional[str] = Field(None, description="Directory whose PDF files should be extracted")
+    files: Optional[list[str]] = Field(None, description="PDF files to extract")
+    bypass_cache: bool = Field(False, description="Skip the PDF text and LLM extraction caches")
+
+
+class ExtractionJobDocument(BaseModel):
+    source: str = Field(..., description="Source of the extracted text (e.g. PDF file name)")
+    path: str = Field(..., description="Absolute path of the PDF file")
+    status: str = Field("pending", description="Document status: 'pending', 'running', 'success' or 'failure'")
+    ad_id: Optional[str] = Field(None, description="Extracted AD identifier on success")
+    error: Optional[str] = Field(None, description="Error message on failure")
+    attempts: int = Field(0, description="Number of LLM requests made for this document")
+    elapsed_seconds: Optional[float] = Field(None, description="Wall time spent on this document")
+    input_reduction: Optional[InputReductionReport] = Field(None, description="LLM input size reduction for this document")
+
+
+class ExtractionJob(BaseModel):
+    job_id: str = Field(..., description="Job identifier")
+    status: str = Field("queued", description="Job status: 'queued', 'running', 'completed' or 'failed' (no document could be extracted)")
+    created_at: float = Field(..., description="Submission time (Unix seconds)")
+    updated_at: float = Field(..., description="Time of the last document status change (Unix seconds)")
+    bypass_cache: bool = Field(False, description="Skip the PDF text and LLM extraction caches")
+    total: int = Field(0, description="Number of documents in the job")
+    succeeded: int = Field(0, description="Documents extracted successfully")
+    failed: int = Field(0, description="Documents that could not be extracted")
+    documents: list[ExtractionJobDocument] = Field(default_factory=list, description="Per-document progress")
+
+
+class ExtractionJobResponse(BaseModel):
+    status: str = Field(..., description="'success' or a description of why no job was returned")
+    job: Optional[ExtractionJob] = Field(None, description="Job state and per-document progress")
+    extracted_ads: Optional[list[ADDocument]] = Field(None, description="ADs extracted by the job so far")
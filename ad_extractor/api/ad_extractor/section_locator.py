@@ -0,0 +1,200 @@
+import re
+from typing import Iterable, Iterator, Optional
+
+from api.ad_extractor.scheduler import estimate_tokens
+from api.ad_extractor.schema import InputReductionReport
+
+
+_PAGE_MARKER = re.compile(r"^--- Page (\d+) ---$", re.MULTILINE)
+
+# Paragraph headings of FAA ADs, e.g. "(c) Applicability"
+_FAA_HEADING = re.compile(r"^\([a-z]\)\s+[A-Z]")
+# Block headings of EASA ADs and FAA preambles, e.g. "Applicability:", "DATES:"
+_BLOCK_HEADING = re.compile(r"^[A-Z][\w ,/&’'()\-]{1,60}:$")
+
+# Page numbers in running headers/footers, e.g. "Page 3 of 7" or a lone "3/7"
+_PAGE_NUMBER = re.compile(r"\bpage\s*\d+(?:\s*(?:of|/)\s*\d+)?\b|^\d+(?:\s*/\s*\d+)?$", re.IGNORECASE)
+
+_AD_ID = re.compile(r"\bAD(?:\s+No\.?:?)?\s+\d{4}-\d{2,4}(?:-\d{2})?(?:R\d+)?\b")
+
+
+class _SectionRule:
+    """
+        A section starts at a line matching `start` and ends at the next section heading,
+        or after `max_lines` lines when a cap is given.
+    """
+    def __init__(self, name: str, start: str, max_lines: Optional[int]) -> None:
+        self.name = name
+        self.start = re.compile(start, re.IGNORECASE)
+        self.max_lines = max_lines
+
+
+_SECTION_RULES = [
+    # Not capped: long MSN and service bulletin lists in the applicability are needed for extraction
+    _SectionRule("Applicability", r"^(?:\(c\)\s*Applicability\b|Applicability\s*:)", None),
+    _SectionRule("Effective Date", r"^(?:\(a\)\s*Effective Date\b|Effective Date\s*:|DATES\s*:)", 8),
+    _SectionRule("Exclusions", r"^(?:\([a-z]\)\s*Exclusions?\b|Exclusions?\s*:)", 40),
+    _SectionRule("Subject", r"^ATA \d+\b", 1),
+]
+
+_REQUIRED_SECTIONS = {"Applicability", "Effective Date"}
+
+
+def _normalize_edge_line(line: str) -> str:
+    return _PAGE_NUMBER.sub("#", line.strip())
+
+
+def iter_pages(text: str) -> Iterator[tuple[int, str]]:
+    """
+        Lazily split `--- Page N ---` formatted text into (page number, page text).
+    """
+    markers = list(_PAGE_MARKER.finditer(text))
+    if not markers:
+        yield 1, text
+        return
+
+    for index, marker in enumerate(markers):
+        end = markers[index + 1].start() if index + 1 < len(markers) else len(text)
+        yield int(marker.group(1)), text[marker.end():end].strip("\n")
+
+
+class LocatedSections:
+    def __init__(
+        self,
+        text: str,
+        sections_found: list[str],
+        pages_read: int,
+        complete: bool
+    ) -> None:
+        self.text = text
+        self.sections_found = sections_found
+        self.pages_read = pages_read
+        self.complete = complete
+
+
+class ApplicabilityLocator:
+    """
+        Heuristic locator of the parts of an AD the extractor needs: the
+        identification header, applicability (including exclusions), effective
+        date and subject. Repeated page headers/footers are kept only once, and
+        pages are no longer scanned once every required section has been found.
+
+        The locator works on already extracted text: pdfplumber still parses every
+        page of the PDF first, so stopping early saves scanning and LLM input, not
+        PDF parsing. The full text is kept for the fallback when no applicability
+        section is found.
+    """
+    def __init__(self, header_lines: int = 15, edge_lines: int = 4) -> None:
+        self.header_lines = header_lines
+        self.edge_lines = edge_lines
+
+    def locate_pages(self, pages: Iterable[tuple[int, str]]) -> LocatedSections:
+        # Captured lines carry whether they sit at a page edge, where running headers/footers are
+        captured: list[tuple[str, int, list[tuple[str, bool]]]] = []
+        closed: set[str] = set()
+        active: Optional[tuple[_SectionRule, list[tuple[str, bool]]]] = None
+        has_id = False
+        pages_read = 0
+        edge_line_counts: dict[str, int] = {}
+
+        def close_active() -> None:
+            nonlocal active
+            if active is not None:
+                closed.add(active[0].name)
+                active = None
+
+        for page_num, page_text in pages:
+            pages_read += 1
+            lines = [line.strip() for line in page_text.splitlines() if line.strip()]
+            edge_positions = set(range(min(self.edge_lines, len(lines)))) | set(range(max(len(lines) - self.edge_lines, 0), len(lines)))
+            for normalized in {_normalize_edge_line(lines[position]) for position in edge_positions}:
+                edge_line_counts[normalized] = edge_line_counts.get(normalized, 0) + 1
+
+            if pages_read == 1:
+                header = [(line, position in edge_positions) for position, line in enumerate(lines[:self.header_lines])]
+                captured.append(("Header", page_num, header))
+                has_id = any(_AD_ID.search(line) for line, _ in header)
+
+            for position, line in enumerate(lines):
+                if active is not None:
+                    rule, section_lines = active
+                    at_cap = rule.max_lines is not None and len(section_lines) >= rule.max_lines
+                    if _FAA_HEADING.match(line) or _BLOCK_HEADING.match(line) or at_cap:
+                        close_active()
+                    else:
+                        section_lines.append((line, position in edge_positions))
+                        continue
+
+                for rule in _SECTION_RULES:
+                    if rule.name in closed or not rule.start.match(line):
+                        continue
+                    section_lines = [(line, position in edge_positions)]
+                    captured.append((rule.name, page_num, section_lines))
+                    active = (rule, section_lines)
+                    if rule.max_lines is not None and rule.max_lines <= 1:
+                        close_active()
+                    break
+
+                if not has_id and _AD_ID.search(line):
+                    captured.append(("Identification", page_num, [(line, position in edge_positions)]))
+                    has_id = True
+
+            if has_id and _REQUIRED_SECTIONS <= closed:
+                break
+
+        complete = "Applicability" in closed or (active is not None and active[0].name == "Applicability")
+        repeated_edge_lines = {line for line, count in edge_line_counts.items() if count > 1}
+        return LocatedSections(
+            text=self._render(captured, repeated_edge_lines),
+            sections_found=[name for name, _, _ in captured],
+            pages_read=pages_read,
+            complete=complete
+        )
+
+    def _render(self, captured: list[tuple[str, int, list[tuple[str, bool]]]], repeated_edge_lines: set[str]) -> str:
+        """
+            Join captured sections, keeping repeated page headers/footers only once.
+            Only lines at a page edge are treated as headers/footers.
+        """
+        seen_edge_lines: set[str] = set()
+        blocks = []
+
+        for name, page_num, lines in captured:
+            kept = []
+            for line, at_edge in lines:
+                normalized = _normalize_edge_line(line)
+                if at_edge and normalized in repeated_edge_lines:
+                    if normalized in seen_edge_lines:
+                        continue
+                    seen_edge_lines.add(normalized)
+                kept.append(line)
+            if kept:
+                blocks.append(f"--- {name} (page {page_num}) ---\n" + "\n".join(kept))
+
+        return "\n\n".join(blocks)
+
+    def locate_text(self, text: str) -> LocatedSections:
+        """
+            Method to locate the relevant sections in `--- Page N ---` formatted text.
+        """
+        return self.locate_pages(iter_pages(text))
+
+    def reduce(self, source: str, text: str) -> tuple[str, InputReductionReport]:
+        """
+            Method to shrink AD text to the located sections.
+            Falls back to the full text when no applicability section is found.
+        """
+        located = self.locate_text(text)
+        reduced = located.text if located.complete else text
+
+        original_tokens = estimate_tokens(text)
+        reduced_tokens = estimate_tokens(reduced)
+        return reduced, InputReductionReport(
+            source=source,
+            original_tokens=original_tokens,
+            reduced_tokens=reduced_tokens,
+            reduction_ratio=1 - reduced_tokens / original_tokens if original_tokens else 0.0,
+            sections_found=located.sections_found,
+            pages_read=located.pages_read,
+            fallback_to_full_text=not located.complete
+        )
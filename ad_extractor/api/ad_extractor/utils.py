@@ -1,9 +1,18 @@
+import asyncio
 from pathlib import Path
 from typing import Dict, Optional
 
-from api.ad_extractor.ad_extractors import ADExtractorFactory, OpenAIADExtractor
-from api.ad_extractor.document_extractors import PDFExtractorFactory
+from api.ad_extractor.ad_extractors import ADExtractorFactory
+from api.ad_extractor.scheduler import ExtractionScheduler, get_extraction_scheduler
+from api.ad_extractor.schema import DocumentExtractionStatus, InputReductionReport
+from api.ad_extractor.section_locator import ApplicabilityLocator
+from api.ad_store import get_ad_store
+from api.evaluator.evaluator import AircraftEvaluator
+from api.metrics import metrics
+from api.registry import ADCorpusSnapshot
 from api.schema import ADDocument
+from api.utils import dump_output_json
+from config.config import settings
 
 
 async def get_output_directory(base_dir: Path) -> Path:
@@ -15,16 +24,42 @@ async def get_output_directory(base_dir: Path) -> Path:
     return output_directory
 
 
+async def locate_applicability_sections(
+    extracted_texts: Dict[str, str],
+    locator: Optional[ApplicabilityLocator] = None
+) -> tuple[Dict[str, str], list[InputReductionReport]]:
+    """
+        Shrink each extracted text to the sections needed for AD extraction before it is sent to the LLM.
+    """
+    if not settings.LOCATE_APPLICABILITY_SECTIONS:
+        return extracted_texts, []
+
+    locator = locator or ApplicabilityLocator()
+    reduced_texts = {}
+    reports = []
+    for source, text in extracted_texts.items():
+        with metrics.stage("section_locate"):
+            reduced_texts[source], report = locator.reduce(source, text)
+        reports.append(report)
+    return reduced_texts, reports
+
+
 async def save_ad_document(
         ad_document: ADDocument, 
         output_directory: Path
 ) -> Path:
     """
-        Save the ADDocument as a JSON file in the specified output directory.
+        Save the ADDocument as a JSON file in the specified output directory,
+        or into the SQLite AD store when that backend is configured.
     """
-    output_path = output_directory / f"{ad_document.ad_id}_parsed.json"
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(ad_document.model_dump_json(indent=4))
+    store = get_ad_store()
+    with metrics.stage("ad_save"):
+        if store is not None:
+            await store.save(ad_document)
+            return store.db_path
+
+        output_path = output_directory / f"{ad_document.ad_id}_parsed.json"
+        await asyncio.to_thread(output_path.write_bytes, dump_output_json(ad_document, indent=4))
     return output_path
 
 
@@ -48,19 +83,59 @@ async def process_and_save_ad(
 async def bulk_process_ads(
     extracted_texts: Dict[str, str],
     ad_extractor: ADExtractorFactory,
-    output_directory: Path
-) -> Optional[Dict[str, ADDocument]]:
+    output_directory: Path,
+    scheduler: Optional[ExtractionScheduler] = None
+) -> tuple[Optional[Dict[str, ADDocument]], list[DocumentExtractionStatus]]:
     """
-        Process and save multiple AD texts to ADDocument instances.
+        Process and save multiple AD texts to ADDocument instances concurrently.
+        Returns the extracted documents and a status entry for every input text.
     """
+    scheduler = scheduler or get_extraction_scheduler()
+    outcomes = await scheduler.run(
+        extracted_texts,
+        lambda text: process_and_save_ad(text, ad_extractor, output_directory)
+    )
+
     ad_documents = {}
-    
-    for text in extracted_texts.values():
-        ad_document = await process_and_save_ad(text, ad_extractor, output_directory)
+    statuses = []
+    for status, ad_document in outcomes:
+        statuses.append(status)
         if ad_document:
             ad_documents[ad_document.ad_id] = ad_document
-    
+
     if not ad_documents:
-        return None
+        return None, statuses
+
+    return ad_documents, statuses
+
+
+async def list_ad_documents(
+    snapshot: ADCorpusSnapshot,
+    aircraft_model: Optional[str] = None,
+    msn: Optional[int] = None,
+    offset: int = 0,
+    limit: int = 50
+) -> tuple[list[ADDocument], int]:
+    """
+        Page of ADs ordered by AD ID, optionally restricted to ADs touching a model and/or an MSN.
+        Uses the indexed SQLite query when that backend is configured, otherwise filters the snapshot.
+    """
+    store = get_ad_store()
+    if store is not None:
+        return await store.query(aircraft_model, msn, offset, limit)
+
+    evaluator = AircraftEvaluator()
+    matching = []
+    for ad_id in sorted(snapshot.ads):
+        rules = snapshot.ads[ad_id].applicability_rules
+        if aircraft_model is not None:
+            model_matched, _ = await evaluator._check_model_match(aircraft_model, rules.aircraft_models)
+            if not model_matched:
+                continue
+        if msn is not None:
+            msn_passed, _ = await evaluator._check_msn_constraints(msn, rules.msn_constraints)
+            if not msn_passed:
+                continue
+        matching.append(snapshot.ads[ad_id])
 
-    return ad_documents
+    return matching[offset:offset + limit], len(matching)
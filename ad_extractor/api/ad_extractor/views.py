@@ -1,39 +1,82 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Query
+from openai import AsyncOpenAI
 from pathlib import Path
-
-from api.ad_extractor.schema import ADExtractionResponse
+from typing import Optional
+
+from api.ad_extractor.schema import (
+    ADExtractionResponse,
+    ADListResponse,
+    ExtractionJob,
+    ExtractionJobRequest,
+    ExtractionJobResponse
+)
 from api.ad_extractor.ad_extractors import ADExtractorFactory, OpenAIADExtractor
+from api.ad_extractor.cache import get_content_cache
 from api.ad_extractor.document_extractors import PDFExtractorFactory
+from api.ad_extractor.rule_based import with_rule_based_extraction
+from api.ad_extractor.jobs import extraction_job_queue
 from api.ad_extractor.utils import (
     get_output_directory,
+    list_ad_documents,
+    locate_applicability_sections,
     process_and_save_ad,
     bulk_process_ads
 )
+from api.evaluator.fleet_registry import fleet_registry
+from api.llm_client import get_llm_client
+from api.registry import ADCorpusSnapshot, ad_registry, get_ad_snapshot
 from config.config import settings
 
 router = APIRouter()
 
 
+def get_ad_extractor_factory(
+    bypass_cache: bool = False,
+    client: AsyncOpenAI = Depends(get_llm_client)
+) -> ADExtractorFactory:
+    return ADExtractorFactory(
+        extractor_strategy=with_rule_based_extraction(OpenAIADExtractor(api_key=settings.LLM_API_KEY.get_secret_value(), base_url=settings.BASE_URL, client=client)),
+        cache=None if bypass_cache else get_content_cache(),
+        chunk_tokens=settings.EXTRACTION_CHUNK_TOKENS
+    )
+
+
+def get_bulk_ad_extractor_factory(
+    bypass_cache: bool = False,
+    client: AsyncOpenAI = Depends(get_llm_client)
+) -> ADExtractorFactory:
+    """
+        Extractor for bulk runs; retries are handled by the extraction scheduler instead of the client.
+    """
+    return ADExtractorFactory(
+        extractor_strategy=with_rule_based_extraction(OpenAIADExtractor(api_key=settings.LLM_API_KEY.get_secret_value(), base_url=settings.BASE_URL, max_retries=0, client=client)),
+        cache=None if bypass_cache else get_content_cache(),
+        chunk_tokens=settings.EXTRACTION_CHUNK_TOKENS
+    )
+
+
 @router.post(
         "/extraction_test",
         description="Run extraction test based on assignment specifications",
         tags=["Assignment"]
     )
-async def extraction_test() -> ADExtractionResponse:
-    pdf_extractor = PDFExtractorFactory()
-    ad_extractor = ADExtractorFactory(
-        extractor_strategy=OpenAIADExtractor(api_key=settings.LLM_API_KEY.get_secret_value(), base_url=settings.BASE_URL)
-    )
+async def extraction_test(
+    bypass_cache: bool = False,
+    ad_extractor: ADExtractorFactory = Depends(get_bulk_ad_extractor_factory)
+) -> ADExtractionResponse:
+    pdf_extractor = PDFExtractorFactory(use_cache=not bypass_cache)
 
     base_dir = Path(__file__).parent.parent.parent.parent
     pdf_directory = base_dir / "ad_docs"
     output_directory = await get_output_directory(base_dir)
     
     extracted_texts = await pdf_extractor.bulk_extract(pdf_directory)
-    ad_documents = await bulk_process_ads(extracted_texts, ad_extractor, output_directory)
+    extracted_texts, reductions = await locate_applicability_sections(extracted_texts)
+    ad_documents, statuses = await bulk_process_ads(extracted_texts, ad_extractor, output_directory)
+    await fleet_registry.sync(await ad_registry.refresh(force=True))
     
     if not ad_documents:
-        return ADExtractionResponse(status="failure")
+        return ADExtractionResponse(status="failure", extraction_timings=pdf_extractor.timings, documents=statuses, input_reduction=reductions)
 
     extracted_ads = []
     for ad_doc in ad_documents.values():
@@ -41,7 +84,10 @@ async def extraction_test() -> ADExtractionResponse:
 
     return ADExtractionResponse(
         status="success",
-        extracted_ads=extracted_ads
+        extracted_ads=extracted_ads,
+        extraction_timings=pdf_extractor.timings,
+        documents=statuses,
+        input_reduction=reductions
     )
 
 
@@ -49,45 +95,52 @@ async def extraction_test() -> ADExtractionResponse:
         "/path/{pdf_path}",
         description="Extract ADs from single pdf path"
     )
-async def extract_ad_from_path(pdf_path: str) -> ADExtractionResponse:
-    pdf_extractor = PDFExtractorFactory()
-    ad_extractor = ADExtractorFactory(
-        extractor_strategy=OpenAIADExtractor(api_key=settings.LLM_API_KEY.get_secret_value(), base_url=settings.BASE_URL)
-    )
+async def extract_ad_from_path(
+    pdf_path: str,
+    bypass_cache: bool = False,
+    ad_extractor: ADExtractorFactory = Depends(get_ad_extractor_factory)
+) -> ADExtractionResponse:
+    pdf_extractor = PDFExtractorFactory(use_cache=not bypass_cache)
 
     base_dir = Path(__file__).parent.parent.parent.parent
     output_directory = await get_output_directory(base_dir)
     
+    source = Path(pdf_path).name
     extracted_text = await pdf_extractor.extract_text(pdf_path)
-    filename = Path(pdf_path).stem
-    ad_document = await process_and_save_ad(extracted_text, filename, ad_extractor, output_directory)
+    reduced_texts, reductions = await locate_applicability_sections({source: extracted_text})
+    ad_document = await process_and_save_ad(reduced_texts[source], ad_extractor, output_directory)
+    await fleet_registry.sync(await ad_registry.refresh(force=True))
 
     if not ad_document:
-        return ADExtractionResponse(status="failure")
+        return ADExtractionResponse(status="failure", input_reduction=reductions)
     
     return ADExtractionResponse(
         status="success",
-        extracted_ads=[ad_document]
+        extracted_ads=[ad_document],
+        input_reduction=reductions
     )
 
 @router.post(
     "/directory/{pdf_directory}",
     description="Extract ADs from all PDF files in a specified directory"
 )
-async def extract_ads_from_directory(pdf_directory: str) -> ADExtractionResponse:
-    pdf_extractor = PDFExtractorFactory()
-    ad_extractor = ADExtractorFactory(
-        extractor_strategy=OpenAIADExtractor(api_key=settings.LLM_API_KEY.get_secret_value(), base_url=settings.BASE_URL)
-    )
+async def extract_ads_from_directory(
+    pdf_directory: str,
+    bypass_cache: bool = False,
+    ad_extractor: ADExtractorFactory = Depends(get_bulk_ad_extractor_factory)
+) -> ADExtractionResponse:
+    pdf_extractor = PDFExtractorFactory(use_cache=not bypass_cache)
 
     base_dir = Path(__file__).parent.parent.parent.parent
     output_directory = await get_output_directory(base_dir)
     
     extracted_texts = await pdf_extractor.bulk_extract(pdf_directory)
-    ad_documents = await bulk_process_ads(extracted_texts, ad_extractor, output_directory)
+    extracted_texts, reductions = await locate_applicability_sections(extracted_texts)
+    ad_documents, statuses = await bulk_process_ads(extracted_texts, ad_extractor, output_directory)
+    await fleet_registry.sync(await ad_registry.refresh(force=True))
     
     if not ad_documents:
-        return ADExtractionResponse(status="failure")
+        return ADExtractionResponse(status="failure", extraction_timings=pdf_extractor.timings, documents=statuses, input_reduction=reductions)
     
     extracted_ads = []
     for ad_doc in ad_documents.values():
@@ -95,7 +148,10 @@ async def extract_ads_from_directory(pdf_directory: str) -> ADExtractionResponse
     
     return ADExtractionResponse(
         status="success",
-        extracted_ads=extracted_ads
+        extracted_ads=extracted_ads,
+        extraction_timings=pdf_extractor.timings,
+        documents=statuses,
+        input_reduction=reductions
     )
 
 
@@ -104,15 +160,8 @@ async def extract_ads_from_directory(pdf_directory: str) -> ADExtractionResponse
         description="Read all existing extracted AD JSON files"
     )
 async def list_all_extracted_ads() -> ADExtractionResponse:
-    base_dir = Path(__file__).parent.parent.parent.parent
-    output_directory = await get_output_directory(base_dir)
-    
-    extracted_ads = []
-    for json_file in output_directory.glob("*_parsed.json"):
-        import json
-        with open(json_file, "r", encoding="utf-8") as f:
-            ad_data = json.load(f)
-            extracted_ads.append(ad_data)
+    snapshot = await ad_registry.refresh()
+    extracted_ads = list(snapshot.ad_list)
 
     if extracted_ads == []:
         return ADExtractionResponse(status="No files found")
@@ -121,4 +170,79 @@ async def list_all_extracted_ads() -> ADExtractionResponse:
     return ADExtractionResponse(
         status="success",
         extracted_ads=extracted_ads
-    )
\ No newline at end of file
+    )
+
+
+@router.get(
+        "/ads",
+        description="List parsed ADs a page at a time, optionally only those touching an aircraft model and/or MSN"
+    )
+async def list_extracted_ads(
+    aircraft_model: Optional[str] = None,
+    msn: Optional[int] = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    snapshot: ADCorpusSnapshot = Depends(get_ad_snapshot)
+) -> ADListResponse:
+    ad_documents, total = await list_ad_documents(snapshot, aircraft_model, msn, offset, limit)
+
+    if total == 0:
+        return ADListResponse(status="No ADs found", offset=offset, limit=limit)
+
+    return ADListResponse(
+        status="success",
+        total=total,
+        offset=offset,
+        limit=limit,
+        extracted_ads=ad_documents
+    )
+
+
+@router.post(
+        "/jobs",
+        description="Queue extraction of a PDF directory or a list of PDF files in the background and return the job ID immediately"
+    )
+async def submit_extraction_job(request: ExtractionJobRequest) -> ExtractionJobResponse:
+    pdf_files = [Path(pdf_file) for pdf_file in request.files or []]
+    if request.pdf_directory is not None:
+        pdf_directory = Path(request.pdf_directory)
+        if not pdf_directory.is_dir():
+            return ExtractionJobResponse(status=f"Not a directory: {pdf_directory}")
+        pdf_files += sorted(pdf_directory.glob("*.pdf"))
+
+    if not pdf_files:
+        return ExtractionJobResponse(status="No PDF files found")
+
+    job = await extraction_job_queue.submit(pdf_files, bypass_cache=request.bypass_cache)
+    return ExtractionJobResponse(status="success", job=job)
+
+
+@router.get(
+        "/jobs",
+        description="List extraction jobs, most recent first"
+    )
+async def list_extraction_jobs() -> list[ExtractionJob]:
+    return extraction_job_queue.list_jobs()
+
+
+@router.get(
+        "/jobs/{job_id}",
+        description="Poll an extraction job's per-document progress, optionally with the ADs extracted so far"
+    )
+async def get_extraction_job(
+    job_id: str,
+    include_results: bool = False,
+    snapshot: ADCorpusSnapshot = Depends(get_ad_snapshot)
+) -> ExtractionJobResponse:
+    job = extraction_job_queue.get(job_id)
+    if job is None:
+        return ExtractionJobResponse(status="Job not found")
+
+    if not include_results:
+        return ExtractionJobResponse(status="success", job=job)
+
+    extracted_ads = [
+        snapshot.ads[document.ad_id] for document in job.documents
+        if document.ad_id is not None and document.ad_id in snapshot.ads
+    ]
+    return ExtractionJobResponse(status="success", job=job, extracted_ads=extracted_ads)
@@ -0,0 +1,311 @@
+"""
+    SQLite storage backend for parsed ADs.
+
+    Import the existing `*_parsed.json` outputs once with:
+        python -m api.ad_store [--output-dir ../output] [--db ../output/ads.sqlite3]
+"""
+import argparse
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from api.evaluator.model_index import normalize_model_name
+from api.schema import ADDocument
+from config.config import settings
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ads (
+    ad_id TEXT PRIMARY KEY,
+    document TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ad_models (
+    ad_id TEXT NOT NULL REFERENCES ads(ad_id) ON DELETE CASCADE,
+    normalized_model TEXT NOT NULL,
+    PRIMARY KEY (ad_id, normalized_model)
+);
+CREATE INDEX IF NOT EXISTS ad_models_by_model ON ad_models (normalized_model, ad_id);
+CREATE TABLE IF NOT EXISTS ad_msn_constraints (
+    ad_id TEXT PRIMARY KEY REFERENCES ads(ad_id) ON DELETE CASCADE,
+    has_include_list INTEGER NOT NULL,
+    min_msn INTEGER,
+    max_msn INTEGER
+);
+CREATE INDEX IF NOT EXISTS ad_msn_constraints_by_range ON ad_msn_constraints (min_msn, max_msn);
+CREATE TABLE IF NOT EXISTS ad_msns (
+    ad_id TEXT NOT NULL REFERENCES ads(ad_id) ON DELETE CASCADE,
+    kind TEXT NOT NULL CHECK (kind IN ('include', 'exclude')),
+    msn INTEGER NOT NULL,
+    PRIMARY KEY (ad_id, kind, msn)
+);
+CREATE INDEX IF NOT EXISTS ad_msns_by_msn ON ad_msns (msn, kind, ad_id);
+"""
+
+_INT64_MIN = -(2 ** 63)
+_INT64_MAX = 2 ** 63 - 1
+
+# Last code point, so `x >= N AND x < N || _MAX_CHAR` selects every x starting with N
+_MAX_CHAR = chr(0x10FFFF)
+
+
+def _integer_msns(values: Optional[list]) -> set[int]:
+    """
+        MSN list entries that can equal an integer MSN, matching `msn in list` in the evaluator.
+    """
+    msns = set()
+    for value in values or []:
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        if isinstance(value, int) and _INT64_MIN <= value <= _INT64_MAX:
+            msns.add(int(value))
+    return msns
+
+
+class SQLiteADStore:
+    """
+        AD documents in a local SQLite database (WAL mode), with indexed tables for
+        normalized aircraft models and MSN constraints. A single connection is shared
+        behind a lock; the async methods run the queries in a worker thread.
+    """
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("PRAGMA foreign_keys=ON")
+        self._connection.executescript(_SCHEMA)
+        self._connection.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0)")
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def version_sync(self) -> int:
+        """
+            Counter incremented by every write, for cheap change detection.
+        """
+        with self._lock:
+            return self._connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+
+    def save_many_sync(self, ad_documents: list[ADDocument]) -> None:
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                for ad_document in ad_documents:
+                    self._save(connection, ad_document)
+                connection.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+    def _save(self, connection: sqlite3.Connection, ad_document: ADDocument) -> None:
+        document = ad_document.model_dump_json()
+        ad_id = ad_document.ad_id
+        rules = ad_document.applicability_rules
+
+        connection.execute("DELETE FROM ads WHERE ad_id = ?", (ad_id,))
+        connection.execute(
+            "INSERT INTO ads (ad_id, document, sha256, updated_at) VALUES (?, ?, ?, ?)",
+            (ad_id, document, hashlib.sha256(document.encode("utf-8")).hexdigest(), time.time())
+        )
+        connection.executemany(
+            "INSERT OR IGNORE INTO ad_models (ad_id, normalized_model) VALUES (?, ?)",
+            [(ad_id, normalize_model_name(model)) for model in rules.aircraft_models]
+        )
+
+        constraints = rules.msn_constraints
+        if constraints is None:
+            return
+
+        include_msns = _integer_msns(constraints.include_msns)
+        has_include_list = constraints.include_msns is not None and len(constraints.include_msns) > 0
+        connection.execute(
+            "INSERT INTO ad_msn_constraints (ad_id, has_include_list, min_msn, max_msn) VALUES (?, ?, ?, ?)",
+            (ad_id, int(has_include_list), constraints.min_msn, constraints.max_msn)
+        )
+        connection.executemany(
+            "INSERT INTO ad_msns (ad_id, kind, msn) VALUES (?, 'include', ?)",
+            [(ad_id, msn) for msn in sorted(include_msns)]
+        )
+        connection.executemany(
+            "INSERT INTO ad_msns (ad_id, kind, msn) VALUES (?, 'exclude', ?)",
+            [(ad_id, msn) for msn in sorted(_integer_msns(constraints.exclude_msns))]
+        )
+
+    def delete_sync(self, ad_id: str) -> bool:
+        with self._lock:
+            cursor = self._connection.execute("DELETE FROM ads WHERE ad_id = ?", (ad_id,))
+            if cursor.rowcount:
+                self._connection.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+            return cursor.rowcount > 0
+
+    def fingerprints_sync(self) -> dict[str, str]:
+        """
+            Map of ad_id to the SHA-256 of its stored document.
+        """
+        with self._lock:
+            return dict(self._connection.execute("SELECT ad_id, sha256 FROM ads"))
+
+    def get_many_sync(self, ad_ids: list[str]) -> dict[str, ADDocument]:
+        ads = {}
+        with self._lock:
+            # Chunked to stay below SQLite's bound parameter limit
+            for start in range(0, len(ad_ids), 500):
+                chunk = ad_ids[start:start + 500]
+                rows = self._connection.execute(
+                    f"SELECT ad_id, document FROM ads WHERE ad_id IN ({', '.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for ad_id, document in rows:
+                    ads[ad_id] = ADDocument.model_validate_json(document)
+        return ads
+
+    def load_all_sync(self) -> dict[str, ADDocument]:
+        with self._lock:
+            rows = self._connection.execute("SELECT document FROM ads ORDER BY ad_id").fetchall()
+        ads = {}
+        for (document,) in rows:
+            ad = ADDocument.model_validate_json(document)
+            ads[ad.ad_id] = ad
+        return ads
+
+    def query_sync(
+        self,
+        aircraft_model: Optional[str] = None,
+        msn: Optional[int] = None,
+        offset: int = 0,
+        limit: int = 50
+    ) -> tuple[list[ADDocument], int]:
+        """
+            Page of ADs ordered by ad_id, optionally restricted to ADs touching a model
+            (same prefix rules as the evaluator) and/or an MSN, with the total match count.
+        """
+        conditions = []
+        params: list = []
+
+        if aircraft_model is not None:
+            normalized = normalize_model_name(aircraft_model)
+            prefixes = [normalized[:end] for end in range(len(normalized) + 1)]
+            conditions.append(
+                "ads.ad_id IN (SELECT ad_id FROM ad_models WHERE "
+                f"normalized_model IN ({', '.join('?' * len(prefixes))}) "
+                "OR (normalized_model >= ? AND normalized_model < ?))"
+            )
+            params.extend(prefixes)
+            params.extend([normalized, normalized + _MAX_CHAR])
+
+        if msn is not None:
+            conditions.append(
+                "(c.ad_id IS NULL"
+                " OR (c.has_include_list = 1 AND EXISTS ("
+                "SELECT 1 FROM ad_msns m WHERE m.msn = ? AND m.kind = 'include' AND m.ad_id = ads.ad_id))"
+                " OR (c.has_include_list = 0"
+                " AND (c.min_msn IS NULL OR c.min_msn <= ?) AND (c.max_msn IS NULL OR c.max_msn >= ?)"
+                " AND NOT EXISTS ("
+                "SELECT 1 FROM ad_msns m WHERE m.msn = ? AND m.kind = 'exclude' AND m.ad_id = ads.ad_id)))"
+            )
+            params.extend([msn, msn, msn, msn])
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        from_clause = "FROM ads LEFT JOIN ad_msn_constraints c ON c.ad_id = ads.ad_id"
+
+        with self._lock:
+            total = self._connection.execute(f"SELECT COUNT(*) {from_clause} {where}", params).fetchone()[0]
+            rows = self._connection.execute(
+                f"SELECT ads.document {from_clause} {where} ORDER BY ads.ad_id LIMIT ? OFFSET ?",
+                [*params, limit, offset]
+            ).fetchall()
+
+        return [ADDocument.model_validate_json(document) for (document,) in rows], total
+
+    async def save(self, ad_document: ADDocument) -> None:
+        await asyncio.to_thread(self.save_many_sync, [ad_document])
+
+    async def version(self) -> int:
+        return await asyncio.to_thread(self.version_sync)
+
+    async def fingerprints(self) -> dict[str, str]:
+        return await asyncio.to_thread(self.fingerprints_sync)
+
+    async def get_many(self, ad_ids: list[str]) -> dict[str, ADDocument]:
+        return await asyncio.to_thread(self.get_many_sync, ad_ids)
+
+    async def load_all(self) -> dict[str, ADDocument]:
+        return await asyncio.to_thread(self.load_all_sync)
+
+    async def query(
+        self,
+        aircraft_model: Optional[str] = None,
+        msn: Optional[int] = None,
+        offset: int = 0,
+        limit: int = 50
+    ) -> tuple[list[ADDocument], int]:
+        return await asyncio.to_thread(self.query_sync, aircraft_model, msn, offset, limit)
+
+
+def import_json_outputs(store: SQLiteADStore, output_dir: Path) -> list[str]:
+    """
+        One-shot import of `*_parsed.json` files into the store. Returns the imported AD IDs.
+    """
+    ad_documents = []
+    for json_file in sorted(output_dir.glob("*_parsed.json")):
+        try:
+            ad_documents.append(ADDocument.model_validate_json(json_file.read_bytes()))
+        except Exception as e:
+            print(f"Error importing AD document {json_file.name}: {e}")
+    store.save_many_sync(ad_documents)
+    return [ad_document.ad_id for ad_document in ad_documents]
+
+
+OUTPUT_DIR = Path(__file__).parent.parent.parent / "output"
+
+_ad_store: Optional[SQLiteADStore] = None
+
+
+def _default_db_path() -> Path:
+    return Path(settings.AD_STORE_SQLITE_PATH) if settings.AD_STORE_SQLITE_PATH else OUTPUT_DIR / "ads.sqlite3"
+
+
+def get_ad_store() -> Optional[SQLiteADStore]:
+    """
+        Get the shared SQLite AD store, or None when ADs are stored as JSON files.
+    """
+    global _ad_store
+    if settings.AD_STORE_BACKEND != "sqlite":
+        return None
+    if _ad_store is None:
+        _ad_store = SQLiteADStore(_default_db_path())
+    return _ad_store
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Import parsed AD JSON files into the SQLite AD store.")
+    parser.add_argument("--output-dir", type=Path, default=OUTPUT_DIR)
+    parser.add_argument("--db", type=Path, default=None, help="Database path (defaults to AD_STORE_SQLITE_PATH or output/ads.sqlite3)")
+    args = parser.parse_args(argv)
+
+    db_path = args.db or _default_db_path()
+    store = SQLiteADStore(db_path)
+    try:
+        imported = import_json_outputs(store, args.output_dir)
+    finally:
+        store.close()
+    print(f"Imported {len(imported)} AD documents into {db_path}")
+
+
+if __name__ == "__main__":
+    main()
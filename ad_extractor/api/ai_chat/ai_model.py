@@ -1,10 +1,15 @@
-from pathlib import Path
-from typing import Dict, Optional, Protocol
+import json
+import time
+from typing import Any, AsyncIterator, Optional, Protocol
 
 from openai import AsyncOpenAI
 
-from api.schema import ADDocument
-from api.utils import load_parsed_ads
+from api.ai_chat.fast_path import ApplicabilityFastPath
+from api.ai_chat.response_cache import ChatResponseCache
+from api.ai_chat.retrieval import get_retrieval_index
+from api.ai_chat.schema import ChatContextReport, ChatResponse
+from api.metrics import metrics
+from api.registry import ADCorpusSnapshot, get_ad_snapshot
 from config.config import settings
 
 
@@ -16,28 +21,65 @@ class AIModel(Protocol):
     ) -> str:
         ...
 
+    def stream_response(
+            self, prompt: str | dict, 
+            system_context: Optional[str] = None, 
+            temperature: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        ...
+
 
 class OpenAIAIModel:
-    def __init__(self, api_key: str, base_url: Optional[str] = None) -> None:
+    def __init__(self, api_key: str, base_url: Optional[str] = None, client: Optional[AsyncOpenAI] = None) -> None:
         self.api_key = api_key
         self.base_url = base_url
+        self._client = client
 
     async def generate_response(
             self, prompt: str | dict, 
             system_context: Optional[str] = None, 
             temperature: Optional[float] = 0.2
     ) -> str:
-        client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url)        
-        response = await client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": system_context},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=temperature,
-        )
+        client = self._client or AsyncOpenAI(api_key=self.api_key, base_url=self.base_url)
+        with metrics.llm_request("chat"):
+            response = await client.chat.completions.create(
+                model="gpt-4o",
+                messages=[
+                    {"role": "system", "content": system_context},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=temperature,
+            )
+        metrics.record_usage("chat", response.usage)
         
         return response.choices[0].message.content
+
+    async def stream_response(
+            self, prompt: str | dict, 
+            system_context: Optional[str] = None, 
+            temperature: Optional[float] = 0.2
+    ) -> AsyncIterator[str]:
+        """
+            Method to yield the completion text as it arrives. Closing the iterator closes the
+            upstream response, which cancels the completion.
+        """
+        client = self._client or AsyncOpenAI(api_key=self.api_key, base_url=self.base_url)
+        with metrics.llm_request("chat_stream"):
+            stream = await client.chat.completions.create(
+                model="gpt-4o",
+                messages=[
+                    {"role": "system", "content": system_context},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=temperature,
+                stream=True,
+            )
+            async with stream:
+                async for chunk in stream:
+                    # Only sent by servers that report usage on streams
+                    metrics.record_usage("chat_stream", getattr(chunk, "usage", None))
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
     
 class GeminiAIModel:
     def __init__(self, api_key: str, base_url: Optional[str] = None) -> None:
@@ -48,12 +90,40 @@ class GeminiAIModel:
         # Placeholder for Gemini API integration
         pass
 
+    async def stream_response(self, prompt: str | dict) -> AsyncIterator[str]:
+        # Placeholder for Gemini API integration
+        return
+        yield
+
 
 class AIModelFactory:
-    def __init__(self, model_strategy: Optional[AIModel] = None, ) -> None:
+    def __init__(
+            self,
+            model_strategy: Optional[AIModel] = None,
+            fast_path: Optional[ApplicabilityFastPath] = None,
+            response_cache: Optional[ChatResponseCache] = None
+    ) -> None:
         if model_strategy is None:
             raise ValueError("An AIModel strategy must be provided.")
         self._model = model_strategy
+        self._fast_path = fast_path
+        self._response_cache = response_cache
+
+    async def chat(
+            self, prompt: str,
+            temperature: Optional[float] = 0.2
+    ) -> ChatResponse:
+        """
+            Method to answer a chat prompt, from the evaluator when the question is unambiguous, otherwise from the model.
+        """
+        snapshot = await get_ad_snapshot()
+        if self._fast_path is not None:
+            response = await self._fast_path.try_answer(prompt, snapshot)
+            if response is not None:
+                return ChatResponse(response=response, answered_by="evaluator")
+
+        response, context, cached = await self._generate_cached(prompt, temperature, snapshot)
+        return ChatResponse(response=response, answered_by="llm", context=context, cached=cached)
 
     async def generate_response(
             self, prompt: str | dict, 
@@ -62,33 +132,30 @@ class AIModelFactory:
         """
             Method to ask if specific aircraft configurations are affected by ADs.
         """
+        response, _ = await self.generate_response_with_context(prompt, temperature)
+        return response
+
+    async def build_system_context(
+            self, prompt: str | dict,
+            snapshot: Optional[ADCorpusSnapshot] = None
+    ) -> tuple[str, ChatContextReport]:
+        """
+            Method to build the system prompt from the ADs most relevant to the prompt, within the token budget.
+        """
         system_context = f"""
             You are an expert Airworthiness Directive (AD) assistant.
             Provide accurate and concise answers based on the AD documents provided.
             Carefully reference specific ADs when answering user queries.
             Here are available ADs in the database for your reference:
         """
-        base_dir = Path(__file__).parent.parent.parent.parent
-        output_dir = base_dir / "output"
-
-        ads: Dict[str, ADDocument] = await load_parsed_ads(output_dir)
-        for ad_id, ad in ads.items():
-            system_context += f"\nAD ID: {ad_id}\n"
-            system_context += f"Title: {ad.title}\n"
-            system_context += f"Effective: {ad.effective_date}\n"
-            system_context += f"Affected Aircraft Models: {ad.applicability_rules.aircraft_models}\n"
-            
-            if ad.applicability_rules.exclude_if_modification:
-                system_context += "Exclusions (aircraft NOT affected if modification applied):\n"
-                for exclusion in ad.applicability_rules.exclude_if_modification:
-                    system_context += f"  - Modification: {exclusion.modification}\n"
-                    system_context += f"    Only excludes models: {exclusion.applicable_models}\n"
-            
-            if ad.applicability_rules.msn_constraints:
-                msn = ad.applicability_rules.msn_constraints
-                system_context += f"MSN Constraints: min={msn.min_msn}, max={msn.max_msn}, exclude={msn.exclude_msns}, include={msn.include_msns}\n"
-            
-            system_context += f"Raw Applicability Text: {ad.raw_applicability_text}\n"
+        snapshot = snapshot or await get_ad_snapshot()
+        retrieval_index = get_retrieval_index(snapshot)
+        ad_context, report = retrieval_index.select_context(
+            prompt if isinstance(prompt, str) else json.dumps(prompt),
+            token_budget=settings.CHAT_CONTEXT_TOKEN_BUDGET,
+            max_ads=settings.CHAT_CONTEXT_MAX_ADS or None
+        )
+        system_context += ad_context
         
         system_context += """
             When users ask about aircraft applicability:
@@ -110,4 +177,78 @@ class AIModelFactory:
             - NO = aircraft is NOT affected (excluded or not applicable)
             - Your final YES/NO must match your reasoning. Re-read before answering.
         """
-        return await self._model.generate_response(prompt, system_context, temperature)
\ No newline at end of file
+        return system_context, report
+
+    async def generate_response_with_context(
+            self, prompt: str | dict, 
+            temperature: Optional[float] = 0.2
+    ) -> tuple[str, ChatContextReport]:
+        """
+            Method to answer the prompt and report which ADs were given to the model.
+        """
+        response, report, _ = await self._generate_cached(prompt, temperature, await get_ad_snapshot())
+        return response, report
+
+    async def _generate_cached(
+            self, prompt: str | dict,
+            temperature: Optional[float],
+            snapshot: ADCorpusSnapshot
+    ) -> tuple[str, ChatContextReport, bool]:
+        if self._response_cache is not None:
+            cached = self._response_cache.get(prompt, temperature, snapshot.content_hash)
+            if cached is not None:
+                return cached[0], cached[1], True
+
+        system_context, report = await self.build_system_context(prompt, snapshot)
+        response = await self._model.generate_response(prompt, system_context, temperature)
+        if self._response_cache is not None and response:
+            self._response_cache.put(prompt, temperature, snapshot.content_hash, response, report)
+        return response, report, False
+
+
+    async def chat_stream(
+            self, prompt: str,
+            temperature: Optional[float] = 0.2
+    ) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+        """
+            Method to answer a chat prompt as a stream of (event, data) pairs:
+            one "meta" event, "delta" events with the answer text, then a "done" event with timings.
+        """
+        started = time.perf_counter()
+        first_token: Optional[float] = None
+
+        snapshot = await get_ad_snapshot()
+        if self._fast_path is not None:
+            response = await self._fast_path.try_answer(prompt, snapshot)
+            if response is not None:
+                yield "meta", {"answered_by": "evaluator", "context": None, "cached": False}
+                yield "delta", {"content": response}
+                elapsed = time.perf_counter() - started
+                yield "done", {"time_to_first_token": elapsed, "elapsed_seconds": elapsed}
+                return
+
+        if self._response_cache is not None:
+            cached = self._response_cache.get(prompt, temperature, snapshot.content_hash)
+            if cached is not None:
+                response, context = cached
+                yield "meta", {"answered_by": "llm", "context": context.model_dump() if context else None, "cached": True}
+                yield "delta", {"content": response}
+                elapsed = time.perf_counter() - started
+                yield "done", {"time_to_first_token": elapsed, "elapsed_seconds": elapsed}
+                return
+
+        system_context, context = await self.build_system_context(prompt, snapshot)
+        yield "meta", {"answered_by": "llm", "context": context.model_dump(), "cached": False}
+
+        # Only a completed stream is cached; a disconnect closes this generator before the end
+        chunks = []
+        async for content in self._model.stream_response(prompt, system_context, temperature):
+            if first_token is None:
+                first_token = time.perf_counter() - started
+            chunks.append(content)
+            yield "delta", {"content": content}
+
+        if self._response_cache is not None and chunks:
+            self._response_cache.put(prompt, temperature, snapshot.content_hash, "".join(chunks), context)
+
+        yield "done", {"time_to_first_token": first_token, "elapsed_seconds": time.perf_counter() - started}
@@ -0,0 +1,213 @@
+import re
+from typing import Any, Optional
+
+from api.evaluator.evaluator import AircraftEvaluator
+from api.evaluator.model_index import normalize_model_name
+from api.registry import ADCorpusSnapshot
+from api.schema import AircraftConfiguration, EvaluationKey
+
+
+_INTENT = re.compile(
+    r"\b(?:affected|affect|affects|applicable|apply|applies|subject to|need|needs|"
+    r"require|requires|required|comply|compliance)\b",
+    re.IGNORECASE
+)
+_MSN = re.compile(r"\b(?:MSN|S/?N|serial(?:\s+number)?)\s*(?:#|no\.?|number)?\s*[:=]?\s*(\d{1,7})\b", re.IGNORECASE)
+_MODIFICATION = re.compile(
+    r"\b(?:mod(?:ification)?\.?\s*(?:no\.?\s*)?\d{3,6}(?:\s*\((?:production|retrofit|in production)\))?"
+    r"|SB\s+[A-Z0-9][A-Z0-9\-]*(?:\s+Rev(?:ision)?\.?\s*\d+)?)",
+    re.IGNORECASE
+)
+_NO_MODIFICATIONS = re.compile(
+    r"\b(?:no|without|zero)\s+(?:mods?|modifications?|SBs?|service bulletins?)(?:\s+(?:applied|embodied|installed))?\b",
+    re.IGNORECASE
+)
+_NEGATION = re.compile(r"\b(?:no|not|without|lacks?|lacking|removed|before|pending|planned)\b\W*(?:\w+\W+){0,2}$", re.IGNORECASE)
+# Wording that states a modification is already on the aircraft, before or after it
+_APPLIED_BEFORE = re.compile(r"\b(?:with|has|have|having|had)\s+(?:(?:and|,)\s*)*$", re.IGNORECASE)
+_APPLIED_AFTER = re.compile(
+    r"^\s*(?:(?:and|,)\s*)*(?:(?:has|have)\s+been\s+|is\s+|are\s+)?(?:embodied|applied|installed|incorporated)\b",
+    re.IGNORECASE
+)
+_AD_REFERENCE = re.compile(
+    r"\b(?:FAA|EASA|TCCA|CASA|ANAC|CAAC|DGCA|JCAB)\b|\b(?:AD\s+)?\d{4}-\d{2,4}(?:-\d{2})?(?:R\d+)?\b",
+    re.IGNORECASE
+)
+_WORD = re.compile(r"[A-Za-z0-9/]+")
+# Words a plain "is <aircraft> affected?" question may contain besides the aircraft itself.
+# Anything else (dates, delivery or operating conditions, "need", ...) is left to the LLM.
+_QUESTION_WORDS = frozenset('''
+    is are the a an my our this that aircraft airplane plane model affected affect affects by any all
+    ads ad airworthiness directive directives database applicable apply applies to subject does do
+    will would with has have having had been embodied applied installed incorporated and which what
+    require requires compliance comply action under for it of in if whether please check tell me can you
+'''.split())
+_MODEL = re.compile(
+    r"\b(?:(?:Boeing|Airbus|McDonnell Douglas)\s+)?"
+    r"(?:[A-Z]{1,4}-?\d{2,3}[A-Z]{0,2}(?:-\d{1,3}[A-Z]{0,3})*|\d{3}(?:-\d{1,3}[A-Z]{0,3})+)\b",
+    re.IGNORECASE
+)
+
+
+class ParsedQuestion:
+    def __init__(self, aircraft_model: str, msn: Optional[int], modifications: list[str]) -> None:
+        self.aircraft_model = aircraft_model
+        self.msn = msn
+        self.modifications = modifications
+
+    def aircraft(self) -> AircraftConfiguration:
+        return AircraftConfiguration(
+            aircraft_model=self.aircraft_model,
+            msn=self.msn,
+            modifications_applied=self.modifications
+        )
+
+    def describe(self) -> str:
+        description = self.aircraft_model
+        if self.msn is not None:
+            description += f" MSN {self.msn}"
+        if self.modifications:
+            description += f" with {', '.join(self.modifications)}"
+        return description
+
+
+def _blank(text: str, spans: list[tuple[int, int]]) -> str:
+    for start, end in spans:
+        text = text[:start] + " " * (end - start) + text[end:]
+    return text
+
+
+def parse_applicability_question(prompt: str) -> tuple[Optional[ParsedQuestion], Optional[str]]:
+    """
+        Parse "is <model> MSN <n> with <mods> affected?" style prompts.
+        Returns the parsed question, or None and the reason the prompt is not unambiguous.
+        A modification only counts as applied when the prompt says so ("with", "has",
+        "embodied", ...), and any wording beyond the aircraft description sends the prompt to the LLM.
+    """
+    if not _INTENT.search(prompt):
+        return None, "not_an_applicability_question"
+
+    if _AD_REFERENCE.search(prompt):
+        return None, "names_specific_ad"
+
+    msns = {int(match.group(1)) for match in _MSN.finditer(prompt)}
+    if len(msns) > 1:
+        return None, "multiple_msns"
+
+    modification_matches = list(_MODIFICATION.finditer(prompt))
+    without_modifications = _blank(prompt, [match.span() for match in modification_matches])
+
+    modifications = []
+    for match in modification_matches:
+        if _NEGATION.search(prompt[:match.start()]):
+            return None, "negated_modification"
+        if not (
+            _APPLIED_BEFORE.search(without_modifications[:match.start()])
+            or _APPLIED_AFTER.match(without_modifications[match.end():])
+        ):
+            return None, "modification_not_stated_as_applied"
+        modification = " ".join(match.group(0).split())
+        if modification not in modifications:
+            modifications.append(modification)
+
+    spans = [match.span() for match in _MSN.finditer(prompt)]
+    spans += [match.span() for match in modification_matches]
+    spans += [match.span() for match in _NO_MODIFICATIONS.finditer(prompt)]
+    remaining = _blank(prompt, spans)
+
+    models: dict[str, str] = {}
+    model_matches = list(_MODEL.finditer(remaining))
+    for match in model_matches:
+        models.setdefault(normalize_model_name(match.group(0)), match.group(0))
+    if not models:
+        return None, "no_aircraft_model"
+
+    leftover = _blank(remaining, [match.span() for match in model_matches])
+    if any(word.lower() not in _QUESTION_WORDS for word in _WORD.findall(leftover)):
+        return None, "unhandled_wording"
+
+    # "A320 ... A320-214" names one aircraft; anything else is more than one
+    longest = max(models, key=len)
+    if not all(longest.startswith(model) for model in models):
+        return None, "multiple_aircraft_models"
+
+    return ParsedQuestion(models[longest], next(iter(msns), None), modifications), None
+
+
+class ApplicabilityFastPath:
+    """
+        Answers unambiguous applicability questions straight from the evaluator,
+        in the same CONCLUSION format the LLM is asked to use.
+    """
+    def __init__(self, evaluator: Optional[AircraftEvaluator] = None) -> None:
+        self._evaluator = evaluator or AircraftEvaluator()
+        self.answered = 0
+        self.fallbacks: dict[str, int] = {}
+
+    def _fallback(self, reason: str) -> None:
+        self.fallbacks[reason] = self.fallbacks.get(reason, 0) + 1
+
+    async def try_answer(self, prompt: str, snapshot: ADCorpusSnapshot) -> Optional[str]:
+        """
+            Method to answer the prompt from the evaluator, or return None if it needs the LLM.
+        """
+        if not snapshot.ads:
+            self._fallback("no_parsed_ads")
+            return None
+
+        question, reason = parse_applicability_question(prompt)
+        if question is None:
+            self._fallback(reason)
+            return None
+
+        ads = list(snapshot.ad_list)
+        result = await self._evaluator.evaluate_against_multiple_ads(question.aircraft(), ads)
+        candidates = self._evaluator.get_model_index(ads).matching_ad_ids(question.aircraft_model)
+        self.answered += 1
+        return self._format_answer(question, result.results, candidates)
+
+    def _format_answer(
+        self,
+        question: ParsedQuestion,
+        results: list[EvaluationKey],
+        candidates: frozenset[str]
+    ) -> str:
+        aircraft = question.describe()
+
+        lines = [f"Evaluated {aircraft} against {len(results)} AD(s) in the database:"]
+        uncovered = 0
+        for key in results:
+            if key.ad_id not in candidates and not key.is_affected:
+                uncovered += 1
+                continue
+            lines.append(f"- {key.ad_id}: {'AFFECTED' if key.is_affected else 'NOT AFFECTED'} - {key.reason}")
+        if uncovered:
+            lines.append(f"- {uncovered} other AD(s) do not cover model {question.aircraft_model}")
+
+        affected = [key for key in results if key.is_affected]
+        if affected:
+            ad_ids = ", ".join(key.ad_id for key in affected)
+            reasons = "; ".join(f"{key.ad_id}: {key.reason}" for key in affected)
+            lines.append(f"CONCLUSION: YES, {aircraft} does require compliance with {ad_ids} because {reasons}")
+        else:
+            covered = [key for key in results if key.ad_id in candidates]
+            if covered:
+                reasons = "; ".join(f"{key.ad_id}: {key.reason}" for key in covered)
+            else:
+                reasons = "its model is not covered by any AD in the database"
+            lines.append(f"CONCLUSION: NO, {aircraft} does not require action under the ADs in the database because {reasons}")
+
+        return "\n".join(lines)
+
+    def stats(self) -> dict[str, Any]:
+        fallbacks = sum(self.fallbacks.values())
+        total = self.answered + fallbacks
+        return {
+            "fast_path_answered": self.answered,
+            "llm_fallbacks": fallbacks,
+            "fast_path_ratio": self.answered / total if total else 0.0,
+            "fallback_reasons": dict(self.fallbacks),
+        }
+
+
+applicability_fast_path = ApplicabilityFastPath()
@@ -0,0 +1,126 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from api.ad_extractor.cache import sha256_hex
+from api.ai_chat.schema import ChatContextReport
+from api.metrics import metrics
+from config.config import settings
+
+
+_TRAILING_PUNCTUATION = "?!. "
+
+
+def normalize_prompt(prompt: str | dict) -> str:
+    """
+        Normalize a chat prompt so trivially different phrasings of the same question share a cache entry:
+        case, runs of whitespace and trailing punctuation are ignored.
+    """
+    if not isinstance(prompt, str):
+        prompt = json.dumps(prompt, sort_keys=True)
+    return " ".join(prompt.lower().split()).rstrip(_TRAILING_PUNCTUATION)
+
+
+class _CachedResponse:
+    __slots__ = ("response", "context", "expires_at")
+
+    def __init__(self, response: str, context: Optional[ChatContextReport], expires_at: float) -> None:
+        self.response = response
+        self.context = context
+        self.expires_at = expires_at
+
+
+class ChatResponseCache:
+    """
+        In-memory LRU cache of LLM chat answers with a TTL.
+        Keys cover the normalized prompt, the temperature and the content hash of the AD corpus
+        the system context was built from, so an answer is never served for a different corpus.
+        Entries for an older corpus are dropped as soon as a new content hash is seen.
+    """
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self._entries: OrderedDict[str, _CachedResponse] = OrderedDict()
+        self._content_hash: Optional[str] = None
+
+    def key(self, prompt: str | dict, temperature: Optional[float], content_hash: str) -> str:
+        return sha256_hex(normalize_prompt(prompt), repr(temperature), content_hash)
+
+    def _check_corpus(self, content_hash: str) -> None:
+        if content_hash != self._content_hash:
+            if self._entries:
+                self.invalidations += 1
+                self._entries.clear()
+            self._content_hash = content_hash
+
+    def get(
+        self,
+        prompt: str | dict,
+        temperature: Optional[float],
+        content_hash: str
+    ) -> Optional[tuple[str, Optional[ChatContextReport]]]:
+        """
+            Method to look up a cached answer and its context report, refreshing its LRU position.
+        """
+        self._check_corpus(content_hash)
+        key = self.key(prompt, temperature, content_hash)
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            metrics.cache_lookup("chat_response", False)
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        metrics.cache_lookup("chat_response", True)
+        return entry.response, entry.context
+
+    def put(
+        self,
+        prompt: str | dict,
+        temperature: Optional[float],
+        content_hash: str,
+        response: str,
+        context: Optional[ChatContextReport] = None
+    ) -> None:
+        """
+            Method to store an answer, evicting the least recently used entries beyond `max_entries`.
+        """
+        self._check_corpus(content_hash)
+        key = self.key(prompt, temperature, content_hash)
+        self._entries[key] = _CachedResponse(response, context, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "cache_entries": len(self._entries),
+            "cache_hits": self.hits,
+            "cache_misses": self.misses,
+            "cache_hit_ratio": self.hits / lookups if lookups else 0.0,
+            "cache_evictions": self.evictions,
+            "cache_expirations": self.expirations,
+            "cache_invalidations": self.invalidations,
+        }
+
+
+chat_response_cache = ChatResponseCache(
+    max_entries=settings.CHAT_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.CHAT_CACHE_TTL_SECONDS
+)
@@ -0,0 +1,193 @@
+import math
+import re
+from typing import Optional
+
+from api.ad_extractor.scheduler import estimate_tokens
+from api.ai_chat.schema import ChatContextReport
+from api.evaluator.model_index import ModelIndex, normalize_model_name
+from api.registry import ADCorpusSnapshot
+from api.schema import ADDocument
+
+
+_TERM = re.compile(r"[A-Z0-9]+")
+_WORD = re.compile(r"[A-Za-z0-9][A-Za-z0-9\-/]*")
+_HAS_DIGIT = re.compile(r"\d")
+_HAS_LETTER = re.compile(r"[A-Z]")
+
+# Consecutive prompt words joined when looking for model names, e.g. "Boeing 737-800"
+_MAX_MODEL_WORDS = 3
+
+
+def _terms(text: str) -> list[str]:
+    return _TERM.findall(text.upper())
+
+
+def format_ad_context(ad_id: str, ad: ADDocument, include_raw_text: bool = True) -> str:
+    """
+        Render one AD for the chat system prompt.
+    """
+    rules = ad.applicability_rules
+    context = f"\nAD ID: {ad_id}\n"
+    context += f"Title: {ad.title}\n"
+    context += f"Effective: {ad.effective_date}\n"
+    context += f"Affected Aircraft Models: {rules.aircraft_models}\n"
+
+    if rules.excluded_if_modifications:
+        context += "Exclusions (aircraft NOT affected if modification applied):\n"
+        for exclusion in rules.excluded_if_modifications:
+            context += f"  - Modification: {exclusion.modification}\n"
+            context += f"    Only excludes models: {exclusion.applicable_models}\n"
+
+    if rules.msn_constraints:
+        msn = rules.msn_constraints
+        context += f"MSN Constraints: min={msn.min_msn}, max={msn.max_msn}, exclude={msn.exclude_msns}, include={msn.include_msns}\n"
+
+    if include_raw_text:
+        context += f"Raw Applicability Text: {ad.raw_applicability_text}\n"
+    return context
+
+
+class ADRetrievalIndex:
+    """
+        Local retrieval over an AD corpus snapshot: BM25 over each AD's title, models,
+        exempting modifications and applicability text, plus a model-name lookup
+        that ranks ADs naming one of the prompt's aircraft models first.
+    """
+    def __init__(self, snapshot: ADCorpusSnapshot, k1: float = 1.5, b: float = 0.75) -> None:
+        self.snapshot = snapshot
+        self.k1 = k1
+        self.b = b
+        self._ad_ids = list(snapshot.ads)
+        self._model_index = ModelIndex(snapshot.ad_list)
+        self._postings: dict[str, list[tuple[int, int]]] = {}
+        self._doc_lengths: list[int] = []
+
+        for position, ad_id in enumerate(self._ad_ids):
+            ad = snapshot.ads[ad_id]
+            rules = ad.applicability_rules
+            text = " ".join([
+                ad_id,
+                ad.title or "",
+                " ".join(rules.aircraft_models),
+                " ".join(normalize_model_name(model) for model in rules.aircraft_models),
+                " ".join(exclusion.modification for exclusion in rules.excluded_if_modifications),
+                ad.raw_applicability_text or "",
+            ])
+            counts: dict[str, int] = {}
+            for term in _terms(text):
+                counts[term] = counts.get(term, 0) + 1
+            for term, count in counts.items():
+                self._postings.setdefault(term, []).append((position, count))
+            self._doc_lengths.append(sum(counts.values()))
+
+        self._average_length = (sum(self._doc_lengths) / len(self._doc_lengths)) if self._doc_lengths else 0.0
+
+    def model_matches(self, prompt: str) -> set[str]:
+        """
+            Method to find the ADs naming a model mentioned in the prompt (or a variant of it).
+        """
+        words = _WORD.findall(prompt)
+        matched: set[str] = set()
+
+        for start in range(len(words)):
+            for end in range(start + 1, min(start + _MAX_MODEL_WORDS, len(words)) + 1):
+                candidate = normalize_model_name("".join(words[start:end]))
+                if not _HAS_DIGIT.search(candidate):
+                    continue
+                if not _HAS_LETTER.search(candidate) and len(candidate) < 3:
+                    continue
+                matched.update(self._model_index.matching_ad_ids(candidate))
+
+        return matched
+
+    def bm25_scores(self, prompt: str) -> dict[str, float]:
+        """
+            Method to score the ADs against the prompt terms; ADs without a shared term are omitted.
+        """
+        scores: dict[int, float] = {}
+        n_docs = len(self._ad_ids)
+        terms = set(_terms(prompt)) | {normalize_model_name(word) for word in _WORD.findall(prompt)}
+
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for position, count in postings:
+                length_norm = 1 - self.b + self.b * self._doc_lengths[position] / self._average_length
+                scores[position] = scores.get(position, 0.0) + idf * count * (self.k1 + 1) / (count + self.k1 * length_norm)
+
+        return {self._ad_ids[position]: score for position, score in scores.items()}
+
+    def rank(self, prompt: str) -> tuple[list[str], set[str]]:
+        """
+            Method to rank AD IDs for the prompt: model matches first, then BM25 hits, each by score.
+            When nothing matches, the whole corpus is returned in registry order.
+        """
+        model_matched = self.model_matches(prompt)
+        scores = self.bm25_scores(prompt)
+        if not model_matched and not scores:
+            return list(self._ad_ids), model_matched
+
+        order = {ad_id: position for position, ad_id in enumerate(self._ad_ids)}
+        ranked = sorted(
+            set(scores) | model_matched,
+            key=lambda ad_id: (ad_id not in model_matched, -scores.get(ad_id, 0.0), order[ad_id])
+        )
+        return ranked, model_matched
+
+    def select_context(
+        self,
+        prompt: str,
+        token_budget: int,
+        max_ads: Optional[int] = None
+    ) -> tuple[str, ChatContextReport]:
+        """
+            Method to render the highest ranked ADs into at most `token_budget` estimated tokens.
+            An AD whose full block does not fit is included without its raw applicability text if that fits.
+        """
+        ranked, model_matched = self.rank(prompt)
+        blocks = []
+        included = []
+        without_raw_text = []
+        used_tokens = 0
+
+        for ad_id in ranked:
+            if max_ads is not None and len(included) >= max_ads:
+                break
+            ad = self.snapshot.ads[ad_id]
+            block = format_ad_context(ad_id, ad)
+            block_tokens = estimate_tokens(block)
+            if used_tokens + block_tokens > token_budget:
+                block = format_ad_context(ad_id, ad, include_raw_text=False)
+                block_tokens = estimate_tokens(block)
+                if used_tokens + block_tokens > token_budget:
+                    continue
+                without_raw_text.append(ad_id)
+            blocks.append(block)
+            included.append(ad_id)
+            used_tokens += block_tokens
+
+        return "".join(blocks), ChatContextReport(
+            snapshot_version=self.snapshot.version,
+            corpus_size=len(self._ad_ids),
+            candidates=len(ranked),
+            model_matched_ad_ids=sorted(model_matched),
+            included_ad_ids=included,
+            included_without_raw_text=without_raw_text,
+            context_tokens=used_tokens,
+            token_budget=token_budget
+        )
+
+
+_retrieval_index: Optional[ADRetrievalIndex] = None
+
+
+def get_retrieval_index(snapshot: ADCorpusSnapshot) -> ADRetrievalIndex:
+    """
+        Get the retrieval index for the snapshot, rebuilding it only when the corpus changed.
+    """
+    global _retrieval_index
+    if _retrieval_index is None or _retrieval_index.snapshot is not snapshot:
+        _retrieval_index = ADRetrievalIndex(snapshot)
+    return _retrieval_index
@@ -0,0 +1,20 @@
+from typing import Optional
+from pydantic import BaseModel, Field
+
+
+class ChatContextReport(BaseModel):
+    snapshot_version: int = Field(..., description="Version of the AD corpus the context was selected from")
+    corpus_size: int = Field(..., description="Number of ADs in the corpus")
+    candidates: int = Field(..., description="Number of ADs ranked as relevant to the prompt")
+    model_matched_ad_ids: list[str] = Field(default_factory=list, description="ADs naming an aircraft model mentioned in the prompt")
+    included_ad_ids: list[str] = Field(default_factory=list, description="ADs included in the system prompt, in rank order")
+    included_without_raw_text: list[str] = Field(default_factory=list, description="Included ADs whose raw applicability text was left out to fit the budget")
+    context_tokens: int = Field(..., description="Estimated tokens of the included AD context")
+    token_budget: int = Field(..., description="Token budget for the AD context")
+
+
+class ChatResponse(BaseModel):
+    response: str = Field(..., description="Answer to the prompt")
+    answered_by: str = Field("llm", description="'evaluator' if answered by the deterministic fast path, otherwise 'llm'")
+    context: Optional[ChatContextReport] = Field(None, description="ADs that were given to the model as context")
+    cached: bool = Field(False, description="True if the LLM answer was served from the chat response cache")
@@ -1,17 +1,66 @@
+from typing import Any, AsyncIterator
 from fastapi import APIRouter, Depends
+from openai import AsyncOpenAI
 from api.ai_chat.ai_model import AIModelFactory, OpenAIAIModel
+from api.ai_chat.fast_path import applicability_fast_path
+from api.ai_chat.response_cache import chat_response_cache
+from api.ai_chat.schema import ChatResponse
+from api.llm_client import get_llm_client
+from api.utils import EventStreamResponse, format_sse
 from config.config import settings
 
 router = APIRouter()
 
+
+def get_ai_model_factory(client: AsyncOpenAI = Depends(get_llm_client)) -> AIModelFactory:
+    return AIModelFactory(
+        model_strategy=OpenAIAIModel(api_key=settings.LLM_API_KEY.get_secret_value(), base_url=settings.BASE_URL, client=client),
+        fast_path=applicability_fast_path if settings.CHAT_FAST_PATH_ENABLED else None,
+        response_cache=chat_response_cache if settings.CHAT_CACHE_ENABLED else None
+    )
+
+
 @router.post(
         "/chat",
         description="Ask AI about specific aircraft configuration",
         tags=["Assignment"]
     )
-async def chat_with_ai(prompt: str) -> dict:
-    ai_model_factory = AIModelFactory(
-        model_strategy=OpenAIAIModel(api_key=settings.LLM_API_KEY.get_secret_value(), base_url=settings.BASE_URL)
+async def chat_with_ai(
+    prompt: str,
+    ai_model_factory: AIModelFactory = Depends(get_ai_model_factory)
+) -> ChatResponse:
+    return await ai_model_factory.chat(prompt, temperature=0.1)
+
+
+async def _chat_events(
+    ai_model_factory: AIModelFactory,
+    prompt: str,
+    temperature: float
+) -> AsyncIterator[bytes]:
+    try:
+        async for event, data in ai_model_factory.chat_stream(prompt, temperature=temperature):
+            yield format_sse(event, data)
+    except Exception as e:
+        print(f"Error streaming chat response: {e}")
+        yield format_sse("error", {"error": str(e)})
+
+
+@router.post(
+        "/chat/stream",
+        description="Ask AI about specific aircraft configuration, streaming the answer as server-sent events: "
+                    "'meta' (answer source and AD context), 'delta' (answer text), then 'done' (time to first token)"
+    )
+async def chat_with_ai_stream(
+    prompt: str,
+    ai_model_factory: AIModelFactory = Depends(get_ai_model_factory)
+) -> EventStreamResponse:
+    return EventStreamResponse(_chat_events(ai_model_factory, prompt, temperature=0.1))
+
+
+@router.get(
+        "/stats",
+        description="How often chat prompts were answered by the deterministic evaluator fast path instead of the LLM, "
+                    "and chat response cache hits and misses"
     )
-    response = await ai_model_factory.generate_response(prompt, temperature=0.1)
-    return {"response": response}
\ No newline at end of file
+async def chat_stats() -> dict[str, Any]:
+    return {**applicability_fast_path.stats(), **chat_response_cache.stats()}
\ No newline at end of file
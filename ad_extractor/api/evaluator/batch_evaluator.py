@@ -0,0 +1,408 @@
+import base64
+import time
+from enum import IntEnum
+from typing import Iterable, Optional
+
+import numpy as np
+
+from api.schema import (
+    ADDocument,
+    AircraftConfiguration,
+    EvaluationKey,
+    EvaluationResult,
+)
+from api.evaluator.evaluator import AircraftEvaluator
+from api.evaluator.schema import ADParams, AircraftKey, CellExemption, CellReason, CompactEvaluationResponse
+from api.evaluator.model_index import ModelIndex
+from api.evaluator.exemption_index import ExemptionIndex
+from api.metrics import metrics
+
+
+class ReasonCode(IntEnum):
+    AFFECTED = 0
+    MODEL_NOT_MATCHED = 1
+    MSN_NOT_IN_INCLUDE_LIST = 2
+    MSN_EXCLUDED = 3
+    MSN_BELOW_MIN = 4
+    MSN_ABOVE_MAX = 5
+    MODIFICATION_EXEMPTED = 6
+
+
+_INT64_MIN = np.iinfo(np.int64).min
+_INT64_MAX = np.iinfo(np.int64).max
+
+
+def _to_sorted_msn_array(values: Optional[list]) -> Optional[np.ndarray]:
+    """
+        Convert an MSN list to a sorted int64 array. Entries that can never equal
+        an integer MSN (e.g. zero-padded strings) are dropped, matching `msn in list`.
+    """
+    if values is None:
+        return None
+
+    msns = set()
+    for value in values:
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        if isinstance(value, int) and _INT64_MIN <= value <= _INT64_MAX:
+            msns.add(int(value))
+    return np.array(sorted(msns), dtype=np.int64)
+
+
+def _sorted_membership(values: np.ndarray, sorted_set: np.ndarray) -> np.ndarray:
+    if sorted_set.size == 0:
+        return np.zeros(values.shape, dtype=bool)
+    positions = np.searchsorted(sorted_set, values)
+    positions[positions == sorted_set.size] = 0
+    return sorted_set[positions] == values
+
+
+def _ad_params(ad: ADDocument) -> ADParams:
+    rules = ad.applicability_rules
+    constraints = rules.msn_constraints
+    return ADParams(
+        aircraft_models=rules.aircraft_models,
+        min_msn=constraints.min_msn if constraints is not None else None,
+        max_msn=constraints.max_msn if constraints is not None else None,
+        exclusions=[exclusion.modification for exclusion in rules.excluded_if_modifications]
+    )
+
+
+class _CompiledAD:
+    def __init__(self, ad: ADDocument) -> None:
+        rules = ad.applicability_rules
+        constraints = rules.msn_constraints
+
+        self.ad = ad
+        self.has_constraints = constraints is not None
+        self.include_msns: Optional[np.ndarray] = None
+        self.exclude_msns: Optional[np.ndarray] = None
+        self.min_msn: Optional[int] = None
+        self.max_msn: Optional[int] = None
+
+        if constraints is None:
+            return
+
+        if constraints.include_msns is not None and len(constraints.include_msns) > 0:
+            self.include_msns = _to_sorted_msn_array(constraints.include_msns)
+            return
+
+        self.exclude_msns = _to_sorted_msn_array(constraints.exclude_msns)
+        self.min_msn = constraints.min_msn
+        self.max_msn = constraints.max_msn
+
+    def msn_code(self, msn: int) -> ReasonCode:
+        """
+            Method to check one MSN with Python integers, for MSNs outside the int64 range.
+            Mirrors AircraftEvaluator._check_msn_constraints.
+        """
+        constraints = self.ad.applicability_rules.msn_constraints
+        if constraints is None:
+            return ReasonCode.AFFECTED
+        if constraints.include_msns is not None and len(constraints.include_msns) > 0:
+            return ReasonCode.AFFECTED if msn in constraints.include_msns else ReasonCode.MSN_NOT_IN_INCLUDE_LIST
+        if constraints.exclude_msns is not None and msn in constraints.exclude_msns:
+            return ReasonCode.MSN_EXCLUDED
+        if constraints.min_msn is not None and msn < constraints.min_msn:
+            return ReasonCode.MSN_BELOW_MIN
+        if constraints.max_msn is not None and msn > constraints.max_msn:
+            return ReasonCode.MSN_ABOVE_MAX
+        return ReasonCode.AFFECTED
+
+
+class CompiledADCorpus:
+    """
+        AD corpus precompiled for batch evaluation: model index, exemption index,
+        sorted MSN include/exclude sets and per-AD MSN bounds.
+    """
+    def __init__(
+        self,
+        ads: list[ADDocument],
+        model_index: Optional[ModelIndex] = None,
+        exemption_index: Optional[ExemptionIndex] = None
+    ) -> None:
+        self.ads = list(ads)
+        self.model_index = model_index or ModelIndex(self.ads)
+        self.exemption_index = exemption_index or ExemptionIndex(self.ads)
+        self.compiled_ads = [_CompiledAD(ad) for ad in self.ads]
+
+        id_counts: dict[str, int] = {}
+        for ad in self.ads:
+            id_counts[ad.ad_id] = id_counts.get(ad.ad_id, 0) + 1
+        self._ambiguous_columns = [
+            col for col, ad in enumerate(self.ads) if id_counts[ad.ad_id] > 1
+        ]
+        self._columns_by_id: dict[str, list[int]] = {}
+        for col, ad in enumerate(self.ads):
+            self._columns_by_id.setdefault(ad.ad_id, []).append(col)
+
+    async def model_mask_row(self, evaluator: AircraftEvaluator, aircraft_model: str) -> np.ndarray:
+        """
+            Method to compute which AD columns name this model or one of its variants.
+        """
+        row = np.zeros(len(self.ads), dtype=bool)
+        for ad_id in self.model_index.matching_ad_ids(aircraft_model):
+            row[self._columns_by_id.get(ad_id, [])] = True
+
+        # ADs sharing an ID cannot be told apart by the index, so confirm them one by one
+        for col in self._ambiguous_columns:
+            if row[col]:
+                matched, _ = await evaluator._check_model_match(
+                    aircraft_model, self.ads[col].applicability_rules.aircraft_models
+                )
+                row[col] = matched
+        return row
+
+
+class BatchEvaluationResult:
+    """
+        Affected matrix of a fleet against an AD corpus. Reasons are rendered
+        only for the cells that are requested.
+    """
+    def __init__(
+        self,
+        aircraft: list[AircraftConfiguration],
+        ads: list[ADDocument],
+        reason_codes: np.ndarray,
+        evaluator: AircraftEvaluator,
+    ) -> None:
+        self.aircraft = aircraft
+        self.ads = ads
+        self.reason_codes = reason_codes
+        self._evaluator = evaluator
+        self._reason_cache: dict[tuple, str] = {}
+
+    @property
+    def affected(self) -> np.ndarray:
+        return self.reason_codes == ReasonCode.AFFECTED
+
+    async def reason(self, row: int, col: int) -> str:
+        """
+            Method to render the human-readable reason for a single cell.
+        """
+        aircraft = self.aircraft[row]
+        ad = self.ads[col]
+        code = ReasonCode(int(self.reason_codes[row, col]))
+        rules = ad.applicability_rules
+
+        if code in (ReasonCode.MODEL_NOT_MATCHED, ReasonCode.AFFECTED):
+            cache_key = (code, aircraft.aircraft_model, col)
+        elif code == ReasonCode.MODIFICATION_EXEMPTED:
+            cache_key = (code, aircraft.aircraft_model, tuple(aircraft.modifications_applied or []), col)
+        else:
+            cache_key = (code, aircraft.msn, col)
+
+        cached = self._reason_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        if code == ReasonCode.MODEL_NOT_MATCHED:
+            reason = self._evaluator._model_mismatch_key(aircraft, ad).reason
+        elif code == ReasonCode.AFFECTED:
+            _, model_reason = await self._evaluator._check_model_match(
+                aircraft.aircraft_model, rules.aircraft_models
+            )
+            reason = f"Aircraft matches affected model '{model_reason}' and meets all AD criteria"
+        elif code == ReasonCode.MODIFICATION_EXEMPTED:
+            _, reason = await self._evaluator._check_modification_exemptions(
+                aircraft.aircraft_model,
+                aircraft.modifications_applied or [],
+                rules.excluded_if_modifications
+            )
+        else:
+            _, reason = await self._evaluator._check_msn_constraints(aircraft.msn, rules.msn_constraints)
+
+        self._reason_cache[cache_key] = reason
+        return reason
+
+    async def evaluation_key(self, row: int, col: int) -> EvaluationKey:
+        return EvaluationKey(
+            ad_id=self.ads[col].ad_id,
+            is_affected=bool(self.reason_codes[row, col] == ReasonCode.AFFECTED),
+            reason=await self.reason(row, col)
+        )
+
+    async def to_evaluation_results(self, rows: Optional[Iterable[int]] = None) -> list[EvaluationResult]:
+        """
+            Method to build EvaluationResult objects for the requested rows (all rows by default).
+        """
+        if rows is None:
+            rows = range(len(self.aircraft))
+
+        results = []
+        for row in rows:
+            results.append(EvaluationResult(
+                aircraft=self.aircraft[row],
+                results=[await self.evaluation_key(row, col) for col in range(len(self.ads))]
+            ))
+        return results
+
+    async def exclusion_index(self, row: int, col: int) -> Optional[int]:
+        """
+            Method to find which exclusion of the AD exempts a MODIFICATION_EXEMPTED cell.
+        """
+        aircraft = self.aircraft[row]
+        exclusions = self.ads[col].applicability_rules.excluded_if_modifications
+        match = await self._evaluator._find_exempting_modification(
+            aircraft.aircraft_model,
+            aircraft.modifications_applied or [],
+            exclusions
+        )
+        return match[0] if match is not None else None
+
+    async def to_compact(self, reason_cells: Iterable[tuple[int, int]] = ()) -> CompactEvaluationResponse:
+        """
+            Method to build the columnar response: aircraft and AD indexes, the affected bitmap, the
+            reason code matrix and the per-AD parameters of the codes, with the matching exclusion of
+            exempted cells. Human-readable reasons are rendered only for `reason_cells` (row, col).
+        """
+        row_major_codes = np.ascontiguousarray(self.reason_codes)
+
+        exemptions = []
+        exclusion_cache: dict[tuple, Optional[int]] = {}
+        for row, col in zip(*np.nonzero(row_major_codes == ReasonCode.MODIFICATION_EXEMPTED)):
+            row, col = int(row), int(col)
+            aircraft = self.aircraft[row]
+            cache_key = (aircraft.aircraft_model, tuple(aircraft.modifications_applied or []), col)
+            if cache_key not in exclusion_cache:
+                exclusion_cache[cache_key] = await self.exclusion_index(row, col)
+            if exclusion_cache[cache_key] is not None:
+                exemptions.append(CellExemption(aircraft=row, ad=col, exclusion=exclusion_cache[cache_key]))
+
+        return CompactEvaluationResponse(
+            status="success",
+            aircraft_index=[
+                AircraftKey(aircraft_model=aircraft.aircraft_model, msn=aircraft.msn)
+                for aircraft in self.aircraft
+            ],
+            ad_index=[ad.ad_id for ad in self.ads],
+            affected_bitmap=base64.b64encode(np.packbits(row_major_codes == ReasonCode.AFFECTED)).decode("ascii"),
+            reason_codes=base64.b64encode(row_major_codes.tobytes()).decode("ascii"),
+            reason_code_names=[code.name for code in ReasonCode],
+            ad_params=[_ad_params(ad) for ad in self.ads],
+            exemptions=exemptions,
+            reasons=[
+                CellReason(
+                    aircraft=row,
+                    ad=col,
+                    reason_code=int(self.reason_codes[row, col]),
+                    reason=await self.reason(row, col)
+                )
+                for row, col in reason_cells
+            ]
+        )
+
+
+class BatchAircraftEvaluator:
+    """
+        Vectorized evaluation of a whole fleet against a whole AD corpus.
+        Produces the same verdicts as AircraftEvaluator.evaluate for every cell.
+    """
+    def __init__(self, evaluator: Optional[AircraftEvaluator] = None) -> None:
+        self._evaluator = evaluator or AircraftEvaluator()
+        self._corpus: Optional[CompiledADCorpus] = None
+
+    def compile(self, ads: list[ADDocument]) -> CompiledADCorpus:
+        """
+            Method to return the compiled corpus for the given ADs, recompiling only when they change.
+        """
+        corpus = self._corpus
+        same_corpus = (
+            corpus is not None
+            and len(ads) == len(corpus.ads)
+            and all(a is b for a, b in zip(ads, corpus.ads))
+        )
+        if not same_corpus:
+            self._corpus = CompiledADCorpus(
+                ads,
+                self._evaluator.get_model_index(list(ads)),
+                self._evaluator.get_exemption_index(list(ads))
+            )
+        return self._corpus
+
+    async def evaluate(
+        self,
+        aircrafts: list[AircraftConfiguration],
+        ads: list[ADDocument]
+    ) -> BatchEvaluationResult:
+        """
+            Method to compute the affected matrix of the fleet against all given ADs.
+        """
+        started = time.perf_counter()
+        corpus = self.compile(ads)
+        n_aircraft, n_ads = len(aircrafts), len(corpus.ads)
+
+        model_codes: dict[str, int] = {}
+        aircraft_model_codes = np.empty(n_aircraft, dtype=np.int64)
+        msns = np.zeros(n_aircraft, dtype=np.int64)
+        has_msn = np.zeros(n_aircraft, dtype=bool)
+        profile_codes: dict[tuple[str, tuple[str, ...]], int] = {}
+        aircraft_profile_codes = np.full(n_aircraft, -1, dtype=np.int64)
+        oversized_msn_rows: list[int] = []
+
+        for row, aircraft in enumerate(aircrafts):
+            aircraft_model_codes[row] = model_codes.setdefault(aircraft.aircraft_model, len(model_codes))
+            if aircraft.msn is not None:
+                if _INT64_MIN <= aircraft.msn <= _INT64_MAX:
+                    msns[row] = aircraft.msn
+                    has_msn[row] = True
+                else:
+                    oversized_msn_rows.append(row)
+            if aircraft.modifications_applied:
+                profile = (aircraft.aircraft_model, tuple(aircraft.modifications_applied))
+                aircraft_profile_codes[row] = profile_codes.setdefault(profile, len(profile_codes))
+
+        model_mask = np.zeros((len(model_codes), n_ads), dtype=bool)
+        for model, code in model_codes.items():
+            model_mask[code] = await corpus.model_mask_row(self._evaluator, model)
+
+        # Each distinct (model, mods) profile is resolved against the whole corpus once
+        exempt_profiles_by_col: dict[int, list[int]] = {}
+        for (aircraft_model, applied_mods), profile_code in profile_codes.items():
+            for col in corpus.exemption_index.find_exemptions(aircraft_model, list(applied_mods)):
+                exempt_profiles_by_col.setdefault(col, []).append(profile_code)
+
+        # Column-major so that writing one AD's column is a contiguous copy
+        reason_codes = np.empty((n_aircraft, n_ads), dtype=np.uint8, order="F")
+
+        for col, compiled in enumerate(corpus.compiled_ads):
+            matched = model_mask[aircraft_model_codes, col]
+            column = np.where(matched, ReasonCode.AFFECTED, ReasonCode.MODEL_NOT_MATCHED).astype(np.uint8)
+
+            if compiled.has_constraints:
+                checked = matched & has_msn
+                if compiled.include_msns is not None:
+                    column[checked & ~_sorted_membership(msns, compiled.include_msns)] = ReasonCode.MSN_NOT_IN_INCLUDE_LIST
+                else:
+                    if compiled.exclude_msns is not None:
+                        excluded = checked & _sorted_membership(msns, compiled.exclude_msns)
+                        column[excluded] = ReasonCode.MSN_EXCLUDED
+                        checked &= ~excluded
+                    if compiled.min_msn is not None:
+                        below = checked & (msns < compiled.min_msn)
+                        column[below] = ReasonCode.MSN_BELOW_MIN
+                        checked &= ~below
+                    if compiled.max_msn is not None:
+                        column[checked & (msns > compiled.max_msn)] = ReasonCode.MSN_ABOVE_MAX
+
+            if col in exempt_profiles_by_col:
+                candidates = (column == ReasonCode.AFFECTED) & (aircraft_profile_codes >= 0)
+                if candidates.any():
+                    exempt_profiles = np.zeros(len(profile_codes), dtype=bool)
+                    exempt_profiles[exempt_profiles_by_col[col]] = True
+                    exempt_rows = candidates.copy()
+                    exempt_rows[candidates] = exempt_profiles[aircraft_profile_codes[candidates]]
+                    column[exempt_rows] = ReasonCode.MODIFICATION_EXEMPTED
+
+            reason_codes[:, col] = column
+
+        # MSNs that do not fit in int64 skipped the vectorized MSN checks; check them one by one
+        for row in oversized_msn_rows:
+            for col, compiled in enumerate(corpus.compiled_ads):
+                if compiled.has_constraints and reason_codes[row, col] in (ReasonCode.AFFECTED, ReasonCode.MODIFICATION_EXEMPTED):
+                    code = compiled.msn_code(aircrafts[row].msn)
+                    if code != ReasonCode.AFFECTED:
+                        reason_codes[row, col] = code
+
+        metrics.observe_stage("batch_evaluate", time.perf_counter() - started)
+        return BatchEvaluationResult(aircrafts, corpus.ads, reason_codes, self._evaluator)
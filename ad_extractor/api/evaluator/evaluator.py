@@ -1,5 +1,6 @@
-import re
+import time
 from typing import Optional
+from api.metrics import metrics
 from api.schema import (
     ADDocument,
     AircraftConfiguration,
@@ -8,16 +9,30 @@ from api.schema import (
     MSNConstraint,
     ExcludeIfModification,
 )
+from api.evaluator.model_index import ModelIndex
+from api.evaluator.exemption_index import (
+    ExemptionIndex,
+    extract_identifiers,
+    normalize_mod_name,
+)
+
 
+class AircraftEvaluator:
+    def __init__(self) -> None:
+        self._model_index_ads: tuple[ADDocument, ...] = ()
+        self._model_index: Optional[ModelIndex] = None
+        self._exemption_index_ads: tuple[ADDocument, ...] = ()
+        self._exemption_index: Optional[ExemptionIndex] = None
 
-class AircraftEvaluator:    
     async def evaluate(
             self, 
             aircraft: AircraftConfiguration, 
-            ad: ADDocument
+            ad: ADDocument,
+            exemption: Optional[tuple[bool, str]] = None
     ) -> EvaluationResult:
         """
             Method to evaluate the single given aircraft configuration against the AD's applicability rules.
+            `exemption` is an already computed modification exemption check, e.g. from the exemption index.
         """
         rules = ad.applicability_rules
         
@@ -29,11 +44,7 @@ class AircraftEvaluator:
         if not model_matched:
             return EvaluationResult(
                 aircraft=aircraft,
-                results=[EvaluationKey(
-                    ad_id=ad.ad_id,
-                    is_affected=False,
-                    reason=f"Aircraft model '{aircraft.aircraft_model}' not in affected models: {rules.aircraft_models}"
-                )]
+                results=[self._model_mismatch_key(aircraft, ad)]
             )
         
         msn_passed, msn_reason = await self._check_msn_constraints(
@@ -51,11 +62,13 @@ class AircraftEvaluator:
                 )]
             )
         
-        exempted, exemption_reason = await self._check_modification_exemptions(
-            aircraft.aircraft_model,
-            aircraft.modifications_applied or [],
-            rules.excluded_if_modifications
-        )
+        if exemption is None:
+            exemption = await self._check_modification_exemptions(
+                aircraft.aircraft_model,
+                aircraft.modifications_applied or [],
+                rules.excluded_if_modifications
+            )
+        exempted, exemption_reason = exemption
         
         if exempted:
             return EvaluationResult(
@@ -76,6 +89,17 @@ class AircraftEvaluator:
             )]
         )
     
+    def _model_mismatch_key(
+        self,
+        aircraft: AircraftConfiguration,
+        ad: ADDocument
+    ) -> EvaluationKey:
+        return EvaluationKey(
+            ad_id=ad.ad_id,
+            is_affected=False,
+            reason=f"Aircraft model '{aircraft.aircraft_model}' not in affected models: {ad.applicability_rules.aircraft_models}"
+        )
+
     async def _check_model_match(
         self, 
         aircraft_model: str, 
@@ -160,15 +184,34 @@ class AircraftEvaluator:
         if not excluded_if_modifications:
             return False, "No exempting modifications defined"
         
-        for exclusion in excluded_if_modifications:
+        match = await self._find_exempting_modification(aircraft_model, applied_mods, excluded_if_modifications)
+        if match is not None:
+            index, applied = match
+            return True, self._exemption_reason(applied, excluded_if_modifications[index].modification)
+        
+        return False, "No applicable exempting modifications found"
+    
+    async def _find_exempting_modification(
+        self,
+        aircraft_model: str,
+        applied_mods: list[str],
+        excluded_if_modifications: list[ExcludeIfModification]
+    ) -> Optional[tuple[int, str]]:
+        """
+            Method to find the first exclusion exempting the aircraft: its index and the applied modification matching it.
+        """
+        for index, exclusion in enumerate(excluded_if_modifications):
             if not await self._exclusion_applies_to_model(exclusion, aircraft_model):
                 continue
             
             for applied in applied_mods:
                 if await self._fuzzy_mod_match(applied, exclusion.modification):
-                    return True, f"Has exempting modification: '{applied}' matches '{exclusion.modification}'"
+                    return index, applied
         
-        return False, "No applicable exempting modifications found"
+        return None
+    
+    def _exemption_reason(self, applied: str, exempting: str) -> str:
+        return f"Has exempting modification: '{applied}' matches '{exempting}'"
     
     async def _exclusion_applies_to_model(
         self,
@@ -218,44 +261,81 @@ class AircraftEvaluator:
         """
             Method to normalize modification names for comparison.
         """
-        normalized = name.upper()
-        normalized = re.sub(r'\s*\([^)]*\)\s*', ' ', normalized)
-        normalized = ' '.join(normalized.split())
-        return normalized.strip()
+        return normalize_mod_name(name)
     
     async def _extract_identifiers(self, text: str) -> set[str]:
         """
             Method to extract numeric and alphanumeric identifiers from modification names.
         """
-        identifiers = set()
-        
-        numbers = re.findall(r'\d+', text)
-        identifiers.update(numbers)
-        
-        codes = re.findall(r'[A-Z]+\d+', text)
-        identifiers.update(codes)
-        
-        alphanum = re.sub(r'[^A-Z0-9]', '', text)
-        if alphanum:
-            identifiers.add(alphanum)
-        
-        return identifiers
+        return extract_identifiers(text)
     
+    def _is_same_corpus(self, corpus: tuple[ADDocument, ...], indexed: tuple[ADDocument, ...]) -> bool:
+        return len(corpus) == len(indexed) and all(a is b for a, b in zip(corpus, indexed))
+
+    def get_model_index(self, ads: list[ADDocument]) -> ModelIndex:
+        """
+            Method to return the compiled model index for the given AD corpus.
+            The index is rebuilt only when the corpus changes.
+        """
+        corpus = tuple(ads)
+        if self._model_index is None or not self._is_same_corpus(corpus, self._model_index_ads):
+            self._model_index = ModelIndex(corpus)
+            self._model_index_ads = corpus
+        return self._model_index
+
+    def get_exemption_index(self, ads: list[ADDocument]) -> ExemptionIndex:
+        """
+            Method to return the modification exemption index for the given AD corpus.
+            The index is rebuilt only when the corpus changes.
+        """
+        corpus = tuple(ads)
+        if self._exemption_index is None or not self._is_same_corpus(corpus, self._exemption_index_ads):
+            self._exemption_index = ExemptionIndex(corpus)
+            self._exemption_index_ads = corpus
+        return self._exemption_index
+
     async def evaluate_against_multiple_ads(
         self,
         aircraft: AircraftConfiguration,
-        ads: list[ADDocument]
+        ads: list[ADDocument],
+        model_index: Optional[ModelIndex] = None,
+        exemption_index: Optional[ExemptionIndex] = None
     ) -> EvaluationResult:
         """
             Method to evaluate a single aircraft configuration against multiple ADs.
             Returns a single EvaluationResult with multiple EvaluationKey entries.
+            ADs whose models cannot match the aircraft are skipped via the model index,
+            and modification exemptions are looked up once for the whole corpus.
         """
+        started = time.perf_counter()
+        if model_index is None:
+            model_index = self.get_model_index(ads)
+        if exemption_index is None:
+            exemption_index = self.get_exemption_index(ads)
+        candidate_ad_ids = model_index.matching_ad_ids(aircraft.aircraft_model)
+
+        applied_mods = aircraft.modifications_applied or []
+        exemptions = exemption_index.find_exemptions(aircraft.aircraft_model, applied_mods) if applied_mods else {}
+
         evaluation_keys = []
-        for ad in ads:
-            result = await self.evaluate(aircraft, ad)
+        for position, ad in enumerate(ads):
+            if ad.ad_id not in candidate_ad_ids:
+                evaluation_keys.append(self._model_mismatch_key(aircraft, ad))
+                continue
+
+            exemption = None
+            if applied_mods and ad.applicability_rules.excluded_if_modifications:
+                match = exemptions.get(position)
+                if match is None:
+                    exemption = (False, "No applicable exempting modifications found")
+                else:
+                    exemption = (True, self._exemption_reason(*match))
+
+            result = await self.evaluate(aircraft, ad, exemption)
             if result.results:
                 evaluation_keys.extend(result.results)
         
+        metrics.observe_stage("evaluate_aircraft", time.perf_counter() - started)
         return EvaluationResult(
             aircraft=aircraft,
             results=evaluation_keys
@@ -0,0 +1,171 @@
+import re
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from api.schema import ADDocument
+from api.evaluator.model_index import normalize_model_name
+
+
+_PARENTHETICAL = re.compile(r'\s*\([^)]*\)\s*')
+_NUMBERS = re.compile(r'\d+')
+_CODES = re.compile(r'[A-Z]+\d+')
+_NON_ALPHANUMERIC = re.compile(r'[^A-Z0-9]')
+
+# Longest n-gram indexed for substring lookups of applied modification names
+_MAX_GRAM = 3
+# Distinct applied modification names whose matches are kept per index
+MATCH_CACHE_SIZE = 4096
+
+
+def normalize_mod_name(name: str) -> str:
+    """
+        Normalize a modification name: upper case, parentheticals removed, whitespace collapsed.
+    """
+    normalized = name.upper()
+    normalized = _PARENTHETICAL.sub(' ', normalized)
+    normalized = ' '.join(normalized.split())
+    return normalized.strip()
+
+
+def extract_identifiers(text: str) -> set[str]:
+    """
+        Extract numeric and alphanumeric identifiers from a normalized modification name.
+    """
+    identifiers = set(_NUMBERS.findall(text))
+    identifiers.update(_CODES.findall(text))
+
+    alphanum = _NON_ALPHANUMERIC.sub('', text)
+    if alphanum:
+        identifiers.add(alphanum)
+
+    return identifiers
+
+
+class _ExemptionEntry:
+    __slots__ = ("ad_position", "exclusion_position", "modification", "applicable_models")
+
+    def __init__(
+        self,
+        ad_position: int,
+        exclusion_position: int,
+        modification: str,
+        applicable_models: Optional[tuple[str, ...]]
+    ) -> None:
+        self.ad_position = ad_position
+        self.exclusion_position = exclusion_position
+        self.modification = modification
+        self.applicable_models = applicable_models
+
+    def applies_to(self, normalized_model: str) -> bool:
+        if self.applicable_models is None:
+            return True
+        return any(
+            normalized_model.startswith(model) or model.startswith(normalized_model)
+            for model in self.applicable_models
+        )
+
+
+class ExemptionIndex:
+    """
+        Inverted index over the exempting modifications of an AD corpus.
+        Exemption names are normalized once; the matches of the most recent
+        MATCH_CACHE_SIZE distinct applied modifications are cached and reused across the fleet.
+        Matching follows AircraftEvaluator._fuzzy_mod_match: equal or substring
+        normalized names, or at least one shared identifier. Substring matches are found
+        through the name table and an n-gram index, not by scanning every exemption name.
+    """
+    def __init__(self, ads: Iterable[ADDocument]) -> None:
+        self._entries: list[_ExemptionEntry] = []
+        self._entries_by_identifier: dict[str, set[int]] = {}
+        self._entries_by_name: dict[str, set[int]] = {}
+        self._names_by_gram: dict[str, set[str]] = {}
+        self._max_name_length = 0
+        self._matching_entries = lru_cache(maxsize=MATCH_CACHE_SIZE)(self._resolve_matching_entries)
+
+        for ad_position, ad in enumerate(ads):
+            for exclusion_position, exclusion in enumerate(ad.applicability_rules.excluded_if_modifications):
+                applicable_models = None
+                if exclusion.applicable_models:
+                    applicable_models = tuple(normalize_model_name(model) for model in exclusion.applicable_models)
+
+                entry_id = len(self._entries)
+                self._entries.append(_ExemptionEntry(
+                    ad_position, exclusion_position, exclusion.modification, applicable_models
+                ))
+
+                normalized = normalize_mod_name(exclusion.modification)
+                self._entries_by_name.setdefault(normalized, set()).add(entry_id)
+                for identifier in extract_identifiers(normalized):
+                    self._entries_by_identifier.setdefault(identifier, set()).add(entry_id)
+
+        for name in self._entries_by_name:
+            self._max_name_length = max(self._max_name_length, len(name))
+            for size in range(1, _MAX_GRAM + 1):
+                for start in range(len(name) - size + 1):
+                    self._names_by_gram.setdefault(name[start:start + size], set()).add(name)
+
+    def _names_within(self, applied_norm: str) -> Iterable[str]:
+        """
+            Exemption names that are substrings of the applied name: one name-table lookup
+            per substring no longer than the longest exemption name.
+        """
+        for start in range(len(applied_norm) + 1):
+            stop = min(len(applied_norm), start + self._max_name_length)
+            for end in range(start, stop + 1):
+                if applied_norm[start:end] in self._entries_by_name:
+                    yield applied_norm[start:end]
+
+    def _names_containing(self, applied_norm: str) -> Iterable[str]:
+        """
+            Exemption names containing the applied name: candidates share its rarest n-gram.
+        """
+        if not applied_norm:
+            return self._entries_by_name.keys()
+        size = min(_MAX_GRAM, len(applied_norm))
+        postings = [
+            self._names_by_gram.get(applied_norm[start:start + size], set())
+            for start in range(len(applied_norm) - size + 1)
+        ]
+        candidates = min(postings, key=len)
+        return [name for name in candidates if applied_norm in name]
+
+    def _resolve_matching_entries(self, applied: str) -> frozenset[int]:
+        applied_norm = normalize_mod_name(applied)
+        matched: set[int] = set()
+
+        for identifier in extract_identifiers(applied_norm):
+            matched.update(self._entries_by_identifier.get(identifier, ()))
+
+        for name in (*self._names_within(applied_norm), *self._names_containing(applied_norm)):
+            matched.update(self._entries_by_name[name])
+
+        return frozenset(matched)
+
+    def find_exemptions(
+        self,
+        aircraft_model: str,
+        applied_mods: list[str]
+    ) -> dict[int, tuple[str, str]]:
+        """
+            Method to find every AD (by position in the corpus) exempted for this aircraft.
+            Maps AD position to the (applied modification, exempting modification) pair that
+            the scalar evaluator would report: first matching exclusion, then first applied mod.
+        """
+        normalized_model = normalize_model_name(aircraft_model)
+        best: dict[int, tuple[int, int, str, str]] = {}
+
+        for applied_position, applied in enumerate(applied_mods):
+            for entry_id in self._matching_entries(applied):
+                entry = self._entries[entry_id]
+                current = best.get(entry.ad_position)
+                rank = (entry.exclusion_position, applied_position)
+                if current is not None and current[:2] <= rank:
+                    continue
+                if not entry.applies_to(normalized_model):
+                    continue
+                best[entry.ad_position] = (*rank, applied, entry.modification)
+
+        return {
+            ad_position: (applied, modification)
+            for ad_position, (_, _, applied, modification) in best.items()
+        }
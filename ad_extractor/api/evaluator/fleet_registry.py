@@ -0,0 +1,232 @@
+import asyncio
+import json
+import os
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+
+from api.schema import ADDocument
+from api.evaluator.batch_evaluator import (
+    BatchAircraftEvaluator,
+    BatchEvaluationResult,
+    ReasonCode,
+)
+from api.evaluator.evaluator import AircraftEvaluator
+from api.evaluator.schema import FleetAircraft
+from api.registry import ADCorpusSnapshot, OUTPUT_DIR
+from api.utils import dump_output_json
+
+
+def _read_fleet_file(fleet_path: Path) -> list[FleetAircraft]:
+    if not fleet_path.exists():
+        return []
+    data = json.loads(fleet_path.read_bytes())
+    return [FleetAircraft.model_validate(item) for item in data.get("aircraft", [])]
+
+
+def _write_fleet_file(fleet_path: Path, aircraft: list[FleetAircraft]) -> None:
+    fleet_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = fleet_path.with_name(f".{fleet_path.name}.tmp")
+    tmp_path.write_bytes(dump_output_json({"aircraft": aircraft}))
+    os.replace(tmp_path, fleet_path)
+
+
+class FleetRegistry:
+    """
+        Stored fleet with a materialized reason-code table (aircraft rows x AD columns).
+        Changing an aircraft re-evaluates only its row; a new or revised AD in the
+        corpus snapshot re-evaluates only its column. Compliance queries read the table.
+    """
+    def __init__(self, fleet_path: Path, evaluator: Optional[AircraftEvaluator] = None) -> None:
+        self.fleet_path = fleet_path
+        self._evaluator = evaluator or AircraftEvaluator()
+        self._batch_evaluator = BatchAircraftEvaluator(self._evaluator)
+        # Column updates compile a subset of the corpus. They get their own evaluator and indexes,
+        # so the full-corpus compilation and indexes used for row updates stay cached
+        self._column_evaluator = BatchAircraftEvaluator(AircraftEvaluator())
+        self._lock = asyncio.Lock()
+
+        # Row r is self._aircraft[r], column c is self._ads[c]; both stay dense
+        self._aircraft: list[FleetAircraft] = []
+        self._row_of: dict[str, int] = {}
+        self._ads: list[ADDocument] = []
+        self._col_of: dict[str, int] = {}
+        self._codes = np.zeros((0, 0), dtype=np.uint8)
+        self._snapshot_version: Optional[int] = None
+
+    @property
+    def aircraft(self) -> list[FleetAircraft]:
+        return list(self._aircraft)
+
+    @property
+    def ads(self) -> list[ADDocument]:
+        return list(self._ads)
+
+    def _reserve(self, rows: int, cols: int) -> None:
+        capacity_rows, capacity_cols = self._codes.shape
+        if rows <= capacity_rows and cols <= capacity_cols:
+            return
+        grown = np.zeros(
+            (max(rows, capacity_rows * 2, 16), max(cols, capacity_cols * 2, 16)),
+            dtype=np.uint8
+        )
+        grown[:capacity_rows, :capacity_cols] = self._codes
+        self._codes = grown
+
+    def _remove_row(self, aircraft_id: str) -> None:
+        row = self._row_of.pop(aircraft_id)
+        last = len(self._aircraft) - 1
+        if row != last:
+            moved = self._aircraft[last]
+            self._aircraft[row] = moved
+            self._row_of[moved.aircraft_id] = row
+            self._codes[row, :len(self._ads)] = self._codes[last, :len(self._ads)]
+        self._aircraft.pop()
+
+    def _remove_column(self, ad_id: str) -> None:
+        col = self._col_of.pop(ad_id)
+        last = len(self._ads) - 1
+        if col != last:
+            moved = self._ads[last]
+            self._ads[col] = moved
+            self._col_of[moved.ad_id] = col
+            self._codes[:len(self._aircraft), col] = self._codes[:len(self._aircraft), last]
+        self._ads.pop()
+
+    async def _evaluate_rows(self, rows: list[int]) -> None:
+        if not rows or not self._ads:
+            return
+        result = await self._batch_evaluator.evaluate([self._aircraft[row] for row in rows], self._ads)
+        self._codes[np.asarray(rows), :len(self._ads)] = result.reason_codes
+
+    async def _evaluate_columns(self, cols: list[int]) -> None:
+        if not cols or not self._aircraft:
+            return
+        result = await self._column_evaluator.evaluate(self._aircraft, [self._ads[col] for col in cols])
+        self._codes[:len(self._aircraft), np.asarray(cols)] = result.reason_codes
+
+    async def _sync(self, snapshot: ADCorpusSnapshot) -> None:
+        if self._snapshot_version is not None and snapshot.version <= self._snapshot_version:
+            return
+
+        for ad_id in [ad.ad_id for ad in self._ads if ad.ad_id not in snapshot.ads]:
+            self._remove_column(ad_id)
+
+        changed_cols = []
+        for ad_id, ad in snapshot.ads.items():
+            col = self._col_of.get(ad_id)
+            if col is None:
+                col = len(self._ads)
+                self._reserve(len(self._aircraft), col + 1)
+                self._ads.append(ad)
+                self._col_of[ad_id] = col
+            elif self._ads[col] is ad:
+                continue
+            else:
+                self._ads[col] = ad
+            changed_cols.append(col)
+
+        await self._evaluate_columns(changed_cols)
+        self._snapshot_version = snapshot.version
+
+    async def load(self, snapshot: ADCorpusSnapshot) -> None:
+        """
+            Method to load the stored fleet and materialize its table against the given corpus.
+        """
+        stored = await asyncio.to_thread(_read_fleet_file, self.fleet_path)
+        async with self._lock:
+            self._aircraft = []
+            self._row_of = {}
+            for aircraft in stored:
+                if aircraft.aircraft_id in self._row_of:
+                    self._aircraft[self._row_of[aircraft.aircraft_id]] = aircraft
+                    continue
+                self._row_of[aircraft.aircraft_id] = len(self._aircraft)
+                self._aircraft.append(aircraft)
+
+            self._ads = []
+            self._col_of = {}
+            self._codes = np.zeros((0, 0), dtype=np.uint8)
+            self._reserve(len(self._aircraft), len(snapshot.ads))
+            self._snapshot_version = None
+            await self._sync(snapshot)
+
+    async def sync(self, snapshot: ADCorpusSnapshot) -> None:
+        """
+            Method to bring the table up to date with a corpus snapshot.
+            Only columns of added or revised ADs are re-evaluated.
+        """
+        async with self._lock:
+            await self._sync(snapshot)
+
+    async def upsert_aircraft(
+        self,
+        aircraft: Iterable[FleetAircraft],
+        snapshot: ADCorpusSnapshot
+    ) -> list[str]:
+        """
+            Method to add or replace aircraft by aircraft_id. Only their rows are re-evaluated.
+        """
+        async with self._lock:
+            await self._sync(snapshot)
+
+            rows = {}
+            for item in aircraft:
+                row = self._row_of.get(item.aircraft_id)
+                if row is None:
+                    row = len(self._aircraft)
+                    self._reserve(row + 1, len(self._ads))
+                    self._aircraft.append(item)
+                    self._row_of[item.aircraft_id] = row
+                else:
+                    self._aircraft[row] = item
+                rows[item.aircraft_id] = row
+
+            await self._evaluate_rows(sorted(set(rows.values())))
+            await asyncio.to_thread(_write_fleet_file, self.fleet_path, list(self._aircraft))
+            return list(rows)
+
+    async def remove_aircraft(self, aircraft_id: str) -> bool:
+        """
+            Method to remove an aircraft from the fleet. Returns False if it was not registered.
+        """
+        async with self._lock:
+            if aircraft_id not in self._row_of:
+                return False
+            self._remove_row(aircraft_id)
+            await asyncio.to_thread(_write_fleet_file, self.fleet_path, list(self._aircraft))
+            return True
+
+    async def evaluation(self, aircraft_ids: Optional[list[str]] = None) -> BatchEvaluationResult:
+        """
+            Method to read the materialized evaluation of the fleet (or the given aircraft).
+            Raises KeyError for an unknown aircraft_id.
+        """
+        async with self._lock:
+            if aircraft_ids is None:
+                rows = list(range(len(self._aircraft)))
+            else:
+                rows = [self._row_of[aircraft_id] for aircraft_id in aircraft_ids]
+
+            codes = self._codes[np.asarray(rows, dtype=np.intp)][:, :len(self._ads)]
+            return BatchEvaluationResult(
+                [self._aircraft[row] for row in rows],
+                list(self._ads),
+                codes,
+                self._evaluator
+            )
+
+    async def affected_aircraft_ids(self, ad_id: str) -> list[str]:
+        """
+            Method to list the aircraft affected by an AD. Raises KeyError for an unknown ad_id.
+        """
+        async with self._lock:
+            col = self._col_of[ad_id]
+            rows = np.flatnonzero(self._codes[:len(self._aircraft), col] == ReasonCode.AFFECTED)
+            return [self._aircraft[row].aircraft_id for row in rows]
+
+
+FLEET_PATH = OUTPUT_DIR / "fleet.json"
+
+fleet_registry = FleetRegistry(FLEET_PATH)
@@ -0,0 +1,62 @@
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Iterable
+
+from api.schema import ADDocument
+
+
+def normalize_model_name(model: str) -> str:
+    """
+        Normalize an aircraft model name the same way the evaluator compares variants.
+    """
+    return model.upper().replace(" ", "").replace("-", "")
+
+
+# Distinct aircraft models whose matching AD IDs are kept per index
+LOOKUP_CACHE_SIZE = 4096
+
+
+class ModelIndex:
+    """
+        Sorted-prefix table over the normalized aircraft models of an AD corpus.
+        A model matches an AD when either name is a prefix of the other, which
+        mirrors AircraftEvaluator._is_model_variant. Lookups of the most recent
+        LOOKUP_CACHE_SIZE distinct models are cached.
+    """
+    def __init__(self, ads: Iterable[ADDocument]) -> None:
+        self._ad_ids_by_model: dict[str, set[str]] = {}
+
+        for ad in ads:
+            for model in ad.applicability_rules.aircraft_models:
+                normalized = normalize_model_name(model)
+                self._ad_ids_by_model.setdefault(normalized, set()).add(ad.ad_id)
+
+        self._sorted_models: list[str] = sorted(self._ad_ids_by_model)
+        self._lookup = lru_cache(maxsize=LOOKUP_CACHE_SIZE)(self._resolve_matching_ad_ids)
+
+    def matching_ad_ids(self, aircraft_model: str) -> frozenset[str]:
+        """
+            Method to return the IDs of all ADs naming this model or a variant of it.
+        """
+        return self._lookup(normalize_model_name(aircraft_model))
+
+    def _resolve_matching_ad_ids(self, normalized: str) -> frozenset[str]:
+        matched: set[str] = set()
+
+        # Affected models that are a prefix of the aircraft model
+        for end in range(len(normalized) + 1):
+            ad_ids = self._ad_ids_by_model.get(normalized[:end])
+            if ad_ids:
+                matched.update(ad_ids)
+
+        # Affected models that start with the aircraft model
+        start = bisect_left(self._sorted_models, normalized)
+        for model in self._sorted_models[start:]:
+            if not model.startswith(normalized):
+                break
+            matched.update(self._ad_ids_by_model[model])
+
+        return frozenset(matched)
+
+    def may_match(self, aircraft_model: str, ad_id: str) -> bool:
+        return ad_id in self.matching_ad_ids(aircraft_model)
@@ -1,8 +1,52 @@
 from typing import Optional
 from pydantic import BaseModel, Field
 
-from api.schema import EvaluationResult
+from api.schema import AircraftConfiguration, EvaluationResult
 
 class EvaluationResponse(BaseModel):
     status: str = Field(..., description="Evaluation status: 'success' or 'failure'")
-    evaluation_results: Optional[list[EvaluationResult]] = Field(None, description="List of evaluation results for the provided aircraft configurations")
\ No newline at end of file
+    evaluation_results: Optional[list[EvaluationResult]] = Field(None, description="List of evaluation results for the provided aircraft configurations")
+
+class FleetAircraft(AircraftConfiguration):
+    aircraft_id: str = Field(..., description="Operator identifier of the aircraft (e.g., registration)")
+
+
+class FleetEvaluationResult(EvaluationResult):
+    aircraft: Optional[FleetAircraft] = Field(default=None, description="The registered aircraft evaluated")
+
+class FleetEvaluationResponse(BaseModel):
+    status: str = Field(..., description="Evaluation status: 'success' or a description of why no results were returned")
+    snapshot_version: Optional[int] = Field(None, description="Version of the AD corpus the results were computed against")
+    evaluation_results: Optional[list[FleetEvaluationResult]] = Field(None, description="Materialized evaluation results of the stored fleet")
+
+class AircraftKey(BaseModel):
+    aircraft_model: str = Field(..., description="Aircraft model (e.g., 'MD-11')")
+    msn: Optional[int] = Field(default=None, description="Manufacturer Serial Number")
+
+class CellReason(BaseModel):
+    aircraft: int = Field(..., description="Row in aircraft_index")
+    ad: int = Field(..., description="Column in ad_index")
+    reason_code: int = Field(..., description="Reason code of the cell, see reason_code_names")
+    reason: str = Field(..., description="Explanation of why affected/not affected")
+
+class ADParams(BaseModel):
+    aircraft_models: list[str] = Field(default_factory=list, description="Affected aircraft models of the AD")
+    min_msn: Optional[int] = Field(None, description="Minimum MSN (inclusive), for MSN_BELOW_MIN cells")
+    max_msn: Optional[int] = Field(None, description="Maximum MSN (inclusive), for MSN_ABOVE_MAX cells")
+    exclusions: list[str] = Field(default_factory=list, description="Exempting modifications of the AD, indexed by CellExemption.exclusion")
+
+class CellExemption(BaseModel):
+    aircraft: int = Field(..., description="Row in aircraft_index")
+    ad: int = Field(..., description="Column in ad_index")
+    exclusion: int = Field(..., description="Index of the matching modification in ad_params[ad].exclusions")
+
+class CompactEvaluationResponse(BaseModel):
+    status: str = Field(..., description="Evaluation status: 'success' or a description of why no results were returned")
+    aircraft_index: Optional[list[AircraftKey]] = Field(None, description="Aircraft per row, in request order")
+    ad_index: Optional[list[str]] = Field(None, description="AD ID per column")
+    affected_bitmap: Optional[str] = Field(None, description="Base64 of the row-major affected matrix packed 8 cells per byte, most significant bit first")
+    reason_codes: Optional[str] = Field(None, description="Base64 of the row-major reason code matrix, one byte per cell")
+    reason_code_names: Optional[list[str]] = Field(None, description="Name of each reason code, indexed by code")
+    ad_params: Optional[list[ADParams]] = Field(None, description="Parameters of the reason codes per AD column")
+    exemptions: list[CellExemption] = Field(default_factory=list, description="Matching exclusion of every MODIFICATION_EXEMPTED cell")
+    reasons: list[CellReason] = Field(default_factory=list, description="Human-readable reasons of the requested cells")
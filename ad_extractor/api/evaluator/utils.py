@@ -1,8 +1,9 @@
-import json
+import asyncio
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 from api.schema import AircraftConfiguration, EvaluationResult, ValidationKey, VerificationResult
+from api.utils import dump_output_json
 
 
 async def create_verification_result_dict(
@@ -36,31 +37,30 @@ async def create_verification_result_dict(
 
 
 async def format_verification_output(
-        verification_results: List[Dict[str, Any]]
+        verification_results: List[VerificationResult]
 ) -> List[Dict[str, Any]]:
     """
         Format the verification results for better readability.
     """
     formatted_results = []
     for result in verification_results:
-        aircraft = result.get("aircraft", {})
-        validation_keys = result.get("results", [])
+        aircraft = result.aircraft
         
         formatted_result = {
             "aircraft": {
-                "model": aircraft.get("aircraft_model"),
-                "msn": aircraft.get("msn"),
-                "modifications": ", ".join(aircraft.get("modifications_applied", [])) if aircraft.get("modifications_applied") else "None"
+                "model": aircraft.aircraft_model,
+                "msn": aircraft.msn,
+                "modifications": ", ".join(aircraft.modifications_applied) if aircraft.modifications_applied else "None"
             },
             "ad_results": []
         }
         
-        for val_key in validation_keys:
+        for val_key in result.results:
             formatted_result["ad_results"].append({
-                "ad_id": val_key.get("ad_id"),
-                "affected": val_key.get("is_affected"),
-                "expected": val_key.get("expected"),
-                "passed": val_key.get("pass_check")
+                "ad_id": val_key.ad_id,
+                "affected": val_key.is_affected,
+                "expected": val_key.expected,
+                "passed": val_key.pass_check
             })
         
         formatted_results.append(formatted_result)
@@ -68,28 +68,27 @@ async def format_verification_output(
 
 
 async def check_all_verification_passed(
-        verification_results: List[Dict[str, Any]]
+        verification_results: List[VerificationResult]
 ) -> bool:
     """
         Check if all verification results have passed.
     """
     for result in verification_results:
-        validation_keys = result.get("results", [])
-        for val_key in validation_keys:
-            if not val_key.get("pass_check", False):
+        for val_key in result.results:
+            if not val_key.pass_check:
                 return False
     return True
 
 
 async def save_evaluation_results(
     output_dir: Path,
-    test_results: List[Dict[str, Any]],
+    test_results: List[EvaluationResult],
     verification_results: List[Dict[str, Any]],
     all_passed: bool,
     filename: str = "evaluation_results.json"
 ) -> dict[str, Any]:
     """
-        Save evaluation results to a JSON file.
+        Save evaluation results to a JSON file. The file is written off the event loop.
     """
     results_output = {
         "test_aircraft_results": test_results,
@@ -98,11 +97,49 @@ async def save_evaluation_results(
     }
     
     results_file = output_dir / filename
-    with open(results_file, "w", encoding="utf-8") as f:
-        json.dump(results_output, f, indent=2)
+    await asyncio.to_thread(results_file.write_bytes, dump_output_json(results_output))
     
     return {
         "test_aircraft_results": test_results,
         "verification_results": verification_results,
         "all_verification_passed": all_passed
     }
+
+
+MAX_NDJSON_LINE_BYTES = 1024 * 1024
+
+
+async def iter_ndjson_lines(
+    byte_chunks: AsyncIterator[bytes],
+    max_line_bytes: int = MAX_NDJSON_LINE_BYTES
+) -> AsyncIterator[tuple[int, Optional[bytes]]]:
+    """
+        Split an incoming byte stream into NDJSON lines as they arrive.
+        Yields (line number, line) and skips blank lines. A line longer than `max_line_bytes`
+        is discarded up to the next newline and yielded as (line number, None).
+    """
+    buffer = b""
+    line_number = 0
+    oversized = False
+
+    async for chunk in byte_chunks:
+        *lines, tail = chunk.split(b"\n")
+        for line in lines:
+            line_number += 1
+            line, buffer = buffer + line, b""
+            if oversized or len(line) > max_line_bytes:
+                oversized = False
+                yield line_number, None
+            elif line.strip():
+                yield line_number, line
+
+        if oversized:
+            continue
+        buffer += tail
+        if len(buffer) > max_line_bytes:
+            oversized, buffer = True, b""
+
+    if oversized:
+        yield line_number + 1, None
+    elif buffer.strip():
+        yield line_number + 1, buffer
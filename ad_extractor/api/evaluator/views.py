@@ -1,34 +1,54 @@
+import asyncio
 import json
 from pathlib import Path
-from typing import Any
-from fastapi import APIRouter
+from typing import Any, AsyncIterator, Optional
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import Response
+from pydantic import ValidationError
+from pydantic_core import to_json
 
-from api.evaluator.schema import EvaluationResponse
+from api.evaluator.schema import (
+    CompactEvaluationResponse,
+    EvaluationResponse,
+    FleetAircraft,
+    FleetEvaluationResponse,
+    FleetEvaluationResult,
+)
 from api.evaluator.evaluator import AircraftEvaluator
+from api.evaluator.batch_evaluator import BatchAircraftEvaluator, BatchEvaluationResult
+from api.evaluator.fleet_registry import fleet_registry
 from api.evaluator.test_case import create_verification_aircraft, create_model_specific_exclusion_test
 from api.evaluator.utils import (
     create_verification_result_dict,
     format_verification_output,
     check_all_verification_passed,
+    iter_ndjson_lines,
+    MAX_NDJSON_LINE_BYTES,
     save_evaluation_results
 )
 from api.schema import AircraftConfiguration
-from api.utils import load_parsed_ads
+from api.registry import ADCorpusSnapshot, get_ad_snapshot
+from api.utils import DuplexStreamingResponse, PydanticJSONResponse
 from api.evaluator.test_case import create_test_aircraft
+from config.config import settings
 
 router = APIRouter()
 
+# Shared so the compiled AD corpus is reused across requests until the snapshot changes
+batch_evaluator = BatchAircraftEvaluator()
+
 
 @router.get(
         "/evaluation_test",
         description="Run test evaluation cases based on the assignment specifications.",
-        tags=["Assignment"]
+        tags=["Assignment"],
+        response_model=dict[str, Any]
     )
-async def evaluation_test() -> dict[str, Any]:
+async def evaluation_test(snapshot: ADCorpusSnapshot = Depends(get_ad_snapshot)) -> Response:
     base_dir = Path(__file__).parent.parent.parent.parent
     output_dir = base_dir / "output"
     
-    ads = await load_parsed_ads(output_dir)
+    ads = snapshot.ads
     
     evaluator = AircraftEvaluator()
     
@@ -41,7 +61,7 @@ async def evaluation_test() -> dict[str, Any]:
             list(ads.values())
         )
         
-        test_results.append(result.model_dump())
+        test_results.append(result)
 
     
     model_specific_test_aircraft = await create_model_specific_exclusion_test()
@@ -64,7 +84,7 @@ async def evaluation_test() -> dict[str, Any]:
             result,
             model_specific_expected[i]
         )
-        model_specific_results.append(verification_result.model_dump())
+        model_specific_results.append(verification_result)
 
     
     verification_aircraft = await create_verification_aircraft()
@@ -87,7 +107,7 @@ async def evaluation_test() -> dict[str, Any]:
             result,
             expected_results[i]
         )
-        verification_results.append(verification_result.model_dump())
+        verification_results.append(verification_result)
 
     
     formatted_verification = await format_verification_output(verification_results)
@@ -107,46 +127,219 @@ async def evaluation_test() -> dict[str, Any]:
         "all_passed": model_specific_passed
     }
 
-    return response
+    return PydanticJSONResponse(response)
 
 
 @router.get(
         "/existing_evaluation_results",
         description="Get existing evaluation result docs"
     )
-async def evaluation_results() -> dict[str, Any]:
+async def evaluation_results() -> Any:
     base_dir = Path(__file__).parent.parent.parent.parent
     output_dir = base_dir / "output"
     results_file = output_dir / "evaluation_results.json"
     
     if not results_file.exists():
         return {"status": "No evaluation results found"}
-    with open(results_file, 'r', encoding='utf-8') as f:
-        results_data = json.load(f)
-    return results_data
+    # The file is already JSON, so it is returned as is instead of being parsed and re-encoded
+    return Response(await asyncio.to_thread(results_file.read_bytes), media_type="application/json")
+
+
+def _parse_reason_cells(cells: list[str], n_aircraft: int, n_ads: int) -> list[tuple[int, int]]:
+    """
+        Parse 'row:col' cell references, raising ValueError for malformed or out-of-range cells.
+    """
+    parsed = []
+    for cell in cells:
+        row_text, _, col_text = cell.partition(":")
+        try:
+            row, col = int(row_text), int(col_text)
+        except ValueError:
+            raise ValueError(f"Reason cell {cell} is not 'row:col'")
+        if not (0 <= row < n_aircraft and 0 <= col < n_ads):
+            raise ValueError(f"Reason cell {cell} is out of range")
+        parsed.append((row, col))
+    return parsed
 
 
 @router.post(
         "/cases",
-        description="Evaluate a list of aircraft configurations against all parsed ADs."
+        description="Evaluate a list of aircraft configurations against all parsed ADs. "
+                    "With format=compact the results are returned columnar: aircraft and AD indexes, "
+                    "an affected bitmap, a reason code matrix, the code parameters of each AD (MSN bounds, models, exclusions) "
+                    "and the matching exclusion of exempted cells, with reasons rendered only for the cells in `reasons`.",
+        response_model=EvaluationResponse | CompactEvaluationResponse
     )
-async def evaluate_cases(aircrafts: list[AircraftConfiguration]) -> EvaluationResponse:
-    base_dir = Path(__file__).parent.parent.parent.parent
-    output_dir = base_dir / "output"
-    
-    ads = await load_parsed_ads(output_dir)
+async def evaluate_cases(
+    aircrafts: list[AircraftConfiguration],
+    response_format: str = Query("full", alias="format", pattern="^(full|compact)$"),
+    reasons: Optional[list[str]] = Query(None, description="Cells 'row:col' whose reason is rendered in compact format"),
+    snapshot: ADCorpusSnapshot = Depends(get_ad_snapshot)
+) -> Response:
+    ads = snapshot.ads
     
     if not ads:
+        if response_format == "compact":
+            return CompactEvaluationResponse(status="No parsed AD documents found")
         return EvaluationResponse(status="No parsed AD documents found")
     
-    evaluator = AircraftEvaluator()
-    
-    all_results = []
-    for aircraft in aircrafts:
-        evaluation_result = await evaluator.evaluate_against_multiple_ads(
-            aircraft,
-            list(ads.values())
-        )
-        all_results.append(evaluation_result)
+    batch_result = await batch_evaluator.evaluate(aircrafts, list(snapshot.ad_list))
+
+    if response_format == "compact":
+        try:
+            reason_cells = _parse_reason_cells(reasons or [], len(batch_result.aircraft), len(batch_result.ads))
+        except ValueError as e:
+            return CompactEvaluationResponse(status=f"Invalid reason cells: {e}")
+        return PydanticJSONResponse(await batch_result.to_compact(reason_cells))
+
+    all_results = await batch_result.to_evaluation_results()
     
-    return EvaluationResponse(status="success", evaluation_results=all_results)
\ No newline at end of file
+    return PydanticJSONResponse(EvaluationResponse(status="success", evaluation_results=all_results))
+
+
+async def _stream_evaluation_results(
+    request: Request,
+    snapshot: ADCorpusSnapshot,
+    chunk_size: int
+) -> AsyncIterator[bytes]:
+    ad_list = list(snapshot.ad_list)
+    pending: list[tuple[int, AircraftConfiguration | str]] = []
+
+    async def flush() -> AsyncIterator[bytes]:
+        aircrafts = [item for _, item in pending if isinstance(item, AircraftConfiguration)]
+        batch_result = await batch_evaluator.evaluate(aircrafts, ad_list)
+
+        row = 0
+        for line_number, item in pending:
+            if isinstance(item, AircraftConfiguration):
+                evaluation_result = (await batch_result.to_evaluation_results([row]))[0]
+                row += 1
+                yield to_json(evaluation_result) + b"\n"
+            else:
+                yield json.dumps({"line": line_number, "error": item}).encode("utf-8") + b"\n"
+        pending.clear()
+
+    async for line_number, line in iter_ndjson_lines(request.stream()):
+        if line is None:
+            # Report the oversized line in order, after everything read before it
+            pending.append((line_number, f"Line exceeds {MAX_NDJSON_LINE_BYTES} bytes and was skipped"))
+            async for output in flush():
+                yield output
+            continue
+
+        try:
+            pending.append((line_number, AircraftConfiguration.model_validate_json(line)))
+        except ValidationError as e:
+            pending.append((line_number, str(e)))
+
+        if len(pending) >= chunk_size:
+            async for output in flush():
+                yield output
+
+    if pending:
+        async for output in flush():
+            yield output
+
+
+@router.post(
+        "/cases/stream",
+        description="Evaluate an NDJSON stream of aircraft configurations (one per line) against all parsed ADs. "
+                    "Results are streamed back as NDJSON, one EvaluationResult per aircraft, in input order.",
+        openapi_extra={
+            "requestBody": {
+                "required": True,
+                "content": {"application/x-ndjson": {"schema": {"type": "string"}}}
+            }
+        }
+    )
+async def evaluate_cases_stream(
+    request: Request,
+    snapshot: ADCorpusSnapshot = Depends(get_ad_snapshot)
+) -> DuplexStreamingResponse:
+    return DuplexStreamingResponse(
+        _stream_evaluation_results(request, snapshot, settings.EVALUATION_STREAM_CHUNK_SIZE),
+        media_type="application/x-ndjson"
+    )
+
+
+async def _fleet_evaluation_results(batch_result: BatchEvaluationResult) -> list[FleetEvaluationResult]:
+    return [
+        FleetEvaluationResult(aircraft=aircraft, results=evaluation_result.results)
+        for aircraft, evaluation_result in zip(batch_result.aircraft, await batch_result.to_evaluation_results())
+    ]
+
+
+@router.put(
+        "/fleet/aircraft",
+        description="Add or replace aircraft in the stored fleet by aircraft_id. Only their rows are re-evaluated."
+    )
+async def upsert_fleet_aircraft(
+    aircrafts: list[FleetAircraft],
+    snapshot: ADCorpusSnapshot = Depends(get_ad_snapshot)
+) -> dict[str, Any]:
+    aircraft_ids = await fleet_registry.upsert_aircraft(aircrafts, snapshot)
+    return {"status": "success", "aircraft_ids": aircraft_ids}
+
+
+@router.delete(
+        "/fleet/aircraft/{aircraft_id}",
+        description="Remove an aircraft from the stored fleet."
+    )
+async def remove_fleet_aircraft(aircraft_id: str) -> dict[str, Any]:
+    if not await fleet_registry.remove_aircraft(aircraft_id):
+        return {"status": f"Aircraft {aircraft_id} not found"}
+    return {"status": "success"}
+
+
+@router.get(
+        "/fleet",
+        description="Read the materialized evaluation of the stored fleet against all parsed ADs.",
+        response_model=FleetEvaluationResponse
+    )
+async def fleet_evaluation(snapshot: ADCorpusSnapshot = Depends(get_ad_snapshot)) -> Response:
+    await fleet_registry.sync(snapshot)
+    batch_result = await fleet_registry.evaluation()
+
+    return PydanticJSONResponse(FleetEvaluationResponse(
+        status="success",
+        snapshot_version=snapshot.version,
+        evaluation_results=await _fleet_evaluation_results(batch_result)
+    ))
+
+
+@router.get(
+        "/fleet/aircraft/{aircraft_id}",
+        description="Read the materialized evaluation of one stored aircraft."
+    )
+async def fleet_aircraft_evaluation(
+    aircraft_id: str,
+    snapshot: ADCorpusSnapshot = Depends(get_ad_snapshot)
+) -> FleetEvaluationResponse:
+    await fleet_registry.sync(snapshot)
+    try:
+        batch_result = await fleet_registry.evaluation([aircraft_id])
+    except KeyError:
+        return FleetEvaluationResponse(status=f"Aircraft {aircraft_id} not found")
+
+    return FleetEvaluationResponse(
+        status="success",
+        snapshot_version=snapshot.version,
+        evaluation_results=await _fleet_evaluation_results(batch_result)
+    )
+
+
+@router.get(
+        "/fleet/ads/{ad_id}",
+        description="List the stored aircraft affected by an AD."
+    )
+async def fleet_affected_by_ad(
+    ad_id: str,
+    snapshot: ADCorpusSnapshot = Depends(get_ad_snapshot)
+) -> dict[str, Any]:
+    await fleet_registry.sync(snapshot)
+    try:
+        aircraft_ids = await fleet_registry.affected_aircraft_ids(ad_id)
+    except KeyError:
+        return {"status": f"AD {ad_id} not found"}
+
+    return {"status": "success", "ad_id": ad_id, "affected_aircraft_ids": aircraft_ids}
@@ -0,0 +1,47 @@
+from typing import Optional
+
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+import httpx
+
+from config.config import settings
+
+
+class LLMClientPool:
+    """
+        Long-lived AsyncOpenAI clients, one per (base URL, API key), so that
+        connections and TLS sessions are reused across extraction and chat calls.
+    """
+    def __init__(self) -> None:
+        self._clients: dict[tuple[Optional[str], str], AsyncOpenAI] = {}
+
+    def get_client(self, api_key: str, base_url: Optional[str] = None) -> AsyncOpenAI:
+        key = (base_url, api_key)
+        client = self._clients.get(key)
+        if client is None:
+            http_client = DefaultAsyncHttpxClient(
+                http2=settings.LLM_HTTP2,
+                limits=httpx.Limits(
+                    max_connections=settings.LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY,
+                ),
+            )
+            client = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+            self._clients[key] = client
+        return client
+
+    async def aclose(self) -> None:
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await client.close()
+
+
+llm_client_pool = LLMClientPool()
+
+
+def get_llm_client() -> AsyncOpenAI:
+    """
+        FastAPI dependency returning the shared client for the configured LLM endpoint.
+    """
+    return llm_client_pool.get_client(settings.LLM_API_KEY.get_secret_value(), settings.BASE_URL)
@@ -0,0 +1,248 @@
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, ContextManager, Iterator, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from config.config import settings
+
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_NO_OP = nullcontext()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...]) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._lock = threading.Lock()
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, label_names)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> None:
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # Per label values: non-cumulative bucket counts, sum
+        self._values: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = next(position for position, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            counts, total = self._values.setdefault(labels, ([0] * len(self.buckets), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        with self._lock:
+            for labels, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, counts):
+                    cumulative += count
+                    bucket_labels = _format_labels(self.label_names, labels, f'le="{_format_value(bound)}"')
+                    lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+                label_text = _format_labels(self.label_names, labels)
+                lines.append(f"{self.name}_sum{label_text} {_format_value(total[0])}")
+                lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class Metrics:
+    """
+        Process-wide pipeline metrics in the Prometheus text format: stage latency
+        histograms, LLM token counts, cache lookups and in-flight gauges.
+        When disabled every recording method returns immediately.
+    """
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.stage_seconds = Histogram(
+            "ad_stage_duration_seconds", "Time spent per pipeline stage.", ("stage",)
+        )
+        self.llm_tokens = Counter(
+            "llm_tokens_total", "LLM tokens reported in the API usage field.", ("operation", "kind")
+        )
+        self.llm_requests = Counter(
+            "llm_requests_total", "LLM requests by operation and outcome.", ("operation", "outcome")
+        )
+        self.llm_in_flight = Gauge(
+            "llm_requests_in_flight", "LLM requests currently awaiting a response.", ("operation",)
+        )
+        self.cache_lookups = Counter(
+            "cache_lookups_total", "Cache lookups by cache and result.", ("cache", "result")
+        )
+        self.http_in_flight = Gauge(
+            "http_requests_in_flight", "HTTP requests currently being handled.", ("method",)
+        )
+        self.http_seconds = Histogram(
+            "http_request_duration_seconds", "HTTP request handling time by route.", ("method", "route", "status")
+        )
+        self._metrics: list[_Metric] = [
+            self.stage_seconds, self.llm_tokens, self.llm_requests, self.llm_in_flight,
+            self.cache_lookups, self.http_in_flight, self.http_seconds,
+        ]
+
+    def stage(self, stage: str) -> ContextManager[None]:
+        """
+            Method to time a block as one observation of `stage`.
+        """
+        if not self.enabled:
+            return _NO_OP
+        return self._timed(stage)
+
+    @contextmanager
+    def _timed(self, stage: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_seconds.observe(time.perf_counter() - started, stage)
+
+    def observe_stage(self, stage: str, seconds: float) -> None:
+        if self.enabled:
+            self.stage_seconds.observe(seconds, stage)
+
+    def llm_request(self, operation: str) -> ContextManager[None]:
+        """
+            Method to track one LLM request: in-flight gauge, latency (stage "llm_<operation>") and outcome.
+        """
+        if not self.enabled:
+            return _NO_OP
+        return self._llm_request(operation)
+
+    @contextmanager
+    def _llm_request(self, operation: str) -> Iterator[None]:
+        started = time.perf_counter()
+        self.llm_in_flight.inc(operation)
+        outcome = "error"
+        try:
+            yield
+            outcome = "success"
+        finally:
+            self.llm_in_flight.dec(operation)
+            self.llm_requests.inc(operation, outcome)
+            self.stage_seconds.observe(time.perf_counter() - started, f"llm_{operation}")
+
+    def record_usage(self, operation: str, usage: Optional[Any]) -> None:
+        """
+            Method to count prompt and completion tokens from an OpenAI `usage` object.
+        """
+        if not self.enabled or usage is None:
+            return
+        self.llm_tokens.inc(operation, "prompt", amount=getattr(usage, "prompt_tokens", 0) or 0)
+        self.llm_tokens.inc(operation, "completion", amount=getattr(usage, "completion_tokens", 0) or 0)
+
+    def cache_lookup(self, cache: str, hit: bool) -> None:
+        if self.enabled:
+            self.cache_lookups.inc(cache, "hit" if hit else "miss")
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics(enabled=settings.METRICS_ENABLED)
+
+
+class MetricsMiddleware:
+    """
+        ASGI middleware counting in-flight HTTP requests and timing them by route template.
+        Streaming responses are timed until their last chunk is sent.
+    """
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = "500"
+
+        async def send_with_status(message: dict) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        started = time.perf_counter()
+        metrics.http_in_flight.inc(method)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            metrics.http_in_flight.dec(method)
+            route = scope.get("route")
+            metrics.http_seconds.observe(
+                time.perf_counter() - started, method, getattr(route, "path", "unmatched"), status
+            )
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    """
+        Prometheus scrape endpoint.
+    """
+    return Response(metrics.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,225 @@
+import asyncio
+import concurrent.futures.thread
+import json
+import queue
+import selectors
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.registry import OUTPUT_DIR
+
+
+PROFILE_HEADER = "x-profile"
+PROFILE_FILE_HEADER = "x-profile-file"
+PROFILE_OVERLAP_HEADER = "x-profile-overlapping-requests"
+PROFILE_FORMATS = ("collapsed", "speedscope")
+PROFILES_DIR = OUTPUT_DIR / "profiles"
+
+# Leaf frames in these modules mean a worker thread is parked, not working
+_IDLE_MODULES = frozenset(
+    module.__file__ for module in (threading, queue, selectors, concurrent.futures.thread)
+)
+
+
+def _frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    filename = "/".join(Path(code.co_filename).parts[-2:])
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def _stack(frame: Optional[FrameType]) -> tuple[str, ...]:
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    return tuple(reversed(names))
+
+
+class SamplingProfiler:
+    """
+        Wall-clock sampling profiler: a background thread records the stack of every other thread
+        each `interval` seconds. The thread that started the profiler (the event loop) is always
+        sampled, so time spent awaiting I/O shows up; other threads are only sampled while busy.
+        Each sample is weighted by the wall time since the previous one, as the sampler itself
+        may be held up by the GIL.
+    """
+    def __init__(self, interval: float = 0.001) -> None:
+        self.interval = interval
+        # Stack (root is the thread name) -> sampled wall time in seconds
+        self.samples: Counter[tuple[str, ...]] = Counter()
+        self.duration = 0.0
+        self._main_thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+
+    def start(self) -> None:
+        self._main_thread_id = threading.get_ident()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self._started
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+        last_sample = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            weight, last_sample = now - last_sample, now
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                is_main = thread_id == self._main_thread_id
+                if not is_main and frame.f_code.co_filename in _IDLE_MODULES:
+                    continue
+                if thread_id not in thread_names:
+                    thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+                root = "event-loop" if is_main else thread_names.get(thread_id, f"thread-{thread_id}")
+                self.samples[(root,) + _stack(frame)] += weight
+
+    def to_collapsed(self) -> str:
+        """
+            Method to render the samples as collapsed stacks (`frame;frame;frame microseconds`),
+            the input format of flamegraph.pl, inferno and speedscope.
+        """
+        return "".join(
+            f"{';'.join(stack)} {round(seconds * 1_000_000)}\n"
+            for stack, seconds in sorted(self.samples.items())
+        )
+
+    def to_speedscope(self, name: str) -> str:
+        """
+            Method to render the samples as a speedscope JSON file with one sampled profile per thread.
+        """
+        frames: list[dict] = []
+        frame_index: dict[str, int] = {}
+        profiles: dict[str, dict] = {}
+        for stack, seconds in sorted(self.samples.items()):
+            root, *names = stack
+            profile = profiles.setdefault(root, {
+                "type": "sampled",
+                "name": root,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": self.duration,
+                "samples": [],
+                "weights": [],
+            })
+            indices = []
+            for frame_name in names:
+                if frame_name not in frame_index:
+                    frame_index[frame_name] = len(frames)
+                    frames.append({"name": frame_name})
+                indices.append(frame_index[frame_name])
+            profile["samples"].append(indices)
+            profile["weights"].append(seconds)
+
+        return json.dumps({
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "ad_extractor",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": list(profiles.values()),
+        })
+
+
+class ProfilingMiddleware:
+    """
+        ASGI middleware profiling single requests that carry an `X-Profile` header
+        (`collapsed` or `speedscope`; any other value means `collapsed`).
+        The profile is written to `output/profiles/` and its file name returned in `X-Profile-File`.
+        Requests without the header are passed straight through.
+
+        The sampler sees the whole process, not one request: work of other requests running at the
+        same time (on the event loop or in worker threads) is included in the profile. Profiled
+        requests are therefore run one at a time, and the number of other requests that overlapped
+        is returned in `X-Profile-Overlapping-Requests` (counted up to the response start) and
+        recorded in the log line and the speedscope profile name. Profile an idle server for a clean profile.
+    """
+    def __init__(self, app: ASGIApp, interval: float = 0.001, profiles_dir: Path = PROFILES_DIR) -> None:
+        self.app = app
+        self.interval = interval
+        self.profiles_dir = profiles_dir
+        self._profile_lock = asyncio.Lock()
+        self._in_flight = 0
+        # Other requests seen while a profile is running, None when no profile is running
+        self._overlapping: Optional[int] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        self._in_flight += 1
+        if self._overlapping is not None:
+            self._overlapping += 1
+        try:
+            await self._handle(scope, receive, send)
+        finally:
+            self._in_flight -= 1
+
+    async def _handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        requested = None
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER.encode():
+                requested = value.decode("latin-1").strip().lower()
+                break
+        if requested is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile_format = requested if requested in PROFILE_FORMATS else "collapsed"
+        extension = "speedscope.json" if profile_format == "speedscope" else "folded"
+        route_name = "".join(
+            char if char.isalnum() or char in "-_" else "_" for char in scope["path"].strip("/")
+        ) or "root"
+        file_name = f"{time.strftime('%Y%m%d-%H%M%S')}_{route_name}_{uuid.uuid4().hex[:8]}.{extension}"
+
+        async def send_with_profile_header(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((PROFILE_FILE_HEADER.encode(), file_name.encode()))
+                headers.append((PROFILE_OVERLAP_HEADER.encode(), str(self._overlapping).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        async with self._profile_lock:
+            # Requests already running when sampling starts overlap as well
+            self._overlapping = self._in_flight - 1
+            profiler = SamplingProfiler(self.interval)
+            profiler.start()
+            try:
+                await self.app(scope, receive, send_with_profile_header)
+            finally:
+                await asyncio.to_thread(profiler.stop)
+                overlapping, self._overlapping = self._overlapping, None
+
+        name = f"{scope['method']} {scope['path']}"
+        if overlapping:
+            name += f" (includes work of {overlapping} overlapping request(s))"
+        if profile_format == "speedscope":
+            content = profiler.to_speedscope(name)
+        else:
+            content = profiler.to_collapsed()
+        await asyncio.to_thread(self._write, file_name, content, overlapping)
+
+    def _write(self, file_name: str, content: str, overlapping: int) -> None:
+        self.profiles_dir.mkdir(parents=True, exist_ok=True)
+        (self.profiles_dir / file_name).write_text(content, encoding="utf-8")
+        note = f" ({overlapping} other request(s) overlapped and are included)" if overlapping else ""
+        print(f"Request profile written to {self.profiles_dir / file_name}{note}")
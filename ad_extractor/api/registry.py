@@ -0,0 +1,177 @@
+import asyncio
+import hashlib
+import time
+from pathlib import Path
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+from api.ad_store import SQLiteADStore, get_ad_store
+from api.schema import ADDocument
+from config.config import settings
+
+
+class ADCorpusSnapshot:
+    """
+        Immutable view of the AD corpus at a given version.
+        A snapshot is never modified after it is handed out; reloads publish a new one.
+    """
+    __slots__ = ("version", "ads", "ad_list", "content_hash")
+
+    def __init__(self, version: int, ads: dict[str, ADDocument], content_hash: str) -> None:
+        self.version = version
+        self.ads: Mapping[str, ADDocument] = MappingProxyType(dict(ads))
+        self.ad_list: tuple[ADDocument, ...] = tuple(self.ads.values())
+        self.content_hash = content_hash
+
+
+class _LoadedFile:
+    __slots__ = ("mtime_ns", "size", "sha256", "ad")
+
+    def __init__(self, mtime_ns: int, size: int, sha256: str, ad: ADDocument) -> None:
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.sha256 = sha256
+        self.ad = ad
+
+
+def _read_ad_file(json_file: Path) -> tuple[str, ADDocument]:
+    data = json_file.read_bytes()
+    return hashlib.sha256(data).hexdigest(), ADDocument.model_validate_json(data)
+
+
+class ADRegistry:
+    """
+        Process-wide AD corpus loaded from `*_parsed.json` files, or from the SQLite AD store when given.
+        Only files (or stored rows) whose content hash changed are re-parsed.
+    """
+    def __init__(
+        self,
+        output_dir: Path,
+        refresh_interval: float = 0.0,
+        store: Optional[SQLiteADStore] = None
+    ) -> None:
+        self.output_dir = output_dir
+        self.refresh_interval = refresh_interval
+        self.store = store
+        # Keyed by file name, or by AD ID for the SQLite store
+        self._files: dict[str, _LoadedFile] = {}
+        self._store_version: Optional[int] = None
+        self._snapshot = ADCorpusSnapshot(0, {}, hashlib.sha256().hexdigest())
+        self._lock = asyncio.Lock()
+        self._last_scan: Optional[float] = None
+
+    @property
+    def snapshot(self) -> ADCorpusSnapshot:
+        return self._snapshot
+
+    async def load(self) -> ADCorpusSnapshot:
+        """
+            Method to load the corpus on startup.
+        """
+        return await self.refresh(force=True)
+
+    async def _scan_files(self) -> tuple[dict[str, _LoadedFile], bool]:
+        files = dict(self._files)
+        changed = False
+        seen: set[str] = set()
+
+        json_files = sorted(self.output_dir.glob("*_parsed.json")) if self.output_dir.is_dir() else []
+        for json_file in json_files:
+            seen.add(json_file.name)
+            try:
+                stat = json_file.stat()
+            except FileNotFoundError:
+                continue
+
+            loaded = files.get(json_file.name)
+            if loaded and loaded.mtime_ns == stat.st_mtime_ns and loaded.size == stat.st_size:
+                continue
+
+            try:
+                sha256, ad = await asyncio.to_thread(_read_ad_file, json_file)
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                print(f"Error loading AD document {json_file.name}: {e}")
+                continue
+
+            if loaded and loaded.sha256 == sha256:
+                ad = loaded.ad
+            else:
+                changed = True
+            files[json_file.name] = _LoadedFile(stat.st_mtime_ns, stat.st_size, sha256, ad)
+
+        for name in set(files) - seen:
+            del files[name]
+            changed = True
+
+        return files, changed
+
+    async def _scan_store(self) -> tuple[dict[str, _LoadedFile], bool]:
+        version = await self.store.version()
+        if version == self._store_version:
+            return self._files, False
+
+        fingerprints = await self.store.fingerprints()
+        stale = [
+            ad_id for ad_id, sha256 in fingerprints.items()
+            if ad_id not in self._files or self._files[ad_id].sha256 != sha256
+        ]
+        fresh = await self.store.get_many(stale) if stale else {}
+
+        files = {}
+        for ad_id, sha256 in fingerprints.items():
+            if ad_id in fresh:
+                files[ad_id] = _LoadedFile(0, 0, sha256, fresh[ad_id])
+            elif ad_id in self._files and ad_id not in stale:
+                files[ad_id] = self._files[ad_id]
+
+        self._store_version = version
+        return files, bool(stale) or set(files) != set(self._files)
+
+    async def refresh(self, force: bool = False) -> ADCorpusSnapshot:
+        """
+            Method to pick up added, changed and removed ADs.
+            Publishes a new snapshot with an incremented version only if the corpus changed.
+        """
+        if not force and self._last_scan is not None:
+            if time.monotonic() - self._last_scan < self.refresh_interval:
+                return self._snapshot
+
+        async with self._lock:
+            if self.store is not None:
+                files, changed = await self._scan_store()
+            else:
+                files, changed = await self._scan_files()
+
+            self._files = files
+            self._last_scan = time.monotonic()
+
+            if changed:
+                ads = {}
+                corpus_hash = hashlib.sha256()
+                for name in sorted(files):
+                    loaded = files[name]
+                    ads[loaded.ad.ad_id] = loaded.ad
+                    corpus_hash.update(f"{name}:{loaded.sha256}\n".encode("utf-8"))
+                self._snapshot = ADCorpusSnapshot(
+                    self._snapshot.version + 1, ads, corpus_hash.hexdigest()
+                )
+
+        return self._snapshot
+
+
+OUTPUT_DIR = Path(__file__).parent.parent.parent / "output"
+
+ad_registry = ADRegistry(
+    OUTPUT_DIR,
+    refresh_interval=settings.AD_REGISTRY_REFRESH_INTERVAL,
+    store=get_ad_store()
+)
+
+
+async def get_ad_snapshot() -> ADCorpusSnapshot:
+    """
+        FastAPI dependency returning the current AD corpus snapshot.
+    """
+    return await ad_registry.refresh()
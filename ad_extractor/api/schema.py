@@ -1,5 +1,5 @@
 from typing import Any, Optional
-from pydantic import BaseModel, Field
+from pydantic import AliasChoices, BaseModel, Field
 
 
 class MSNConstraint(BaseModel):
@@ -17,7 +17,8 @@ class ExcludeIfModification(BaseModel):
 class ApplicabilityRules(BaseModel):
     aircraft_models: list[str] = Field(default_factory=list, description="List of affected aircraft models")
     msn_constraints: Optional[MSNConstraint] = Field(default=None, description="MSN range/list constraints")
-    excluded_if_modifications: list[ExcludeIfModification] = Field(default_factory=list, description="Modifications that exempt aircraft. If applicable_models is None, applies to all models.")
+    # Parsed AD files written before the field was renamed use `exclude_if_modification`
+    excluded_if_modifications: list[ExcludeIfModification] = Field(default_factory=list, validation_alias=AliasChoices("excluded_if_modifications", "exclude_if_modification"), description="Modifications that exempt aircraft. If applicable_models is None, applies to all models.")
     required_modifications: list[str] = Field(default_factory=list, description="Required fixes if affected")
     additional_conditions: Optional[str] = Field(default=None, description="Any other conditions in plain text")
 
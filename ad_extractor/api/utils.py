@@ -1,14 +1,102 @@
 import json
 from pathlib import Path
-from typing import Dict
+from typing import Any, Dict
+import anyio
+from pydantic_core import to_json
+from starlette.requests import ClientDisconnect
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.types import Receive, Scope, Send
+from api.ad_store import get_ad_store
+from api.metrics import metrics
 from api.schema import ADDocument
+from config.config import settings
 
 
 async def load_parsed_ads(output_dir: Path) -> Dict[str, ADDocument]:
-    ads = {}
-    for json_file in output_dir.glob("*_parsed.json"):
-        with open(json_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            ad = ADDocument.model_validate(data)
-            ads[ad.ad_id] = ad
-    return ads
\ No newline at end of file
+    store = get_ad_store()
+    with metrics.stage("load_parsed_ads"):
+        if store is not None:
+            return await store.load_all()
+
+        ads = {}
+        for json_file in output_dir.glob("*_parsed.json"):
+            with open(json_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+                ad = ADDocument.model_validate(data)
+                ads[ad.ad_id] = ad
+    return ads
+
+
+def dump_output_json(content: Any, indent: int = 2) -> bytes:
+    """
+        Serialize content (models, or dicts and lists containing them) for a file in output/.
+        Indented with `indent`, or compact when COMPACT_JSON_OUTPUT is set.
+    """
+    return to_json(content, indent=None if settings.COMPACT_JSON_OUTPUT else indent)
+
+
+class PydanticJSONResponse(JSONResponse):
+    """
+        JSON response serialized straight to bytes by pydantic-core.
+        Models, also nested in dicts and lists, are written without building intermediate dicts,
+        so endpoints returning one skip FastAPI's validate / jsonable_encoder / json.dumps round trip.
+    """
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+        StreamingResponse for endpoints that keep reading the request body while
+        the response is streamed. Starlette's disconnect listener would otherwise
+        consume the remaining request body messages.
+    """
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+
+        if self.background is not None:
+            await self.background()
+
+
+
+def format_sse(event: str, data: Any) -> bytes:
+    """
+        Encode one server-sent event with a JSON payload.
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8")
+
+
+class EventStreamResponse(StreamingResponse):
+    """
+        Server-sent events response that stops the body iterator as soon as the
+        client disconnects, so the work feeding the stream (e.g. an upstream LLM
+        completion) is cancelled instead of running to the end.
+    """
+    media_type = "text/event-stream"
+
+    def __init__(self, content: Any, **kwargs: Any) -> None:
+        headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no", **(kwargs.pop("headers", None) or {})}
+        super().__init__(content, headers=headers, **kwargs)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            async with anyio.create_task_group() as task_group:
+                async def stream() -> None:
+                    try:
+                        await self.stream_response(send)
+                    except OSError:
+                        pass
+                    task_group.cancel_scope.cancel()
+
+                task_group.start_soon(stream)
+                await self.listen_for_disconnect(receive)
+                task_group.cancel_scope.cancel()
+        finally:
+            if hasattr(self.body_iterator, "aclose"):
+                await self.body_iterator.aclose()
+
+        if self.background is not None:
+            await self.background()
@@ -0,0 +1,117 @@
+import random
+from typing import Optional
+
+from api.schema import (
+    ADDocument,
+    AircraftConfiguration,
+    ApplicabilityRules,
+    ExcludeIfModification,
+    MSNConstraint,
+)
+
+
+# Model families and variants in the shape of api/evaluator/test_case.py
+MODEL_FAMILIES: dict[str, list[str]] = {
+    "MD-11": ["", "F"],
+    "MD-10": ["-10F", "-30F"],
+    "DC-10": ["-10", "-30", "-30F", "-40"],
+    "Boeing 737": ["-700", "-800", "-900ER"],
+    "A318": ["-111", "-112"],
+    "A319": ["-100", "-111", "-132"],
+    "A320": ["-211", "-214", "-232", "-251N"],
+    "A321": ["-111", "-112", "-211", "-231"],
+}
+
+MSN_RANGE = (1, 50000)
+
+
+def _modification_name(rnd: random.Random) -> str:
+    number = rnd.randint(20000, 29999)
+    shape = rnd.randrange(3)
+    if shape == 0:
+        return f"mod {number} (production)"
+    if shape == 1:
+        return f"SB A320-57-{number % 10000:04d} Rev {rnd.randint(0, 9):02d}"
+    return f"mod {number}"
+
+
+def generate_fleet(
+    size: int,
+    modifications_per_aircraft: int = 2,
+    seed: int = 0
+) -> list[AircraftConfiguration]:
+    """
+        Generate a synthetic fleet of `size` aircraft with 0..modifications_per_aircraft mods each.
+    """
+    rnd = random.Random(seed)
+    families = sorted(MODEL_FAMILIES)
+    fleet = []
+
+    for _ in range(size):
+        family = rnd.choice(families)
+        fleet.append(AircraftConfiguration(
+            aircraft_model=family + rnd.choice(MODEL_FAMILIES[family]),
+            msn=rnd.randint(*MSN_RANGE),
+            modifications_applied=[
+                _modification_name(rnd) for _ in range(rnd.randint(0, modifications_per_aircraft))
+            ]
+        ))
+
+    return fleet
+
+
+def _msn_constraints(rnd: random.Random, msn_list_length: int) -> Optional[MSNConstraint]:
+    shape = rnd.randrange(4)
+    if shape == 0:
+        return None
+    if shape == 1 and msn_list_length > 0:
+        return MSNConstraint(include_msns=sorted(rnd.sample(range(*MSN_RANGE), msn_list_length)))
+
+    low = rnd.randint(MSN_RANGE[0], MSN_RANGE[1] // 2)
+    return MSNConstraint(
+        min_msn=low,
+        max_msn=rnd.randint(low, MSN_RANGE[1]),
+        exclude_msns=sorted(rnd.sample(range(*MSN_RANGE), msn_list_length)) if msn_list_length > 0 else None
+    )
+
+
+def generate_ad_corpus(
+    size: int,
+    exclusions_per_ad: int = 2,
+    msn_list_length: int = 20,
+    seed: int = 0
+) -> list[ADDocument]:
+    """
+        Generate `size` synthetic ADs with `exclusions_per_ad` exempting modifications each
+        and include/exclude MSN lists of `msn_list_length` entries.
+    """
+    rnd = random.Random(seed)
+    families = sorted(MODEL_FAMILIES)
+    ads = []
+
+    for number in range(size):
+        affected_families = rnd.sample(families, rnd.randint(1, 3))
+        aircraft_models = [
+            family + rnd.choice(MODEL_FAMILIES[family]) if rnd.random() < 0.5 else family
+            for family in affected_families
+        ]
+        exclusions = [
+            ExcludeIfModification(
+                modification=_modification_name(rnd),
+                applicable_models=rnd.sample(aircraft_models, 1) if rnd.random() < 0.3 else None
+            )
+            for _ in range(exclusions_per_ad)
+        ]
+        ad_id = f"BENCH-{2025 + number // 10000}-{number % 10000:04d}"
+        ads.append(ADDocument(
+            ad_id=ad_id,
+            title=f"Synthetic AD {ad_id}",
+            effective_date="2025-01-01",
+            applicability_rules=ApplicabilityRules(
+                aircraft_models=aircraft_models,
+                msn_constraints=_msn_constraints(rnd, msn_list_length),
+                excluded_if_modifications=exclusions
+            )
+        ))
+
+    return ads
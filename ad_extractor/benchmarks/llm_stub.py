@@ -0,0 +1,306 @@
+"""
+    Local OpenAI-compatible stand-in for the chat completions API, for benchmarking
+    extraction and chat without calling the real model.
+
+    Run from the ad_extractor directory:
+        python -m benchmarks.llm_stub --port 8100 --latency-ms 800 --rate-limit-rate 0.05
+    and start the API with BASE_URL=http://127.0.0.1:8100/v1 (any LLM_API_KEY).
+
+    Responses are replayed from recordings keyed by a hash of the request. Requests without a
+    recording get a synthetic answer: a schema-valid ADDocument for extraction requests, a short
+    CONCLUSION for chat. In record mode misses are forwarded to a real upstream and recorded.
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import Any, AsyncIterator, Optional
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+from api.ad_extractor.cache import sha256_hex
+from benchmarks.generators import generate_ad_corpus
+
+
+BASE_DIR = Path(__file__).parent.parent.parent
+RECORDINGS_DIR = BASE_DIR / "output" / "llm_recordings"
+
+# Fields of a chat completion request that determine the answer
+_KEY_FIELDS = ("model", "messages", "response_format", "temperature")
+_AD_NUMBER = re.compile(r"\b(FAA|EASA)\b.*?\bAD(?:\s+No\.?:?)?\s+(\d{4}-\d{2,4}(?:-\d{2})?(?:R\d+)?)\b", re.DOTALL)
+
+
+class StubConfig(BaseModel):
+    mode: str = Field("replay", description="'replay' (recordings, synthetic on miss), 'synthetic' or 'record'")
+    latency_ms: float = Field(0.0, description="Added latency per request")
+    latency_jitter_ms: float = Field(0.0, description="Uniform random latency added on top of latency_ms")
+    stream_chunk_delay_ms: float = Field(0.0, description="Delay between streamed chunks")
+    rate_limit_rate: float = Field(0.0, description="Fraction of requests answered with 429")
+    retry_after_seconds: float = Field(1.0, description="Retry-After header of injected 429 responses")
+    server_error_rate: float = Field(0.0, description="Fraction of requests answered with 500")
+    timeout_rate: float = Field(0.0, description="Fraction of requests that hang for timeout_seconds before answering")
+    timeout_seconds: float = Field(600.0, description="How long a hanging request waits")
+    upstream_url: Optional[str] = Field(None, description="Real API base URL used in record mode")
+    seed: Optional[int] = Field(None, description="Seed of the fault injection random generator")
+
+
+def request_key(body: dict[str, Any]) -> str:
+    """
+        Hash of the request fields that determine the answer.
+    """
+    return sha256_hex(json.dumps({field: body.get(field) for field in _KEY_FIELDS}, sort_keys=True))
+
+
+class RecordingStore:
+    """
+        Recorded completion texts, one JSON file per request hash.
+    """
+    def __init__(self, recordings_dir: Path) -> None:
+        self.recordings_dir = recordings_dir
+
+    def _path(self, key: str) -> Path:
+        return self.recordings_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            return json.loads(self._path(key).read_text(encoding="utf-8"))["content"]
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, body: dict[str, Any], content: str) -> None:
+        self.recordings_dir.mkdir(parents=True, exist_ok=True)
+        data = {"request": {field: body.get(field) for field in _KEY_FIELDS}, "content": content}
+        self._path(key).write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+def synthetic_content(body: dict[str, Any], key: str) -> str:
+    """
+        Deterministic synthetic answer: an ADDocument for json_schema requests, otherwise a chat conclusion.
+    """
+    response_format = body.get("response_format") or {}
+    if response_format.get("type") == "json_schema":
+        ad = generate_ad_corpus(1, seed=int(key[:8], 16))[0]
+        prompt = next((message["content"] for message in body.get("messages", []) if message.get("role") == "user"), "")
+        match = _AD_NUMBER.search(prompt or "")
+        ad.ad_id = f"{match.group(1)}-{match.group(2)}" if match else f"SYNTH-{key[:12]}"
+        ad.title = f"Synthetic AD {ad.ad_id}"
+        return ad.model_dump_json()
+    return "Synthetic response from the local LLM stand-in.\nCONCLUSION: NO, the aircraft does not require action because this answer is synthetic."
+
+
+class LLMStub:
+    def __init__(self, config: StubConfig, store: RecordingStore, upstream_api_key: Optional[str] = None) -> None:
+        self.config = config
+        self.store = store
+        self.upstream_api_key = upstream_api_key
+        self._random = random.Random(config.seed)
+        self.stats: dict[str, int] = {
+            "requests": 0, "replayed": 0, "recorded": 0, "synthesized": 0,
+            "injected_rate_limits": 0, "injected_server_errors": 0, "injected_timeouts": 0,
+        }
+
+    def configure(self, config: StubConfig) -> None:
+        self.config = config
+        self._random = random.Random(config.seed)
+
+    def injected_error(self) -> Optional[JSONResponse]:
+        roll = self._random.random()
+        if roll < self.config.rate_limit_rate:
+            self.stats["injected_rate_limits"] += 1
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached (injected)", "type": "rate_limit_error", "code": "rate_limit_exceeded"}},
+                status_code=429,
+                headers={"Retry-After": str(self.config.retry_after_seconds)}
+            )
+        if roll < self.config.rate_limit_rate + self.config.server_error_rate:
+            self.stats["injected_server_errors"] += 1
+            return JSONResponse({"error": {"message": "Server error (injected)", "type": "server_error"}}, status_code=500)
+        return None
+
+    async def delay(self) -> None:
+        if self._random.random() < self.config.timeout_rate:
+            self.stats["injected_timeouts"] += 1
+            await asyncio.sleep(self.config.timeout_seconds)
+        latency = self.config.latency_ms + self._random.uniform(0, self.config.latency_jitter_ms)
+        if latency > 0:
+            await asyncio.sleep(latency / 1000)
+
+    async def content(self, body: dict[str, Any]) -> str:
+        key = request_key(body)
+        if self.config.mode != "synthetic":
+            recorded = await asyncio.to_thread(self.store.get, key)
+            if recorded is not None:
+                self.stats["replayed"] += 1
+                return recorded
+
+        if self.config.mode == "record":
+            content = await self._forward(body)
+            await asyncio.to_thread(self.store.put, key, body, content)
+            self.stats["recorded"] += 1
+            return content
+
+        self.stats["synthesized"] += 1
+        return synthetic_content(body, key)
+
+    async def _forward(self, body: dict[str, Any]) -> str:
+        if not self.config.upstream_url:
+            raise ValueError("Record mode needs upstream_url.")
+        async with httpx.AsyncClient(timeout=600) as client:
+            response = await client.post(
+                f"{self.config.upstream_url.rstrip('/')}/chat/completions",
+                json={**body, "stream": False},
+                headers={"Authorization": f"Bearer {self.upstream_api_key or ''}"}
+            )
+            response.raise_for_status()
+            return response.json()["choices"][0]["message"]["content"]
+
+
+def _usage(body: dict[str, Any], content: str) -> dict[str, int]:
+    prompt_tokens = sum(len(message.get("content") or "") for message in body.get("messages", [])) // 4
+    completion_tokens = len(content) // 4
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens}
+
+
+def _completion(body: dict[str, Any], content: str) -> dict[str, Any]:
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "stub"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": _usage(body, content),
+    }
+
+
+async def _completion_chunks(stub: LLMStub, body: dict[str, Any], content: str) -> AsyncIterator[str]:
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    created = int(time.time())
+    pieces = re.findall(r"\S+\s*|\s+", content)
+
+    for index, piece in enumerate(pieces):
+        if index and stub.config.stream_chunk_delay_ms > 0:
+            await asyncio.sleep(stub.config.stream_chunk_delay_ms / 1000)
+        chunk = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": body.get("model", "stub"),
+            "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+        }
+        yield f"data: {json.dumps(chunk)}\n\n"
+
+    done = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": created,
+        "model": body.get("model", "stub"),
+        "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+    }
+    yield f"data: {json.dumps(done)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+def create_app(stub: LLMStub) -> FastAPI:
+    app = FastAPI(title="LLM stand-in", description="OpenAI-compatible chat completions stand-in for offline benchmarking.")
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stub.stats["requests"] += 1
+
+        error = stub.injected_error()
+        if error is not None:
+            return error
+        await stub.delay()
+
+        try:
+            content = await stub.content(body)
+        except Exception as e:
+            print(f"Error producing stand-in response: {e}")
+            return JSONResponse({"error": {"message": str(e), "type": "server_error"}}, status_code=502)
+
+        if body.get("stream"):
+            return StreamingResponse(_completion_chunks(stub, body, content), media_type="text/event-stream")
+        return _completion(body, content)
+
+    @app.get("/stub/config")
+    async def get_config() -> StubConfig:
+        return stub.config
+
+    @app.put("/stub/config")
+    async def put_config(config: StubConfig) -> StubConfig:
+        stub.configure(config)
+        return stub.config
+
+    @app.get("/stub/stats")
+    async def get_stats() -> dict[str, int]:
+        return dict(stub.stats)
+
+    return app
+
+
+async def seed_bundled_recordings(store: RecordingStore, pdf_directory: Path, output_directory: Path) -> int:
+    """
+        Record the stored extraction outputs as the answers to the requests the pipeline sends
+        for the bundled PDFs, so they are replayed exactly as the real model returned them.
+    """
+    from api.ad_extractor.ad_extractors import ADExtractorFactory, OpenAIADExtractor
+    from api.ad_extractor.document_extractors import PDFExtractorFactory
+    from api.ad_extractor.rule_based import ApplicabilityGrammar
+    from api.ad_extractor.utils import locate_applicability_sections
+
+    texts = await PDFExtractorFactory(use_cache=False).bulk_extract(pdf_directory)
+    texts, _ = await locate_applicability_sections(texts)
+    extractor = OpenAIADExtractor(api_key="")
+    factory = ADExtractorFactory(extractor)
+    grammar = ApplicabilityGrammar()
+
+    seeded = 0
+    for source, text in texts.items():
+        parsed = grammar.parse(text).ad_document
+        output_path = output_directory / f"{parsed.ad_id}_parsed.json" if parsed else None
+        if output_path is None or not output_path.exists():
+            print(f"No stored output for {source}; it will get a synthetic answer")
+            continue
+
+        body = extractor.build_request(factory.build_prompt(text), system_context=factory.build_system_context())
+        store.put(request_key(body), body, output_path.read_text(encoding="utf-8"))
+        seeded += 1
+    return seeded
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the local OpenAI-compatible stand-in server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--recordings-dir", type=Path, default=RECORDINGS_DIR)
+    parser.add_argument("--no-seed", action="store_true", help="Do not record the bundled PDFs' stored outputs on startup")
+    parser.add_argument("--upstream-api-key", default=None, help="API key of the upstream in record mode")
+    for name, field in StubConfig.model_fields.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(field.default) if field.default is not None else str, default=field.default, help=field.description)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    import uvicorn
+
+    args = parse_args(argv)
+    config = StubConfig(**{name: getattr(args, name) for name in StubConfig.model_fields})
+    store = RecordingStore(args.recordings_dir)
+
+    if not args.no_seed:
+        seeded = asyncio.run(seed_bundled_recordings(store, BASE_DIR / "ad_docs", BASE_DIR / "output"))
+        print(f"Seeded {seeded} recordings from the bundled PDFs")
+
+    uvicorn.run(create_app(LLMStub(config, store, args.upstream_api_key)), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
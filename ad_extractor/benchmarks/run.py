@@ -0,0 +1,322 @@
+"""
+    Micro-benchmarks for the evaluator, AD loading, PDF extraction and response serialization hot paths,
+    and extraction pipeline throughput against the local LLM stand-in (benchmarks.llm_stub).
+
+    Run from the ad_extractor directory:
+        python -m benchmarks.run --output ../output/benchmarks/results.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+import httpx
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from openai import AsyncOpenAI
+
+from api.ad_extractor.ad_extractors import ADExtractorFactory, OpenAIADExtractor
+from api.ad_extractor.document_extractors import PDFExtractorFactory
+from api.ad_extractor.scheduler import ExtractionScheduler
+from api.ad_extractor.utils import bulk_process_ads
+from api.evaluator.batch_evaluator import BatchAircraftEvaluator
+from api.evaluator.evaluator import AircraftEvaluator
+from api.evaluator.schema import EvaluationResponse
+from api.utils import PydanticJSONResponse, load_parsed_ads
+from benchmarks.generators import generate_ad_corpus, generate_fleet
+from benchmarks.llm_stub import LLMStub, RecordingStore, StubConfig, create_app
+from config.config import settings
+
+
+FORMAT_VERSION = 1
+BASE_DIR = Path(__file__).parent.parent.parent
+AD_DOCS_DIR = BASE_DIR / "ad_docs"
+
+
+async def _measure(run: Callable[[], Awaitable[Any]], repeat: int) -> dict[str, float]:
+    """
+        Run `run` `repeat` times after one warm-up call and summarize the wall time in seconds.
+    """
+    await run()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await run()
+        samples.append(time.perf_counter() - started)
+
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "max": max(samples),
+    }
+
+
+async def bench_evaluate_against_multiple_ads(fleet, ads, repeat: int) -> dict[str, Any]:
+    evaluator = AircraftEvaluator()
+
+    async def run() -> None:
+        for aircraft in fleet:
+            await evaluator.evaluate_against_multiple_ads(aircraft, ads)
+
+    seconds = await _measure(run, repeat)
+    evaluations = len(fleet) * len(ads)
+    return {
+        "evaluations": evaluations,
+        "evaluations_per_second": evaluations / seconds["median"],
+        "seconds": seconds,
+    }
+
+
+async def bench_batch_evaluate(fleet, ads, repeat: int) -> dict[str, Any]:
+    batch_evaluator = BatchAircraftEvaluator()
+
+    async def run() -> None:
+        await batch_evaluator.evaluate(fleet, ads)
+
+    seconds = await _measure(run, repeat)
+    evaluations = len(fleet) * len(ads)
+    return {
+        "evaluations": evaluations,
+        "evaluations_per_second": evaluations / seconds["median"],
+        "seconds": seconds,
+    }
+
+
+async def bench_load_parsed_ads(ads, repeat: int) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_dir = Path(tmp_dir)
+        for ad in ads:
+            (output_dir / f"{ad.ad_id}_parsed.json").write_text(ad.model_dump_json(indent=4), encoding="utf-8")
+
+        async def run() -> None:
+            await load_parsed_ads(output_dir)
+
+        seconds = await _measure(run, repeat)
+
+    return {
+        "files": len(ads),
+        "files_per_second": len(ads) / seconds["median"],
+        "seconds": seconds,
+    }
+
+
+async def bench_bulk_extract(pdf_directory: Path, repeat: int) -> dict[str, Any]:
+    """
+        Extraction is measured uncached; the process pool is used when PDF_EXTRACT_WORKERS is set.
+    """
+    pdf_extractor = PDFExtractorFactory(use_cache=False)
+    pages = 0
+
+    async def run() -> None:
+        nonlocal pages
+        texts = await pdf_extractor.bulk_extract(pdf_directory)
+        pages = sum(text.count("--- Page ") for text in texts.values())
+
+    seconds = await _measure(run, repeat)
+    return {
+        "extractor": type(pdf_extractor._extractor).__name__,
+        "files": len(pdf_extractor.timings),
+        "pages": pages,
+        "pages_per_second": pages / seconds["median"],
+        "seconds": seconds,
+    }
+
+
+async def bench_response_serialization(fleet, ads, repeat: int) -> dict[str, Any]:
+    """
+        Serialization of an /evaluator/cases response: FastAPI's default path (response model
+        validation, jsonable_encoder, json.dumps) against PydanticJSONResponse, and the compact
+        columnar format (building and serializing it, from the evaluated matrix).
+    """
+    batch_result = await BatchAircraftEvaluator().evaluate(fleet, ads)
+    response = EvaluationResponse(status="success", evaluation_results=await batch_result.to_evaluation_results())
+    field = create_model_field(name="Response_evaluate_cases", type_=EvaluationResponse, mode="serialization")
+    body_bytes = 0
+
+    async def run_default() -> None:
+        nonlocal body_bytes
+        content = await serialize_response(field=field, response_content=response)
+        body_bytes = len(JSONResponse(content).body)
+
+    async def run_pydantic() -> None:
+        PydanticJSONResponse(response).body
+
+    compact_body_bytes = 0
+
+    async def run_compact() -> None:
+        nonlocal compact_body_bytes
+        compact_body_bytes = len(PydanticJSONResponse(await batch_result.to_compact()).body)
+
+    default_seconds = await _measure(run_default, repeat)
+    pydantic_seconds = await _measure(run_pydantic, repeat)
+    compact_seconds = await _measure(run_compact, repeat)
+    return {
+        "aircraft": len(fleet),
+        "ads": len(ads),
+        "body_bytes": body_bytes,
+        "compact_body_bytes": compact_body_bytes,
+        "speedup": default_seconds["median"] / pydantic_seconds["median"],
+        "fastapi_default_seconds": default_seconds,
+        "pydantic_json_seconds": pydantic_seconds,
+        "compact_seconds": compact_seconds,
+    }
+
+
+def _render_ad_text(ad) -> str:
+    models = ", ".join(ad.applicability_rules.aircraft_models)
+    return f"EASA AD No.: {ad.ad_id}\nEffective Date: 01 January 2025\nApplicability:\n{models} aeroplanes, all MSN.\n"
+
+
+async def bench_extraction_pipeline(
+    documents: int,
+    latency_ms: float,
+    rate_limit_rate: float,
+    repeat: int,
+    seed: int
+) -> dict[str, Any]:
+    """
+        Extraction of synthetic AD texts through the scheduler and the OpenAI client,
+        answered in-process by the LLM stand-in with the given latency and 429 rate.
+    """
+    texts = {f"doc-{index:05d}": _render_ad_text(ad) for index, ad in enumerate(generate_ad_corpus(documents, seed=seed))}
+    stub = LLMStub(
+        StubConfig(mode="synthetic", latency_ms=latency_ms, rate_limit_rate=rate_limit_rate, retry_after_seconds=0, seed=seed),
+        RecordingStore(Path(tempfile.gettempdir()))
+    )
+    http_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=create_app(stub)), timeout=60)
+    client = AsyncOpenAI(api_key="stub", base_url="http://llm-stub/v1", http_client=http_client)
+    ad_extractor = ADExtractorFactory(OpenAIADExtractor(api_key="stub", max_retries=0, client=client))
+    succeeded = 0
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        async def run() -> None:
+            nonlocal succeeded
+            scheduler = ExtractionScheduler(
+                max_concurrency=settings.LLM_MAX_CONCURRENCY,
+                max_retries=settings.LLM_MAX_RETRIES,
+                backoff_base=0.01,
+                backoff_max=0.1
+            )
+            _, statuses = await bulk_process_ads(texts, ad_extractor, Path(tmp_dir), scheduler)
+            succeeded = sum(status.status == "success" for status in statuses)
+
+        seconds = await _measure(run, repeat)
+    await client.close()
+
+    return {
+        "documents": documents,
+        "succeeded": succeeded,
+        "max_concurrency": settings.LLM_MAX_CONCURRENCY,
+        "stub_latency_ms": latency_ms,
+        "stub_rate_limit_rate": rate_limit_rate,
+        "stub_requests": stub.stats["requests"],
+        "documents_per_second": documents / seconds["median"],
+        "seconds": seconds,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=BASE_DIR, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+async def run_benchmarks(args: argparse.Namespace) -> dict[str, Any]:
+    fleet = generate_fleet(args.fleet_size, seed=args.seed)
+    ads = generate_ad_corpus(
+        args.ad_count,
+        exclusions_per_ad=args.exclusions_per_ad,
+        msn_list_length=args.msn_list_length,
+        seed=args.seed
+    )
+
+    benchmarks = {
+        "evaluate_against_multiple_ads": await bench_evaluate_against_multiple_ads(fleet, ads, args.repeat),
+        "batch_evaluate": await bench_batch_evaluate(fleet, ads, args.repeat),
+        "load_parsed_ads": await bench_load_parsed_ads(ads, args.repeat),
+    }
+    if args.response_fleet_size > 0:
+        benchmarks["response_serialization"] = await bench_response_serialization(
+            generate_fleet(args.response_fleet_size, seed=args.seed), ads, args.repeat
+        )
+    if not args.skip_pdf:
+        benchmarks["bulk_extract"] = await bench_bulk_extract(args.pdf_directory, args.repeat)
+    if args.pipeline_documents > 0:
+        benchmarks["extraction_pipeline"] = await bench_extraction_pipeline(
+            args.pipeline_documents, args.stub_latency_ms, args.stub_rate_limit_rate, args.repeat, args.seed
+        )
+
+    return {
+        "format_version": FORMAT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+        },
+        "parameters": {
+            "fleet_size": args.fleet_size,
+            "ad_count": args.ad_count,
+            "exclusions_per_ad": args.exclusions_per_ad,
+            "msn_list_length": args.msn_list_length,
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "pdf_directory": None if args.skip_pdf else str(args.pdf_directory),
+            "pipeline_documents": args.pipeline_documents,
+            "response_fleet_size": args.response_fleet_size,
+        },
+        "benchmarks": benchmarks,
+    }
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the AD extractor micro-benchmarks.")
+    parser.add_argument("--fleet-size", type=int, default=200)
+    parser.add_argument("--ad-count", type=int, default=200)
+    parser.add_argument("--exclusions-per-ad", type=int, default=2)
+    parser.add_argument("--msn-list-length", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--pdf-directory", type=Path, default=AD_DOCS_DIR)
+    parser.add_argument("--skip-pdf", action="store_true", help="Skip the PDF extraction benchmark")
+    parser.add_argument("--pipeline-documents", type=int, default=0, help="Synthetic documents for the extraction pipeline benchmark (0 skips it)")
+    parser.add_argument("--stub-latency-ms", type=float, default=500.0, help="LLM stand-in latency per request in the pipeline benchmark")
+    parser.add_argument("--stub-rate-limit-rate", type=float, default=0.0, help="Fraction of LLM stand-in requests answered with 429")
+    parser.add_argument("--response-fleet-size", type=int, default=10000, help="Aircraft in the response serialization benchmark (0 skips it)")
+    parser.add_argument("--output", type=Path, default=None, help="JSON file to write; printed to stdout if omitted")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    args = parse_args(argv)
+    results = asyncio.run(run_benchmarks(args))
+    report = json.dumps(results, indent=2, sort_keys=True)
+
+    if args.output is None:
+        print(report)
+        return
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(report + "\n", encoding="utf-8")
+    print(f"Benchmark results written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
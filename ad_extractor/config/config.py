@@ -15,6 +15,68 @@ class Settings(BaseSettings):
     LLM_API_KEY: SecretStr = SecretStr("")
     BASE_URL: str | None = None
 
+    # Where parsed ADs are stored: "json" (one *_parsed.json file per AD) or "sqlite"
+    AD_STORE_BACKEND: str = "json"
+    AD_STORE_SQLITE_PATH: str | None = None
+
+    # Minimum seconds between scans of the output directory for changed AD files
+    AD_REGISTRY_REFRESH_INTERVAL: float = 1.0
+
+    # Worker processes for PDF text extraction (0 disables the process pool)
+    PDF_EXTRACT_WORKERS: int = 0
+    PDF_PAGES_PER_TASK: int = 4
+
+    # LLM extraction scheduling (0 disables the corresponding per-minute limit)
+    LLM_MAX_CONCURRENCY: int = 4
+    LLM_REQUESTS_PER_MINUTE: float = 0
+    LLM_TOKENS_PER_MINUTE: float = 0
+    LLM_MAX_RETRIES: int = 5
+    # Worker tasks processing documents of background extraction jobs
+    EXTRACTION_JOB_WORKERS: int = 4
+
+    # Shared LLM HTTP client (HTTP/2 and keep-alive connection pool)
+    LLM_HTTP2: bool = True
+    LLM_MAX_CONNECTIONS: int = 100
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_KEEPALIVE_EXPIRY: float = 30.0
+
+    # Content-addressed cache for PDF text and LLM extraction results
+    CACHE_ENABLED: bool = True
+    CACHE_DIR: str | None = None
+    CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+
+    # Send only the located applicability/effective date/ID sections to the LLM
+    LOCATE_APPLICABILITY_SECTIONS: bool = True
+    # Texts above this many estimated tokens are extracted in parallel chunks and merged (0 disables chunking)
+    EXTRACTION_CHUNK_TOKENS: int = 8000
+    # Parse standard FAA/EASA applicability phrasing locally; the LLM is only called below the confidence threshold
+    RULE_BASED_EXTRACTION: bool = False
+    RULE_BASED_MIN_CONFIDENCE: float = 0.8
+
+    # AI chat system prompt: estimated token budget and maximum number of ADs (0 = no limit)
+    CHAT_CONTEXT_TOKEN_BUDGET: int = 6000
+    CHAT_CONTEXT_MAX_ADS: int = 20
+    # Answer unambiguous "is <model> MSN <n> with <mods> affected?" prompts from the evaluator
+    CHAT_FAST_PATH_ENABLED: bool = True
+    # In-memory LRU cache of LLM chat answers, keyed on prompt, temperature and AD corpus content
+    CHAT_CACHE_ENABLED: bool = True
+    CHAT_CACHE_MAX_ENTRIES: int = 512
+    CHAT_CACHE_TTL_SECONDS: float = 3600.0
+
+    # Prometheus /metrics endpoint with pipeline stage, LLM token, cache and in-flight metrics
+    METRICS_ENABLED: bool = True
+
+    # Opt-in per-request profiling: requests with an `X-Profile: collapsed|speedscope` header are sampled
+    # every PROFILING_SAMPLE_INTERVAL_MS and the profile is written to output/profiles/
+    PROFILING_ENABLED: bool = False
+    PROFILING_SAMPLE_INTERVAL_MS: float = 1.0
+
+    # Write JSON files in output/ (parsed ADs, evaluation results, fleet, jobs) without indentation
+    COMPACT_JSON_OUTPUT: bool = False
+
+    # Aircraft evaluated per chunk by the streaming NDJSON evaluation endpoint
+    EVALUATION_STREAM_CHUNK_SIZE: int = 1000
+
 
 @lru_cache()
 def get_settings() -> Settings:
@@ -1,6 +1,27 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from api import router as api_router
+from api.ad_extractor.document_extractors import shutdown_pdf_process_pool
+from api.ad_extractor.jobs import extraction_job_queue
+from api.evaluator.fleet_registry import fleet_registry
+from api.llm_client import llm_client_pool
+from api.metrics import MetricsMiddleware, metrics, metrics_endpoint
+from api.profiling import ProfilingMiddleware
+from api.registry import ad_registry
+from api.utils import PydanticJSONResponse
+from config.config import settings
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    snapshot = await ad_registry.load()
+    await fleet_registry.load(snapshot)
+    await extraction_job_queue.start()
+    yield
+    await extraction_job_queue.stop()
+    await llm_client_pool.aclose()
+    shutdown_pdf_process_pool()
 
 
 def init_app():
@@ -8,6 +29,8 @@ def init_app():
         title="Airworthiness Directive Extractor and Evaluator API",
         description="API for extracting and evaluating Airworthiness Directives (ADs).",
         version="1.0.0",
+        lifespan=lifespan,
+        default_response_class=PydanticJSONResponse,
         openapi_tags=[
             {
                 "name": "Assignment",
@@ -29,6 +52,11 @@ def init_app():
     )
 
     app.include_router(api_router)
+    if metrics.enabled:
+        app.add_api_route("/metrics", metrics_endpoint, methods=["GET"], include_in_schema=False)
+        app.add_middleware(MetricsMiddleware)
+    if settings.PROFILING_ENABLED:
+        app.add_middleware(ProfilingMiddleware, interval=settings.PROFILING_SAMPLE_INTERVAL_MS / 1000)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],
@@ -0,0 +1,79 @@
+import asyncio
+import random
+from pathlib import Path
+
+import pytest
+
+from api.ad_extractor.utils import list_ad_documents
+from api.ad_store import SQLiteADStore
+from api.registry import ADCorpusSnapshot
+from api.schema import ADDocument, MSNConstraint
+from benchmarks.generators import MODEL_FAMILIES, MSN_RANGE, generate_ad_corpus
+
+
+def _corpus(seed: int) -> list[ADDocument]:
+    """
+        Generated corpus with some MSN lists holding entries the SQLite tables cannot index
+        (strings, floats) and some "all MSN" constraints.
+    """
+    rnd = random.Random(seed)
+    ads = generate_ad_corpus(150, exclusions_per_ad=1, msn_list_length=8, seed=seed)
+    for ad in rnd.sample(ads, 40):
+        constraints = ad.applicability_rules.msn_constraints
+        if constraints is None:
+            ad.applicability_rules.msn_constraints = MSNConstraint()
+            continue
+        msns = constraints.include_msns if constraints.include_msns else constraints.exclude_msns
+        msn = rnd.choice(msns)
+        msns += [str(msn + 1), float(msn + 2), msn + 3.5, "n/a"]
+    return ads
+
+
+def _queries(ads: list[ADDocument], seed: int) -> list[tuple]:
+    rnd = random.Random(seed)
+    models = [None, "A3", "A320", "MD", "B737", "Boeing 737-800", "a321-211", "DC-10-30F", "MD-11F", "E190"]
+    models += [family + variant for family, variants in MODEL_FAMILIES.items() for variant in variants]
+
+    msns = [None, MSN_RANGE[0], MSN_RANGE[1], 0, -1, 2 ** 63 - 1]
+    for ad in rnd.sample(ads, 30):
+        constraints = ad.applicability_rules.msn_constraints
+        if constraints is None:
+            continue
+        for value in (constraints.include_msns or []) + (constraints.exclude_msns or []):
+            if isinstance(value, (int, float)):
+                msns += [int(value), int(value) + 1]
+            elif value.isdigit():
+                msns.append(int(value))
+        for bound in (constraints.min_msn, constraints.max_msn):
+            if bound is not None:
+                msns += [bound - 1, bound, bound + 1]
+    return [(model, msn) for model in models for msn in rnd.sample(msns, 12) + [None]]
+
+
+async def _list_both(snapshot: ADCorpusSnapshot, store: SQLiteADStore, monkeypatch, *args) -> tuple:
+    monkeypatch.setattr("api.ad_extractor.utils.get_ad_store", lambda: None)
+    json_ads, json_total = await list_ad_documents(snapshot, *args)
+    monkeypatch.setattr("api.ad_extractor.utils.get_ad_store", lambda: store)
+    sqlite_ads, sqlite_total = await list_ad_documents(snapshot, *args)
+    return ([ad.ad_id for ad in json_ads], json_total), ([ad.ad_id for ad in sqlite_ads], sqlite_total)
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_sqlite_query_matches_json_filtering(seed: int, tmp_path: Path, monkeypatch) -> None:
+    ads = _corpus(seed)
+    snapshot = ADCorpusSnapshot(1, {ad.ad_id: ad for ad in ads}, "test")
+    store = SQLiteADStore(tmp_path / "ads.sqlite3")
+    store.save_many_sync(ads)
+
+    async def run() -> None:
+        for aircraft_model, msn in _queries(ads, seed):
+            json_result, sqlite_result = await _list_both(snapshot, store, monkeypatch, aircraft_model, msn, 0, 500)
+            assert sqlite_result == json_result, f"aircraft_model={aircraft_model!r} msn={msn!r}"
+
+        json_page, sqlite_page = await _list_both(snapshot, store, monkeypatch, "A320", None, 10, 7)
+        assert sqlite_page == json_page
+
+    try:
+        asyncio.run(run())
+    finally:
+        store.close()
@@ -0,0 +1,138 @@
+import asyncio
+import random
+
+import pytest
+
+from api.evaluator.batch_evaluator import BatchAircraftEvaluator, ReasonCode
+from api.evaluator.evaluator import AircraftEvaluator
+from api.schema import (
+    ADDocument,
+    AircraftConfiguration,
+    ApplicabilityRules,
+    ExcludeIfModification,
+    MSNConstraint,
+)
+from benchmarks.generators import MODEL_FAMILIES, generate_ad_corpus, generate_fleet
+
+
+MODELS = [family + variant for family, variants in MODEL_FAMILIES.items() for variant in variants]
+MODIFICATIONS = ["mod 24591", "mod 24591 (production)", "SB A320-57-1089 Rev 04", "mod 24977", "mod 30000"]
+
+
+def _random_constraints(rnd: random.Random) -> MSNConstraint | None:
+    msns = lambda count: sorted(rnd.sample(range(1, 200), count))
+    shape = rnd.randrange(7)
+    if shape == 0:
+        return None
+    if shape == 1:
+        return MSNConstraint()
+    if shape == 2:
+        return MSNConstraint(include_msns=msns(10))
+    if shape == 3:
+        return MSNConstraint(exclude_msns=msns(10))
+    if shape == 4:
+        return MSNConstraint(min_msn=rnd.randint(1, 100))
+    if shape == 5:
+        return MSNConstraint(max_msn=rnd.randint(100, 200))
+    low = rnd.randint(1, 100)
+    return MSNConstraint(min_msn=low, max_msn=rnd.randint(low, 200), exclude_msns=msns(5))
+
+
+def _random_ads(rnd: random.Random, count: int) -> list[ADDocument]:
+    ads = []
+    for number in range(count):
+        models = rnd.sample(MODELS, rnd.randint(1, 5))
+        exclusions = [
+            ExcludeIfModification(
+                modification=rnd.choice(MODIFICATIONS),
+                applicable_models=rnd.sample(models, rnd.randint(1, len(models))) if rnd.random() < 0.5 else None
+            )
+            for _ in range(rnd.randint(0, 2))
+        ]
+        ads.append(ADDocument(
+            ad_id=f"TEST-{number:03d}",
+            title=f"Test AD {number}",
+            applicability_rules=ApplicabilityRules(
+                aircraft_models=models,
+                msn_constraints=_random_constraints(rnd),
+                excluded_if_modifications=exclusions
+            )
+        ))
+    return ads
+
+
+def _random_fleet(rnd: random.Random, size: int) -> list[AircraftConfiguration]:
+    fleet = []
+    for _ in range(size):
+        msn_shape = rnd.randrange(10)
+        msn = None if msn_shape == 0 else 2 ** 64 + rnd.randrange(3) if msn_shape == 1 else rnd.randint(1, 200)
+        fleet.append(AircraftConfiguration(
+            aircraft_model=rnd.choice(MODELS),
+            msn=msn,
+            modifications_applied=rnd.sample(MODIFICATIONS, rnd.randint(0, 2))
+        ))
+    return fleet
+
+
+async def _assert_matches_scalar(fleet: list[AircraftConfiguration], ads: list[ADDocument]) -> None:
+    evaluator = AircraftEvaluator()
+    batch_result = await BatchAircraftEvaluator(evaluator).evaluate(fleet, ads)
+    batch_results = await batch_result.to_evaluation_results()
+
+    for row, aircraft in enumerate(fleet):
+        for col, ad in enumerate(ads):
+            expected = (await evaluator.evaluate(aircraft, ad)).results[0]
+            actual = batch_results[row].results[col]
+            assert (actual.ad_id, actual.is_affected, actual.reason) == (expected.ad_id, expected.is_affected, expected.reason), (
+                f"row {row} ({aircraft}), AD {ad.ad_id}"
+            )
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_batch_matches_scalar_on_random_rules(seed: int) -> None:
+    rnd = random.Random(seed)
+    asyncio.run(_assert_matches_scalar(_random_fleet(rnd, 200), _random_ads(rnd, 40)))
+
+
+def test_batch_matches_scalar_on_generated_corpus() -> None:
+    fleet = generate_fleet(150, seed=3)
+    ads = generate_ad_corpus(40, exclusions_per_ad=2, msn_list_length=10, seed=3)
+    asyncio.run(_assert_matches_scalar(fleet, ads))
+
+
+def test_batch_handles_msns_beyond_int64() -> None:
+    ads = [ADDocument(
+        ad_id="TEST-BIG",
+        title="Test AD",
+        applicability_rules=ApplicabilityRules(
+            aircraft_models=["A320-214"],
+            msn_constraints=MSNConstraint(max_msn=2 ** 63)
+        )
+    )]
+    fleet = [
+        AircraftConfiguration(aircraft_model="A320-214", msn=2 ** 63),
+        AircraftConfiguration(aircraft_model="A320-214", msn=2 ** 63 + 1),
+        AircraftConfiguration(aircraft_model="A320-214", msn=-(2 ** 64)),
+    ]
+    asyncio.run(_assert_matches_scalar(fleet, ads))
+
+
+def test_compact_response_carries_reason_parameters() -> None:
+    rnd = random.Random(4)
+    fleet = _random_fleet(rnd, 150)
+    ads = _random_ads(rnd, 30)
+    evaluator = AircraftEvaluator()
+    batch_result = asyncio.run(BatchAircraftEvaluator(evaluator).evaluate(fleet, ads))
+    compact = asyncio.run(batch_result.to_compact())
+
+    for col, (ad, params) in enumerate(zip(ads, compact.ad_params)):
+        constraints = ad.applicability_rules.msn_constraints
+        assert params.aircraft_models == ad.applicability_rules.aircraft_models
+        assert (params.min_msn, params.max_msn) == ((constraints.min_msn, constraints.max_msn) if constraints else (None, None))
+        assert params.exclusions == [exclusion.modification for exclusion in ad.applicability_rules.excluded_if_modifications]
+
+    exempted = {(int(row), int(col)) for row, col in zip(*(batch_result.reason_codes == ReasonCode.MODIFICATION_EXEMPTED).nonzero())}
+    assert exempted and {(cell.aircraft, cell.ad) for cell in compact.exemptions} == exempted
+    for cell in compact.exemptions:
+        modification = compact.ad_params[cell.ad].exclusions[cell.exclusion]
+        assert f"matches '{modification}'" in asyncio.run(batch_result.reason(cell.aircraft, cell.ad))
@@ -0,0 +1,80 @@
+from api.ad_extractor.chunking import merge_applicability_rules, merge_exclusions, merge_msn_constraints
+from api.schema import ApplicabilityRules, ExcludeIfModification, MSNConstraint
+
+
+def test_merge_msn_constraints_without_constraints() -> None:
+    assert merge_msn_constraints([]) is None
+    assert merge_msn_constraints([None, None]) is None
+    assert merge_msn_constraints([None, MSNConstraint(min_msn=5)]) == MSNConstraint(min_msn=5)
+
+
+def test_merge_msn_constraints_all_msn_drops_include_list() -> None:
+    assert merge_msn_constraints([MSNConstraint(), MSNConstraint(include_msns=[5, 6])]) == MSNConstraint()
+
+
+def test_merge_msn_constraints_keeps_open_sides_open() -> None:
+    merged = merge_msn_constraints([MSNConstraint(min_msn=100), MSNConstraint(max_msn=500)])
+    assert merged == MSNConstraint()
+
+    merged = merge_msn_constraints([MSNConstraint(min_msn=100, max_msn=200), MSNConstraint(min_msn=150)])
+    assert merged == MSNConstraint(min_msn=100)
+
+
+def test_merge_msn_constraints_widens_range_over_listed_msns() -> None:
+    merged = merge_msn_constraints([MSNConstraint(min_msn=100, max_msn=200), MSNConstraint(include_msns=[50, 300])])
+    assert merged == MSNConstraint(min_msn=50, max_msn=300)
+
+
+def test_merge_msn_constraints_unions_include_lists() -> None:
+    merged = merge_msn_constraints([MSNConstraint(include_msns=[3, 1]), MSNConstraint(include_msns=["2", 3])])
+    assert merged == MSNConstraint(include_msns=[1, "2", 3])
+
+
+def test_merge_msn_constraints_keeps_exclusions_no_chunk_affects() -> None:
+    merged = merge_msn_constraints([
+        MSNConstraint(exclude_msns=[5, 7]),
+        MSNConstraint(min_msn=1, max_msn=6),
+        MSNConstraint(include_msns=[9]),
+    ])
+    assert merged == MSNConstraint(exclude_msns=[7])
+
+
+def test_merge_exclusions_deduplicates_by_normalized_name() -> None:
+    merged = merge_exclusions([
+        ExcludeIfModification(modification="Airbus mod 24591", applicable_models=["A320-211"]),
+        ExcludeIfModification(modification="Airbus MOD  24591", applicable_models=["A320-212", "A320-211"]),
+        ExcludeIfModification(modification="SB A320-57-1089", applicable_models=["A320-211"]),
+        ExcludeIfModification(modification="SB A320-57-1089", applicable_models=None),
+    ])
+    assert merged == [
+        ExcludeIfModification(modification="Airbus mod 24591", applicable_models=["A320-211", "A320-212"]),
+        ExcludeIfModification(modification="SB A320-57-1089", applicable_models=None),
+    ]
+
+
+def test_merge_applicability_rules_scopes_all_model_exclusions_to_their_chunk() -> None:
+    merged = merge_applicability_rules([
+        ApplicabilityRules(
+            aircraft_models=["A320-211", "A320-212"],
+            excluded_if_modifications=[ExcludeIfModification(modification="mod 24591")]
+        ),
+        ApplicabilityRules(
+            aircraft_models=["A321-111"],
+            excluded_if_modifications=[ExcludeIfModification(modification="mod 24977")]
+        ),
+    ])
+    assert merged.aircraft_models == ["A320-211", "A320-212", "A321-111"]
+    assert merged.excluded_if_modifications == [
+        ExcludeIfModification(modification="mod 24591", applicable_models=["A320-211", "A320-212"]),
+        ExcludeIfModification(modification="mod 24977", applicable_models=["A321-111"]),
+    ]
+
+
+def test_merge_applicability_rules_keeps_all_model_exclusions_for_same_models() -> None:
+    parts = [
+        ApplicabilityRules(aircraft_models=["A320-211"], excluded_if_modifications=[ExcludeIfModification(modification="mod 24591")]),
+        ApplicabilityRules(aircraft_models=["A320-211"]),
+        ApplicabilityRules(excluded_if_modifications=[ExcludeIfModification(modification="mod 24977")]),
+    ]
+    merged = merge_applicability_rules(parts)
+    assert [exclusion.applicable_models for exclusion in merged.excluded_if_modifications] == [None, None]
@@ -0,0 +1,38 @@
+import asyncio
+from pathlib import Path
+
+from api.ad_extractor.ad_extractors import ADExtractorFactory
+from api.ad_extractor.cache import ContentCache
+from api.schema import ADDocument, ApplicabilityRules
+
+
+AD = ADDocument(ad_id="TEST-0001", title="Test AD", applicability_rules=ApplicabilityRules(aircraft_models=["A320-214"]))
+
+
+class StaticExtractor:
+    model = "static"
+
+    async def extract_ad(self, prompt, response_format=None, system_context=None, ad_text=None):
+        return AD
+
+
+class FailingCache(ContentCache):
+    def put_sync(self, namespace: str, key: str, data: bytes) -> None:
+        raise FileNotFoundError("temporary file removed")
+
+
+def test_eviction_skips_writes_in_progress(tmp_path: Path) -> None:
+    cache = ContentCache(tmp_path, max_bytes=10)
+    in_progress = tmp_path / "ad" / "ab" / ".abcdef.1.2.tmp"
+    in_progress.parent.mkdir(parents=True)
+    in_progress.write_bytes(b"x" * 100)
+
+    cache.put_sync("ad", "abcdef", b"y" * 100)
+
+    assert in_progress.exists()
+    assert [path for _, _, path in cache._entries()] == []
+
+
+def test_cache_write_failure_keeps_the_extraction(tmp_path: Path) -> None:
+    factory = ADExtractorFactory(StaticExtractor(), cache=FailingCache(tmp_path, max_bytes=1024))
+    assert asyncio.run(factory.extract_ad("AD text")) == AD
@@ -0,0 +1,143 @@
+import asyncio
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+import openai
+
+from api.ad_extractor.ad_extractors import ADExtractorFactory, OpenAIADExtractor
+from api.ad_extractor.cache import ContentCache
+from api.ad_extractor.chunking import split_into_chunks
+from api.ad_extractor.scheduler import ExtractionScheduler
+from api.ad_extractor.utils import bulk_process_ads
+from api.schema import ADDocument, ApplicabilityRules
+
+
+AD_JSON = ADDocument(
+    ad_id="TEST-0001",
+    title="Test AD",
+    applicability_rules=ApplicabilityRules(aircraft_models=["A320-214"])
+).model_dump_json()
+
+
+async def _no_save(ad_document: ADDocument, output_directory: Path) -> Path:
+    return output_directory
+
+
+def _error(status_code: int, headers: dict[str, str]) -> openai.APIStatusError:
+    response = httpx.Response(
+        status_code,
+        headers=headers,
+        request=httpx.Request("POST", "http://llm.test/v1/chat/completions")
+    )
+    error_class = openai.RateLimitError if status_code == 429 else openai.APIStatusError
+    return error_class(f"HTTP {status_code}", response=response, body=None)
+
+
+class FakeClient:
+    """
+        Stand-in for AsyncOpenAI: raises the queued errors, then answers with a fixed ADDocument.
+    """
+    def __init__(self, errors: list[Exception] = (), latency: float = 0.0) -> None:
+        self.errors = list(errors)
+        self.latency = latency
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def with_options(self, **_) -> "FakeClient":
+        return self
+
+    async def _create(self, **_) -> SimpleNamespace:
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            if self.errors:
+                raise self.errors.pop(0)
+            return SimpleNamespace(usage=None, choices=[SimpleNamespace(message=SimpleNamespace(content=AD_JSON))])
+        finally:
+            self.in_flight -= 1
+
+
+def _run(texts: dict[str, str], client: FakeClient, scheduler: ExtractionScheduler, cache=None, chunk_tokens: int = 0):
+    factory = ADExtractorFactory(OpenAIADExtractor(api_key="test", max_retries=0, client=client), cache=cache, chunk_tokens=chunk_tokens)
+    return asyncio.run(bulk_process_ads(texts, factory, Path("unused"), scheduler))
+
+
+def test_rate_limited_request_waits_for_retry_after(monkeypatch) -> None:
+    monkeypatch.setattr("api.ad_extractor.utils.save_ad_document", _no_save)
+    client = FakeClient([_error(429, {"retry-after": "0.3"})])
+    scheduler = ExtractionScheduler(max_retries=2, backoff_base=0.001, backoff_max=0.001)
+
+    started = time.perf_counter()
+    _, statuses = _run({"doc": "AD text"}, client, scheduler)
+
+    assert time.perf_counter() - started >= 0.3
+    assert (statuses[0].status, statuses[0].attempts, client.calls) == ("success", 2, 2)
+
+
+def test_retries_stop_after_max_retries(monkeypatch) -> None:
+    monkeypatch.setattr("api.ad_extractor.utils.save_ad_document", _no_save)
+    client = FakeClient([_error(429, {}) for _ in range(5)])
+    scheduler = ExtractionScheduler(max_retries=2, backoff_base=0.001, backoff_max=0.001)
+
+    _, statuses = _run({"doc": "AD text"}, client, scheduler)
+
+    assert (statuses[0].status, statuses[0].attempts, client.calls) == ("failure", 3, 3)
+    assert "RateLimitError" in statuses[0].error
+
+
+def test_client_errors_are_not_retried(monkeypatch) -> None:
+    monkeypatch.setattr("api.ad_extractor.utils.save_ad_document", _no_save)
+    client = FakeClient([_error(400, {})])
+    scheduler = ExtractionScheduler(max_retries=3, backoff_base=0.001)
+
+    _, statuses = _run({"doc": "AD text"}, client, scheduler)
+
+    assert (statuses[0].status, statuses[0].attempts, client.calls) == ("failure", 1, 1)
+
+
+def test_concurrency_limit_applies_to_llm_requests(monkeypatch) -> None:
+    monkeypatch.setattr("api.ad_extractor.utils.save_ad_document", _no_save)
+    client = FakeClient(latency=0.01)
+    scheduler = ExtractionScheduler(max_concurrency=2)
+
+    _, statuses = _run({f"doc-{index}": f"AD text {index}" for index in range(8)}, client, scheduler)
+
+    assert [status.status for status in statuses] == ["success"] * 8
+    assert (client.calls, client.max_in_flight) == (8, 2)
+
+
+def test_cached_documents_are_not_rate_limited(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setattr("api.ad_extractor.utils.save_ad_document", _no_save)
+    client = FakeClient()
+    cache = ContentCache(tmp_path, max_bytes=1024 * 1024)
+    texts = {f"doc-{index}": f"AD text {index}" for index in range(3)}
+    # The bucket only has room for the first run: charging the cached run would block for a minute
+    scheduler = ExtractionScheduler(requests_per_minute=3)
+
+    _run(texts, client, scheduler, cache)
+    started = time.perf_counter()
+    _, statuses = _run(texts, client, scheduler, cache)
+
+    assert time.perf_counter() - started < 1
+    assert client.calls == 3
+    assert [status.attempts for status in statuses] == [0, 0, 0]
+
+
+def test_chunked_document_is_charged_per_chunk(monkeypatch) -> None:
+    monkeypatch.setattr("api.ad_extractor.utils.save_ad_document", _no_save)
+    client = FakeClient(latency=0.01)
+    scheduler = ExtractionScheduler(max_concurrency=2)
+    text = "\n".join(f"--- Page {page} ---\n" + "Applicability text line.\n" * 40 for page in range(1, 9))
+    chunks = split_into_chunks(text, 400)
+
+    _, statuses = _run({"doc": text}, client, scheduler, chunk_tokens=400)
+
+    assert len(chunks) > 2
+    assert (statuses[0].status, statuses[0].attempts) == ("success", len(chunks))
+    assert (client.calls, client.max_in_flight) == (len(chunks), 2)
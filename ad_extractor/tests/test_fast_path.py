@@ -0,0 +1,55 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from api.ai_chat.fast_path import ApplicabilityFastPath, parse_applicability_question
+from api.registry import ADCorpusSnapshot
+from api.schema import ADDocument
+
+
+OUTPUT_DIR = Path(__file__).parent.parent.parent / "output"
+
+
+@pytest.mark.parametrize("prompt, expected", [
+    ("Is an A320-214 MSN 5234 with mod 24591 affected?", ("A320-214", 5234, ["mod 24591"])),
+    ("Is A321-111 MSN 1234 affected?", ("A321-111", 1234, [])),
+    ("Is A320-214 MSN 4500 with no modifications affected?", ("A320-214", 4500, [])),
+    ("Is A320-214 MSN 4500 with mod 24591 (production) affected?", ("A320-214", 4500, ["mod 24591 (production)"])),
+    (
+        "Is my Airbus A320-214, MSN 6789, which has SB A320-57-1089 Rev 04 embodied, affected by any AD?",
+        ("Airbus A320-214", 6789, ["SB A320-57-1089 Rev 04"])
+    ),
+])
+def test_parses_unambiguous_questions(prompt: str, expected: tuple) -> None:
+    question, reason = parse_applicability_question(prompt)
+    assert reason is None
+    assert (question.aircraft_model, question.msn, question.modifications) == expected
+
+
+@pytest.mark.parametrize("prompt, reason", [
+    ("What is the weather?", "not_an_applicability_question"),
+    ("Is A320-214 MSN 4500 affected by EASA AD 2025-0254?", "names_specific_ad"),
+    ("Is A320-214 MSN 1 or MSN 2 affected?", "multiple_msns"),
+    ("Is A320-214 MSN 4500 without mod 24591 affected?", "negated_modification"),
+    ("Is A320-214 MSN 4500 affected if mod 24591 is planned?", "modification_not_stated_as_applied"),
+    ("Is A320-214 MSN 4500 affected after mod 24591?", "modification_not_stated_as_applied"),
+    ("Is MSN 4500 affected?", "no_aircraft_model"),
+    ("Is A320-214 MSN 4500 affected? It was delivered in 2019.", "unhandled_wording"),
+    ("Does the MD-11F with MSN 48400 need to comply?", "unhandled_wording"),
+    ("Is A320-214 and A321-111 affected?", "multiple_aircraft_models"),
+])
+def test_leaves_ambiguous_questions_to_the_llm(prompt: str, reason: str) -> None:
+    assert parse_applicability_question(prompt) == (None, reason)
+
+
+def test_answer_applies_exemptions_of_bundled_ads() -> None:
+    ads = [ADDocument.model_validate_json(path.read_bytes()) for path in sorted(OUTPUT_DIR.glob("*_parsed.json"))]
+    snapshot = ADCorpusSnapshot(1, {ad.ad_id: ad for ad in ads}, "test")
+    fast_path = ApplicabilityFastPath()
+
+    exempted = asyncio.run(fast_path.try_answer("Is an A320-214 MSN 5234 with mod 24591 affected?", snapshot))
+    affected = asyncio.run(fast_path.try_answer("Is an A320-214 MSN 5234 affected?", snapshot))
+
+    assert "CONCLUSION: NO" in exempted
+    assert "CONCLUSION: YES" in affected and "EASA-2025-0254R1" in affected
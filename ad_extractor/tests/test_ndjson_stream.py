@@ -0,0 +1,52 @@
+import asyncio
+import json
+
+from api.evaluator.utils import iter_ndjson_lines
+from api.evaluator.views import _stream_evaluation_results
+from api.registry import ADCorpusSnapshot
+from benchmarks.generators import generate_ad_corpus, generate_fleet
+
+
+async def _chunks(body: bytes, size: int):
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+async def _collect(byte_chunks, max_line_bytes: int) -> list:
+    return [item async for item in iter_ndjson_lines(byte_chunks, max_line_bytes)]
+
+
+class _StreamRequest:
+    def __init__(self, body: bytes, chunk_size: int) -> None:
+        self._body = body
+        self._chunk_size = chunk_size
+
+    def stream(self):
+        return _chunks(self._body, self._chunk_size)
+
+
+def test_oversized_line_is_skipped_up_to_next_newline() -> None:
+    body = b'{"a": 1}\n' + b"x" * 100 + b'\n\n{"b": 2}\n' + b"y" * 50
+    for chunk_size in (1, 7, 64, len(body)):
+        lines = asyncio.run(_collect(_chunks(body, chunk_size), max_line_bytes=20))
+        assert lines == [(1, b'{"a": 1}'), (2, None), (4, b'{"b": 2}'), (5, None)], chunk_size
+
+
+def test_stream_reports_oversized_line_and_keeps_going() -> None:
+    fleet = generate_fleet(6, seed=1)
+    ads = generate_ad_corpus(5, seed=1)
+    snapshot = ADCorpusSnapshot(1, {ad.ad_id: ad for ad in ads}, "test")
+
+    lines = [aircraft.model_dump_json().encode() for aircraft in fleet]
+    oversized = b'{"aircraft_model": "' + b"A" * (2 * 1024 * 1024) + b'"}'
+    body = b"\n".join(lines[:2] + [oversized] + lines[2:]) + b"\n"
+
+    async def run() -> list[dict]:
+        request = _StreamRequest(body, 64 * 1024)
+        return [json.loads(output) async for output in _stream_evaluation_results(request, snapshot, chunk_size=4)]
+
+    outputs = asyncio.run(run())
+    assert len(outputs) == len(fleet) + 1
+    assert outputs[2]["line"] == 3 and "exceeds" in outputs[2]["error"]
+    results = outputs[:2] + outputs[3:]
+    assert [len(result["results"]) for result in results] == [len(ads)] * len(fleet)